@@ -1,147 +1,173 @@
 import pandas as pd
+import numpy as np
 import os
-from datetime import datetime, timedelta
+import fnmatch
 import argparse
 import json
+from concurrent.futures import ProcessPoolExecutor
 
-def parse_json(value):
-    try:
-        return json.loads(value)
-    except json.JSONDecodeError as e:
-        raise argparse.ArgumentTypeError(f"Invalid JSON format: {e}")
-
-def get_datetime(prompt):
-    while True:
-        user_input = input(prompt)
-        try:
-            dt = datetime.strptime(user_input, "%Y-%m-%d %H:%M:%S")
-            return dt
-        except ValueError:
-            print("Incorrect format. Please enter in 'YYYY-MM-DD HH:MM:SS' format.")
-
-def process_csv(input_path, output_path, start_dt, end_dt):
-    # Read the CSV file
-    try:
-        df = pd.read_csv(input_path)
-    except Exception as e:
-        print(f"Error reading CSV file '{input_path}': {e}")
-        return
+'''
+Batch post-processing of simulator output for backtesting tools: drops the
+BidAskSpread and Variance columns and replaces the model Time column by a
+Datetime column. Files with a Timestamp column (simulator --calendar) keep
+their session timestamps; for other files the steps are spread evenly
+between --start and --end. Runs unattended: files are processed in parallel
+across a process pool and each file is streamed in chunks, so memory use
+does not grow with the file size.
+'''
 
-    # Display initial columns
-    print(f"\nProcessing '{input_path}'")
-    print("Initial Columns:", df.columns.tolist())
-
-    # Remove 'BidAskSpread' and 'Variance' if they exist
-    cols_to_remove = ['BidAskSpread', 'Variance']
-    existing_cols_to_remove = [col for col in cols_to_remove if col in df.columns]
-    if existing_cols_to_remove:
-        df.drop(columns=existing_cols_to_remove, inplace=True)
-        print(f"Removed columns: {existing_cols_to_remove}")
-    else:
-        print("No columns to remove.")
-
-    # Check if 'Time' column exists
-    if 'Time' not in df.columns:
-        print("Error: 'Time' column not found in the CSV.")
-        return
+COLUMNS_TO_REMOVE = ['BidAskSpread', 'Variance']
+DEFAULT_CHUNKSIZE = 500_000
 
-    # Calculate total number of time steps
-    total_steps = len(df)
-    print(f"Total time steps in simulation: {total_steps}")
 
-    # Calculate the total simulation duration
-    total_duration = end_dt - start_dt
-    print(f"Total simulation duration: {total_duration}")
-
-    # Calculate the time delta per step
-    delta_per_step = total_duration / total_steps
-    print(f"Time delta per step: {delta_per_step}")
-
-    # Generate a list of datetime objects
-    df['Datetime'] = [start_dt + i * delta_per_step for i in range(total_steps)]
+def parse_datetime(value):
+    try:
+        return pd.Timestamp(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Invalid datetime '{value}': {e}")
+
+
+def count_rows(path):
+    """Number of data rows of a CSV file (lines after the header), counted in binary blocks."""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 24), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def process_csv(input_path, output_path, start_dt=None, end_dt=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Clean one simulator output file.
+
+    Parameters:
+    - input_path, output_path: Source and destination CSV files
+    - start_dt, end_dt: Datetimes of the first step and the end of the simulation; steps are
+      spaced (end_dt - start_dt) / rows apart. Not needed when the file has a Timestamp column.
+    - chunksize: Rows read and written at a time
+
+    Returns:
+    - Number of rows written
+    """
+    header = pd.read_csv(input_path, nrows=0).columns
+    if 'Time' not in header:
+        raise ValueError(f"'Time' column not found in '{input_path}'")
+    has_timestamps = 'Timestamp' in header
+    if not has_timestamps:
+        if start_dt is None or end_dt is None:
+            raise ValueError(f"'{input_path}' has no Timestamp column; start and end datetimes are required")
+        start_ns = pd.Timestamp(start_dt).value
+        total_steps = count_rows(input_path)
+        # Microsecond resolution, as datetime.timedelta arithmetic would give
+        step_ns = round((pd.Timestamp(end_dt).value - start_ns) / max(total_steps, 1) / 1000) * 1000
+        if step_ns <= 0:
+            raise ValueError("End datetime must be after start datetime")
+
+    drop = [col for col in COLUMNS_TO_REMOVE + ['Time', 'Timestamp'] if col in header]
+    usecols = [col for col in header if col not in COLUMNS_TO_REMOVE]
+    tmp_path = f'{output_path}.tmp'
+    rows = 0
+    with open(tmp_path, 'w', newline='') as out:
+        for chunk in pd.read_csv(input_path, usecols=usecols, chunksize=chunksize):
+            if has_timestamps:
+                stamps = chunk['Timestamp'].to_numpy(dtype=np.int64)
+            else:
+                stamps = start_ns + (rows + np.arange(len(chunk), dtype=np.int64)) * step_ns
+            chunk = chunk.drop(columns=[col for col in drop if col in chunk.columns])
+            chunk.insert(0, 'Datetime', stamps.view('datetime64[ns]'))
+            chunk.to_csv(out, index=False, header=rows == 0)
+            rows += len(chunk)
+    os.replace(tmp_path, output_path)
+    return rows
+
+
+def _process(task):
+    """Worker entry point: (input, output, start, end, chunksize) -> (input, rows, error)."""
+    input_path, output_path, start_dt, end_dt, chunksize = task
+    try:
+        return input_path, process_csv(input_path, output_path, start_dt, end_dt, chunksize), None
+    except (OSError, ValueError, pd.errors.ParserError) as e:
+        return input_path, 0, str(e)
 
-    # Rearrange columns to place 'Datetime' first
-    cols = ['Datetime'] + [col for col in df.columns if col != 'Datetime']
-    df = df[cols]
 
-    # Remove the original 'Time' column
-    df.drop(columns=['Time'], inplace=True)
-    print("Dropped 'Time' column.")
+def find_files(input_dir, pattern):
+    return sorted(f for f in os.listdir(input_dir) if fnmatch.fnmatch(f, pattern))
 
-    # Save the processed DataFrame to CSV
-    try:
-        df.to_csv(output_path, index=False)
-        print(f"Processed CSV saved to '{output_path}'")
-    except Exception as e:
-        print(f"Error saving processed CSV '{output_path}': {e}")
-        return
 
-    # Optional: Remove Plotting Prompt and Calls
-    # Since plots are no longer desired, these sections are omitted.
+def output_name(filename):
+    model_name = filename.replace('simulation_output_', '').replace('.csv', '')
+    return f'process_simulation_output_{model_name}.csv'
 
-def main():
-    print("=== Batch Synthetic Market Data Processor ===\n")
 
-    # Define the simulation_output directory
-    simulation_output_dir = "simulation_output"
+def run(input_dir='simulation_output', output_dir=None, pattern='simulation_output*.csv', start=None, end=None,
+        workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Clean every matching file of input_dir into output_dir (default: input_dir).
+    Returns a list of (file, rows, error or None).
+    """
+    output_dir = output_dir or input_dir
+    os.makedirs(output_dir, exist_ok=True)
+    files = find_files(input_dir, pattern)
+    tasks = [(os.path.join(input_dir, f), os.path.join(output_dir, output_name(f)), start, end, chunksize)
+             for f in files]
 
-    # Check if the directory exists
-    if not os.path.exists(simulation_output_dir):
-        print(f"Directory '{simulation_output_dir}' does not exist.")
-        return
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            return list(pool.map(_process, tasks))
+    return [_process(task) for task in tasks]
 
-    # List all CSV files starting with 'simulation_output' in the directory
-    all_files = os.listdir(simulation_output_dir)
-    simulation_files = [f for f in all_files if f.startswith('simulation_output') and f.endswith('.csv')]
 
-    if not simulation_files:
-        print(f"No CSV files starting with 'simulation_output' found in '{simulation_output_dir}'.")
+def main():
+    parser = argparse.ArgumentParser(description='Clean simulator output CSV files for backtesting')
+    parser.add_argument('--config', type=str, default=None,
+                        help='JSON file with default values for any of the options below')
+    parser.add_argument('--input_dir', type=str, default='simulation_output', help='Folder with simulator output')
+    parser.add_argument('--output_dir', type=str, default=None, help='Destination folder (default: input folder)')
+    parser.add_argument('--pattern', type=str, default='simulation_output*.csv', help='File name pattern to process')
+    parser.add_argument('--start', type=parse_datetime, default=None,
+                        help="Datetime of the first step, e.g. '2024-01-02 09:30:00' (files without a Timestamp column)")
+    parser.add_argument('--end', type=parse_datetime, default=None,
+                        help='Datetime of the end of the simulation (files without a Timestamp column)')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel processes (default: one per CPU)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Rows per chunk')
+
+    args, _ = parser.parse_known_args()
+    if args.config is not None:
+        with open(args.config) as f:
+            config = json.load(f)
+        for key in ('start', 'end'):
+            if key in config:
+                config[key] = parse_datetime(config[key])
+        parser.set_defaults(**config)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.input_dir):
+        parser.error(f"Directory '{args.input_dir}' does not exist")
+    if (args.start is None) != (args.end is None):
+        parser.error("--start and --end must be given together")
+    if args.start is not None and args.end <= args.start:
+        parser.error("--end must be after --start")
+
+    results = run(args.input_dir, args.output_dir, args.pattern, args.start, args.end, args.workers, args.chunksize)
+    if not results:
+        print(f"No files matching '{args.pattern}' found in '{args.input_dir}'.")
         return
+    failed = 0
+    for path, rows, error in results:
+        if error is None:
+            print(f"{path}: {rows:,} rows")
+        else:
+            failed += 1
+            print(f"{path}: skipped ({error})")
+    print(f"Processed {len(results) - failed} of {len(results)} file(s).")
+    if failed:
+        raise SystemExit(1)
 
-    print(f"Found {len(simulation_files)} simulation CSV file(s) in '{simulation_output_dir}':")
-    for f in simulation_files:
-        print(f" - {f}")
-
-    # Ask the user whether to use a common simulation period for all files or individual periods
-    choice = input("\nDo you want to use the same simulation period for all files? (y/n): ").lower()
-    if choice == 'y':
-        # Get simulation period once
-        print("\nEnter the simulation period for time conversion (applied to all files).")
-        start_datetime = get_datetime("Start Date and Time (YYYY-MM-DD HH:MM:SS): ")
-        end_datetime = get_datetime("End Date and Time (YYYY-MM-DD HH:MM:SS): ")
-
-        if end_datetime <= start_datetime:
-            print("Error: End datetime must be after start datetime.")
-            return
-
-        # Process each CSV file
-        for file in simulation_files:
-            input_path = os.path.join(simulation_output_dir, file)
-            model_name = file.replace('simulation_output_', '').replace('.csv', '')
-            output_filename = f'process_simulation_output_{model_name}.csv'
-            output_path = os.path.join(simulation_output_dir, output_filename)
-
-            process_csv(input_path, output_path, start_datetime, end_datetime)
-    else:
-        # Process each CSV file with individual simulation periods
-        for file in simulation_files:
-            input_path = os.path.join(simulation_output_dir, file)
-            model_name = file.replace('simulation_output_', '').replace('.csv', '')
-            output_filename = f'process_simulation_output_{model_name}.csv'
-            output_path = os.path.join(simulation_output_dir, output_filename)
-
-            print(f"\n--- Processing '{file}' ---")
-            print("Enter the simulation period for time conversion.")
-            start_datetime = get_datetime("Start Date and Time (YYYY-MM-DD HH:MM:SS): ")
-            end_datetime = get_datetime("End Date and Time (YYYY-MM-DD HH:MM:SS): ")
-
-            if end_datetime <= start_datetime:
-                print("Error: End datetime must be after start datetime. Skipping this file.")
-                continue
-
-            process_csv(input_path, output_path, start_datetime, end_datetime)
-
-    print("\nAll files processed successfully.")
 
 if __name__ == "__main__":
     main()
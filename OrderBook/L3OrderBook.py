@@ -0,0 +1,353 @@
+from array import array
+from bisect import bisect_left, insort
+from collections import deque
+from collections.abc import Mapping
+from decimal import Decimal
+
+BUY, SELL = 1, -1
+
+
+def _tick_decimals(tick_size):
+    """Decimal places of a tick size (0.01 -> 2), to round tick multiples to clean prices."""
+    return max(0, -Decimal(str(tick_size)).normalize().as_tuple().exponent)
+
+
+class L3OrderBook:
+    """
+    Order-level book with price-time priority.
+
+    Every resting order has an ID and sits in a FIFO queue at its price level,
+    so queue position, partial fills and cancellations of individual orders
+    can be modeled. The aggregated L2 interface of OrderBook (add_bid,
+    remove_ask, get_best_bid, get_market_depth, bid_volume, ...) is provided
+    on top, so existing consumers can use this book unchanged.
+
+    Memory layout: orders live in slots of parallel typed arrays (price in
+    ticks, size, side and order ID; 25 bytes per order) and each price level
+    queues slot numbers in a deque. A dict maps order IDs to slots, so a
+    cancel is O(1): it zeroes the slot's size and the dead slot is skipped
+    and recycled when it reaches the front of its queue (queues are compacted
+    once dead slots outnumber live ones). Each side keeps a sorted list of
+    occupied price ticks with the best price at the end.
+    """
+
+    def __init__(self, tick_size=0.01):
+        self.tick_size = tick_size
+        self._decimals = _tick_decimals(tick_size)
+
+        # Per-order storage, indexed by slot
+        self._price = array('q')
+        self._size = array('d')
+        self._side = array('b')
+        self._oid = array('q')
+        self._free = []
+        self._slots = {}
+        self._next_id = 1
+
+        # Price levels: tick -> [deque of slots, volume, live order count]
+        self._bid_levels = {}
+        self._ask_levels = {}
+        # Sorted level keys with the best price last: bids by tick, asks by -tick
+        self._bid_keys = []
+        self._ask_keys = []
+
+        self.bid_volume = _LevelView(self._bid_levels, tick_size)
+        self.ask_volume = _LevelView(self._ask_levels, tick_size)
+
+    def to_tick(self, price):
+        return round(price / self.tick_size)
+
+    def to_price(self, tick):
+        # Rounded to the tick's decimals, so 10099 ticks of 0.01 is 100.99 as in the L2 book
+        return round(tick * self.tick_size, self._decimals)
+
+    # ------------------------------------------------------------------
+    # Order-level interface
+    # ------------------------------------------------------------------
+
+    def add_order(self, side, price, size, order_id=None):
+        """
+        Append a resting order to the back of its price level without matching.
+        Returns the order ID (auto-assigned unless given).
+        """
+        if order_id is None:
+            order_id = self._next_id
+            self._next_id += 1
+        elif order_id in self._slots:
+            raise ValueError(f"Order ID {order_id} is already in the book")
+        elif order_id >= self._next_id:
+            self._next_id = order_id + 1
+
+        tick = round(price / self.tick_size)
+        if side == 'buy':
+            side_code, levels = BUY, self._bid_levels
+        else:
+            side_code, levels = SELL, self._ask_levels
+
+        free = self._free
+        if free:
+            slot = free.pop()
+            self._price[slot] = tick
+            self._size[slot] = size
+            self._side[slot] = side_code
+            self._oid[slot] = order_id
+        else:
+            slot = len(self._size)
+            self._price.append(tick)
+            self._size.append(size)
+            self._side.append(side_code)
+            self._oid.append(order_id)
+        self._slots[order_id] = slot
+
+        level = levels.get(tick)
+        if level is None:
+            levels[tick] = [deque((slot,)), size, 1]
+            insort(self._bid_keys if side_code == BUY else self._ask_keys, tick * side_code)
+        else:
+            level[0].append(slot)
+            level[1] += size
+            level[2] += 1
+        return order_id
+
+    def cancel_order(self, order_id):
+        """Remove an order from the book. Returns its remaining size."""
+        slot = self._slots.pop(order_id)
+        size = self._size[slot]
+        self._size[slot] = 0.0
+        tick, side_code = self._price[slot], self._side[slot]
+        levels = self._bid_levels if side_code == BUY else self._ask_levels
+        level = levels[tick]
+        level[2] -= 1
+        if level[2] == 0:
+            self._drop_level(levels, tick, side_code)
+        else:
+            level[1] -= size
+            if len(level[0]) > 2 * level[2] + 16:
+                self._compact(level)
+        return size
+
+    def cancel_orders(self, order_ids):
+        """Cancel several orders; returns their remaining sizes."""
+        cancel = self.cancel_order
+        return [cancel(order_id) for order_id in order_ids]
+
+    def reduce_order(self, order_id, size):
+        """Reduce an order's size in place (keeping queue position); cancels it if nothing is left."""
+        slot = self._slots[order_id]
+        if size >= self._size[slot]:
+            return self.cancel_order(order_id)
+        self._size[slot] -= size
+        levels = self._bid_levels if self._side[slot] == BUY else self._ask_levels
+        levels[self._price[slot]][1] -= size
+        return size
+
+    def get_order(self, order_id):
+        """Return (side, price, size) of a resting order."""
+        slot = self._slots[order_id]
+        side = 'buy' if self._side[slot] == BUY else 'sell'
+        return side, self.to_price(self._price[slot]), self._size[slot]
+
+    def queue_position(self, order_id):
+        """Volume queued ahead of an order at its price level."""
+        slot = self._slots[order_id]
+        levels = self._bid_levels if self._side[slot] == BUY else self._ask_levels
+        ahead = 0.0
+        for other in levels[self._price[slot]][0]:
+            if other == slot:
+                break
+            ahead += self._size[other]
+        return ahead
+
+    def __contains__(self, order_id):
+        return order_id in self._slots
+
+    def __len__(self):
+        return len(self._slots)
+
+    def submit_limit_order(self, side, price, size, order_id=None):
+        """
+        Match a limit order against the opposite side, then rest any remainder.
+        Returns (order ID or None if fully filled, list of (maker ID, price, size) fills).
+        """
+        fills = self._match(side, size, round(price / self.tick_size))
+        remaining = size - sum(f[2] for f in fills)
+        if remaining <= 1e-12:
+            return None, fills
+        return self.add_order(side, price, remaining, order_id), fills
+
+    def submit_market_order(self, side, size):
+        """Match a market order; returns the list of (maker ID, price, size) fills."""
+        return self._match(side, size, None)
+
+    def _match(self, side, size, limit_tick):
+        """Consume resting orders in price-time priority."""
+        if side == 'buy':
+            levels, keys, sign = self._ask_levels, self._ask_keys, SELL
+        else:
+            levels, keys, sign = self._bid_levels, self._bid_keys, BUY
+        sizes, oids, slots, free = self._size, self._oid, self._slots, self._free
+        fills = []
+        while size > 0 and keys:
+            tick = sign * keys[-1]
+            if limit_tick is not None and (tick > limit_tick if side == 'buy' else tick < limit_tick):
+                break
+            level = levels[tick]
+            queue = level[0]
+            price = self.to_price(tick)
+            while queue:
+                slot = queue[0]
+                order_size = sizes[slot]
+                if order_size == 0.0:
+                    # Cancelled order, recycle its slot
+                    queue.popleft()
+                    free.append(slot)
+                    continue
+                if order_size > size:
+                    sizes[slot] = order_size - size
+                    level[1] -= size
+                    fills.append((oids[slot], price, size))
+                    size = 0
+                    break
+                queue.popleft()
+                free.append(slot)
+                del slots[oids[slot]]
+                sizes[slot] = 0.0
+                level[1] -= order_size
+                level[2] -= 1
+                size -= order_size
+                fills.append((oids[slot], price, order_size))
+                if size <= 0:
+                    break
+            if level[2] == 0:
+                free.extend(queue)
+                del levels[tick]
+                keys.pop()
+        return fills
+
+    def _drop_level(self, levels, tick, side_code):
+        """Remove an empty level and recycle the dead slots still queued there."""
+        self._free.extend(levels.pop(tick)[0])
+        keys = self._bid_keys if side_code == BUY else self._ask_keys
+        key = tick * side_code
+        del keys[bisect_left(keys, key)]
+
+    def _compact(self, level):
+        """Drop cancelled slots from a level queue."""
+        sizes = self._size
+        live = deque(slot for slot in level[0] if sizes[slot] > 0.0)
+        self._free.extend(slot for slot in level[0] if sizes[slot] == 0.0)
+        level[0] = live
+
+    # ------------------------------------------------------------------
+    # Aggregated L2 interface (compatible with OrderBook.OrderBook)
+    # ------------------------------------------------------------------
+
+    def add_bid(self, price, size):
+        return self.add_order('buy', price, size)
+
+    def add_ask(self, price, size):
+        return self.add_order('sell', price, size)
+
+    def remove_bid(self, price, size):
+        self._remove_volume(self._bid_levels, round(price / self.tick_size), size)
+
+    def remove_ask(self, price, size):
+        self._remove_volume(self._ask_levels, round(price / self.tick_size), size)
+
+    def _remove_volume(self, levels, tick, size):
+        """Cancel volume at a level, newest orders first (they have the worst queue position)."""
+        sizes = self._size
+        level = levels.get(tick)
+        if level is not None and size >= level[1] * (1 - 1e-9):
+            # Whole level; the running volume may differ from the order sizes by rounding
+            for slot in list(level[0]):
+                if sizes[slot] > 0.0:
+                    self.cancel_order(self._oid[slot])
+            return
+        while size > 0 and tick in levels:
+            queue = levels[tick][0]
+            slot = queue[-1]
+            order_size = sizes[slot]
+            if order_size == 0.0:
+                # Cancelled order at the back of the queue, recycle its slot
+                queue.pop()
+                self._free.append(slot)
+            elif order_size > size:
+                sizes[slot] = order_size - size
+                levels[tick][1] -= size
+                return
+            else:
+                size -= order_size
+                self.cancel_order(self._oid[slot])
+
+    def match_market_order(self, side, size, limit_price=None):
+        """Same as OrderBook.match_market_order: returns (price, size) fills."""
+        limit_tick = None if limit_price is None else round(limit_price / self.tick_size)
+        fills = self._match(side, size, limit_tick)
+        # Merge per-order fills into per-level fills
+        merged = []
+        for _, price, traded in fills:
+            if merged and merged[-1][0] == price:
+                merged[-1] = (price, merged[-1][1] + traded)
+            else:
+                merged.append((price, traded))
+        return merged
+
+    def get_best_bid(self):
+        """Return the best (highest) bid price and its volume."""
+        if not self._bid_keys:
+            return None, 0
+        tick = self._bid_keys[-1]
+        return self.to_price(tick), self._bid_levels[tick][1]
+
+    def get_best_ask(self):
+        """Return the best (lowest) ask price and its volume."""
+        if not self._ask_keys:
+            return None, 0
+        tick = -self._ask_keys[-1]
+        return self.to_price(tick), self._ask_levels[tick][1]
+
+    def get_bid_ask_spread(self):
+        best_bid, _ = self.get_best_bid()
+        best_ask, _ = self.get_best_ask()
+        if best_bid is not None and best_ask is not None:
+            return best_ask - best_bid
+        return None
+
+    def get_market_depth(self, levels=5):
+        """
+        Return the top N bids and asks.
+        Bids: Sorted descending by price.
+        Asks: Sorted ascending by price.
+        """
+        bids = [(self.to_price(t), self._bid_levels[t][1]) for t in reversed(self._bid_keys[-levels:])]
+        asks = [(self.to_price(-k), self._ask_levels[-k][1]) for k in reversed(self._ask_keys[-levels:])]
+        return {
+            'bids': bids,
+            'asks': asks
+        }
+
+    def __str__(self):
+        depth = self.get_market_depth(levels=len(self._bid_keys) + len(self._ask_keys))
+        return f"Bids (price:volume): {depth['bids']}\nAsks (price:volume): {depth['asks']}"
+
+
+class _LevelView(Mapping):
+    """Read-only price -> aggregated volume view of one side of an L3OrderBook."""
+
+    def __init__(self, levels, tick_size):
+        self._levels = levels
+        self._tick_size = tick_size
+        self._decimals = _tick_decimals(tick_size)
+
+    def __getitem__(self, price):
+        return self._levels[round(price / self._tick_size)][1]
+
+    def __contains__(self, price):
+        return round(price / self._tick_size) in self._levels
+
+    def __iter__(self):
+        return (round(tick * self._tick_size, self._decimals) for tick in self._levels)
+
+    def __len__(self):
+        return len(self._levels)
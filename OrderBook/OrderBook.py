@@ -45,6 +45,32 @@ class OrderBook:
             return best_ask - best_bid
         return None
 
+    def match_market_order(self, side, size, limit_price=None):
+        """
+        Match an incoming order against the opposite side of the book.
+        A 'buy' consumes asks from the lowest price up, a 'sell' consumes bids
+        from the highest price down, stopping at limit_price if given.
+        Returns the list of (price, size) fills; unfilled size is dropped.
+        """
+        if side == 'buy':
+            book, remove = self.ask_volume, self.remove_ask
+            levels = sorted(book.keys())
+            crosses = lambda price: limit_price is None or price <= limit_price
+        else:
+            book, remove = self.bid_volume, self.remove_bid
+            levels = sorted(book.keys(), reverse=True)
+            crosses = lambda price: limit_price is None or price >= limit_price
+
+        fills = []
+        for price in levels:
+            if size <= 0 or not crosses(price):
+                break
+            traded = min(size, book[price])
+            remove(price, traded)
+            fills.append((price, traded))
+            size -= traded
+        return fills
+
     def get_market_depth(self, levels=5):
         """
         Return the top N bids and asks. 
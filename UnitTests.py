@@ -1,5 +1,36 @@
 import unittest
 from OrderBook.OrderBook import OrderBook  # Assuming the OrderBook class is in a file named orderbook.py
+from OrderBook.L3OrderBook import L3OrderBook
+from simulation.MatchingEngine import MatchingEngine
+from simulation.OrderFlowGenerator import OrderFlowGenerator, MARKET
+from simulation.L2DeltaStream import L2DeltaEncoder, L2DeltaStream
+from simulation.ResultCache import ResultCache
+from simulation.BookDataset import BookDataset
+from data_generator.JumpDiffusionModel import JumpDiffusionModel
+from data_generator.VarianceGammaModel import VarianceGammaModel
+from data_generator.benchmark_models import loop_variance_gamma
+from data_generator.RegimeSwitchingModel import RegimeSwitchingModel
+from data_generator.MultiAssetModel import MultiAssetModel
+from data_generator.SessionCalendar import SessionCalendar
+from simulation.IntegratedDataGenerator import IntegratedDataGenerator
+from data_generator.validate_heston import make_model, exact_values, terminal_statistics
+from data_generator import accelerate
+from data_generator.calibration import calibrate, return_moments, simulated_moments
+from CleanCSV import process_csv
+from instrumentation import PROFILER, Profiler, profile_session
+from rendering import lttb_indices, minmax_indices, downsample_frame
+from simulation.LiveStream import LiveSimulation, Sink, QueueSink, FileSink, TCPSink, subscribe
+import numpy as np
+import pandas as pd
+import asyncio
+import json
+import random
+import tempfile
+import contextlib
+import io
+import os
+import subprocess
+import sys
 
 class TestOrderBook(unittest.TestCase):
 
@@ -75,5 +106,659 @@ class TestOrderBook(unittest.TestCase):
         self.assertLess(self.ob.bids[0][0], initial_best_bid)
         self.assertLess(self.ob.asks[0][0], initial_best_ask)
 
+class TestMatchingEngine(unittest.TestCase):
+
+    class Trader:
+        def __init__(self):
+            self.order_sink = None
+            self.fills = []
+
+        def on_fill(self, price, quantity, timestamp=None):
+            self.fills.append((price, quantity))
+
+    def setUp(self):
+        self.ob = OrderBook()
+        self.ob.add_bid(100, 10)
+        self.ob.add_bid(99, 15)
+        self.ob.add_ask(101, 12)
+        self.ob.add_ask(102, 8)
+
+    def test_match_market_order(self):
+        fills = self.ob.match_market_order('buy', 15)
+        self.assertEqual(fills, [(101, 12), (102, 3)])
+        self.assertEqual(self.ob.get_best_ask(), (102, 5))
+
+    def test_match_market_order_limit(self):
+        fills = self.ob.match_market_order('sell', 30, limit_price=100)
+        self.assertEqual(fills, [(100, 10)])
+        self.assertEqual(self.ob.get_best_bid(), (99, 15))
+
+    def test_batch_orders_share_levels_pro_rata(self):
+        a, b = self.Trader(), self.Trader()
+        engine = MatchingEngine(self.ob, [a, b])
+        engine.submit(a, 10)
+        engine.submit(b, 10)
+        self.assertEqual(engine.match(), 20)
+        # Both take half of each level: 6 @ 101 and 4 @ 102
+        for trader in (a, b):
+            price, quantity = trader.fills[0]
+            self.assertAlmostEqual(quantity, 10)
+            self.assertAlmostEqual(price, (6 * 101 + 4 * 102) / 10)
+        self.assertIsNone(self.ob.get_best_ask()[0])
+
+    def test_limit_order_rests_and_fills_passively(self):
+        maker, taker = self.Trader(), self.Trader()
+        engine = MatchingEngine(self.ob, [maker, taker])
+        engine.submit(maker, -5, limit_price=100.5)
+        engine.match()
+        self.assertEqual(self.ob.get_best_ask(), (100.5, 5))
+        self.assertEqual(maker.fills, [])
+
+        engine.submit(taker, 7)
+        engine.match()
+        self.assertEqual(taker.fills, [((5 * 100.5 + 2 * 101) / 7, 7)])
+        self.assertEqual(maker.fills, [(100.5, -5)])
+
+class TestL3OrderBook(unittest.TestCase):
+
+    def setUp(self):
+        self.ob = L3OrderBook(tick_size=0.5)
+        self.first = self.ob.add_order('sell', 101, 5)
+        self.second = self.ob.add_order('sell', 101, 3)
+        self.ob.add_order('sell', 102, 8)
+        self.ob.add_order('buy', 100, 10)
+
+    def test_price_time_priority(self):
+        fills = self.ob.submit_market_order('buy', 9)
+        self.assertEqual(fills, [(self.first, 101, 5), (self.second, 101, 3), (3, 102, 1)])
+        self.assertNotIn(self.first, self.ob)
+        self.assertEqual(self.ob.get_best_ask(), (102, 7))
+
+    def test_partial_fill_keeps_queue_position(self):
+        third = self.ob.add_order('sell', 101, 4)
+        self.ob.submit_market_order('buy', 2)
+        self.assertEqual(self.ob.get_order(self.first), ('sell', 101, 3))
+        self.assertEqual(self.ob.queue_position(third), 6)
+
+    def test_cancel(self):
+        self.assertEqual(self.ob.cancel_order(self.first), 5)
+        self.assertEqual(self.ob.queue_position(self.second), 0)
+        self.assertEqual(self.ob.submit_market_order('buy', 1), [(self.second, 101, 1)])
+        self.ob.cancel_order(self.second)
+        self.assertEqual(self.ob.get_best_ask(), (102, 8))
+
+    def test_limit_order_rests_remainder(self):
+        order_id, fills = self.ob.submit_limit_order('buy', 101, 10)
+        self.assertEqual([f[2] for f in fills], [5, 3])
+        self.assertEqual(self.ob.get_order(order_id), ('buy', 101, 2))
+        self.assertEqual(self.ob.get_best_bid(), (101, 2))
+
+    def test_l2_interface_matches_order_book(self):
+        l2 = OrderBook()
+        for book in (l2, self.ob):
+            if book is l2:
+                book.add_ask(101, 8)
+                book.add_ask(102, 8)
+                book.add_bid(100, 10)
+            book.add_bid(99.5, 4)
+            book.remove_ask(102, 3)
+            book.match_market_order('buy', 6)
+        self.assertEqual(self.ob.get_market_depth(), l2.get_market_depth())
+        self.assertEqual(dict(self.ob.ask_volume), dict(l2.ask_volume))
+
+    def test_decimal_prices_match_order_book(self):
+        # Tick multiples such as 10099 * 0.01 must come out as 100.99, not 100.99000000000001
+        l2, l3 = OrderBook(), L3OrderBook(tick_size=0.01)
+        for book in (l2, l3):
+            for i in range(1, 6):
+                book.add_bid(round(101 - 0.01 * i, 2), i)
+                book.add_ask(round(101 + 0.01 * i, 2), i)
+            book.remove_bid(100.99, 0.5)
+            fills = book.match_market_order('buy', 4)
+            self.assertEqual(fills, [(101.01, 1), (101.02, 2), (101.03, 1)])
+        self.assertEqual(l3.get_market_depth(), l2.get_market_depth())
+        self.assertEqual(dict(l3.bid_volume), dict(l2.bid_volume))
+        self.assertEqual(l3.get_best_ask(), l2.get_best_ask())
+
+    def test_passive_fill_on_cent_ticks(self):
+        # 100.99 on a 0.01 grid: the resting order must match the price the book reports
+        book = L3OrderBook(tick_size=0.01)
+        book.add_ask(101.5, 10)
+        maker, taker = TestMatchingEngine.Trader(), TestMatchingEngine.Trader()
+        engine = MatchingEngine(book, [maker, taker], tick_size=0.01)
+        engine.submit(maker, -5, limit_price=100.99)
+        engine.match()
+        engine.submit(taker, 5)
+        engine.match()
+        self.assertEqual(taker.fills, [(100.99, 5)])
+        self.assertEqual(maker.fills, [(100.99, -5)])
+        self.assertFalse(any(engine._resting['sell'].values()))
+
+    def test_matching_engine_on_l3_book(self):
+        engine = MatchingEngine(self.ob)
+        trader = TestMatchingEngine.Trader()
+        engine.add_participant(trader)
+        engine.submit(trader, 10)
+        self.assertEqual(engine.match(), 10)
+        self.assertEqual(trader.fills, [((8 * 101 + 2 * 102) / 10, 10)])
+
+class TestOrderFlowGenerator(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.flow = OrderFlowGenerator(tick_size=0.01, limit_rate=20, cancel_rate=10, market_rate=5)
+
+    def test_event_rates(self):
+        self.flow.sample(np.arange(2001) * 0.01, np.full(2001, 100.0))
+        counts = np.bincount(self.flow.event_types, minlength=3) / 2000
+        np.testing.assert_allclose(counts, [20, 10, 5], rtol=0.05)
+        self.assertTrue(np.all(np.diff(self.flow.event_times) >= 0))
+
+    def test_market_orders_follow_price_moves(self):
+        prices = 100 * np.exp(np.cumsum(np.random.normal(0, 0.01, 2001)))
+        self.flow.sample(np.arange(2001) * 0.01, prices)
+        market = self.flow.event_types == MARKET
+        up = np.diff(prices)[np.floor(self.flow.event_times / 0.01).astype(int)] > 0
+        self.assertGreater(self.flow.event_buys[market & up].mean(), 0.6)
+        self.assertLess(self.flow.event_buys[market & ~up].mean(), 0.4)
+
+    def test_apply_step_records_trades(self):
+        ob = OrderBook()
+        for i in range(1, 6):
+            ob.add_bid(round(100 - i * 0.01, 2), 1000)
+            ob.add_ask(round(100 + i * 0.01, 2), 1000)
+        self.flow.sample(np.arange(101) * 0.01, np.full(101, 100.0))
+        total = sum(self.flow.apply_step(ob, step, 100.0)[0] for step in range(101))
+        trades = self.flow.get_trades()
+        self.assertAlmostEqual(trades['Size'].sum(), total)
+        self.assertEqual(len(trades), (self.flow.event_types == MARKET).sum())
+        self.assertTrue(((trades['Side'] == 'buy') == (trades['Price'] > 100)).all())
+
+class TestL2DeltaStream(unittest.TestCase):
+
+    def setUp(self):
+        self.books = [
+            {'bids': [(99.9, 5), (99.8, 3)], 'asks': [(100.1, 4), (100.2, 6)]},
+            {'bids': [(99.9, 2), (99.8, 3)], 'asks': [(100.1, 4), (100.2, 6)]},
+            {'bids': [(99.8, 3)], 'asks': [(100.0, 1), (100.1, 4)]},
+            {'bids': [(99.8, 3), (99.7, 8)], 'asks': [(100.0, 1), (100.1, 4)]},
+        ]
+        encoder = L2DeltaEncoder(depth_levels=2, keyframe_interval=3)
+        for i, book in enumerate(self.books):
+            encoder.add({'Time': i, 'Price': 100.0}, book)
+        self.stream = encoder.finish()
+
+    def test_only_changes_are_written(self):
+        per_step = self.stream.deltas.groupby('Step').size().tolist()
+        # Keyframe, one resize, two drops and one add, keyframe
+        self.assertEqual(per_step, [4, 1, 3, 4])
+
+    def test_snapshots_are_rebuilt(self):
+        snapshots = self.stream.to_snapshots()
+        for step, book in enumerate(self.books):
+            snapshot = self.stream.snapshot(step)
+            for i, (price, size) in enumerate(book['bids'], start=1):
+                self.assertEqual((snapshot[f'BidPrice_{i}'], snapshot[f'BidSize_{i}']), (price, size))
+                self.assertEqual(snapshots.loc[step, f'BidSize_{i}'], size)
+            self.assertEqual(snapshot['AskPrice_1'], book['asks'][0][0])
+            self.assertAlmostEqual(snapshot['BidAskSpread'], book['asks'][0][0] - book['bids'][0][0])
+        self.assertIsNone(self.stream.snapshot(2)['BidPrice_2'])
+        self.assertTrue(np.isnan(snapshots.loc[2, 'BidPrice_2']))
+
+    def test_save_keeps_depth_of_thin_books(self):
+        # The book never fills the 4 levels, so the depth cannot be read from the keyframes
+        encoder = L2DeltaEncoder(depth_levels=4, keyframe_interval=3)
+        for i, book in enumerate(self.books):
+            encoder.add({'Time': i, 'Price': 100.0}, book)
+        with tempfile.TemporaryDirectory() as directory:
+            prefix = os.path.join(directory, 'stream')
+            encoder.finish().save(prefix)
+            loaded = L2DeltaStream.load(prefix)
+        self.assertEqual(loaded.depth_levels, 4)
+        self.assertIn('AskSize_4', loaded.to_snapshots().columns)
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.directory.name)
+        self.model = RegimeSwitchingModel(S0=100, regimes={'bull': {'mu': 0.1, 'sigma': 0.2}, 'bear': {'mu': -0.1, 'sigma': 0.3}},
+                                          transition_matrix=[[0.9, 0.1], [0.2, 0.8]], dt=1/252, T=1)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_seeded_results_are_reused(self):
+        first = self.cache.generate(self.model, seed=7)
+        second = self.cache.generate(self.model, seed=7)
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 1))
+        self.assertTrue(first.equals(second))
+        self.assertFalse(second['Price'].to_numpy().flags.writeable)  # memory-mapped
+        self.assertFalse(self.cache.generate(self.model, seed=8).equals(first))
+        self.model.transition_matrix = [[0.5, 0.5], [0.5, 0.5]]
+        self.cache.generate(self.model, seed=7)
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.generate(self.model, seed=1)
+        self.cache.generate(self.model, seed=2)
+        self.cache.max_bytes = self.cache.size() - 1
+        self.cache.generate(self.model, seed=1)  # touch seed 1
+        self.cache.evict()
+        self.assertEqual(len(self.cache.entries()), 1)
+        self.cache.generate(self.model, seed=1)
+        self.assertEqual(self.cache.hits, 2)
+
+class TestJumpDiffusionModel(unittest.TestCase):
+
+    def setUp(self):
+        self.model = JumpDiffusionModel(S0=10000, mu=0.05, sigma=0.2, lambda_jump=20, jump_mean=-0.01,
+                                        jump_std=0.02, T=1, dt=1/252, tick_size=0.01)
+
+    def test_paths_are_on_tick_grid(self):
+        np.random.seed(0)
+        data = self.model.generate()
+        self.assertEqual(len(data), self.model.N)
+        self.assertEqual(data['Price'].iloc[0], 10000)
+        ticks = data['Price'] / 0.01
+        np.testing.assert_allclose(ticks, np.round(ticks), atol=1e-6)
+
+    def test_log_return_moments(self):
+        paths = self.model.simulate_paths(2000, np.random.default_rng(0))
+        returns = np.diff(np.log(paths), axis=1)
+        m = self.model
+        mean = (m.mu - 0.5 * m.sigma**2) * m.dt + m.lambda_jump * m.dt * m.jump_mean
+        var = m.sigma**2 * m.dt + m.lambda_jump * m.dt * (m.jump_mean**2 + m.jump_std**2)
+        self.assertAlmostEqual(returns.mean(), mean, delta=6e-5)
+        self.assertAlmostEqual(returns.var(), var, delta=0.02 * var)
+
+class TestVarianceGammaModel(unittest.TestCase):
+
+    def test_matches_loop_distribution(self):
+        model = VarianceGammaModel(S0=10000, mu=0.05, sigma=0.2, nu=0.1, dt=1/252, T=40)
+        np.random.seed(0)
+        loop_returns = np.diff(np.log(loop_variance_gamma(model)))
+        paths = model.simulate_paths(4)
+        self.assertEqual(paths.shape, (4, model.N))
+        returns = np.diff(np.log(paths), axis=1)
+        self.assertAlmostEqual(returns.var(), loop_returns.var(), delta=0.05 * loop_returns.var())
+        self.assertAlmostEqual(returns.mean(), loop_returns.mean(), delta=3e-4)
+
+class TestRegimeSwitchingModel(unittest.TestCase):
+
+    def setUp(self):
+        regimes = {'bull': {'mu': 0.07, 'sigma': 0.15}, 'bear': {'mu': -0.02, 'sigma': 0.25},
+                   'crash': {'mu': -0.5, 'sigma': 0.6}}
+        self.P = np.array([[0.9, 0.1, 0.0], [0.2, 0.7, 0.1], [0.0, 1.0, 0.0]])
+        self.model = RegimeSwitchingModel(S0=100, regimes=regimes, transition_matrix=self.P, dt=1/252, T=1)
+
+    def test_transition_frequencies(self):
+        regimes = self.model.sample_regimes(200000, np.random.default_rng(0))
+        self.assertEqual(regimes.dtype, np.int8)
+        counts = np.zeros((3, 3))
+        np.add.at(counts, (regimes[:-1], regimes[1:]), 1)
+        np.testing.assert_allclose(counts / counts.sum(axis=1, keepdims=True), self.P, atol=0.01)
+
+    def test_generate_regime_column(self):
+        np.random.seed(0)
+        data = self.model.generate()
+        self.assertEqual(len(data), self.model.N)
+        self.assertEqual(list(data['Regime'].cat.categories), ['bull', 'bear', 'crash'])
+        self.assertTrue(data['Regime'].isin(['bull', 'bear', 'crash']).all())
+
+    def test_flat_regimes_are_not_nudged(self):
+        # Like the original step loop, small moves get no random nudge: a flat path stays flat
+        model = RegimeSwitchingModel(S0=100, regimes={'flat': {'mu': 0.0, 'sigma': 0.0}},
+                                     transition_matrix=[[1.0]], dt=1/252, T=1)
+        prices = model.simulate_paths(3, np.random.default_rng(0))
+        np.testing.assert_allclose(prices, 100.0)
+
+class TestMultiAssetModel(unittest.TestCase):
+
+    def setUp(self):
+        self.correlation = [[1.0, 0.8, 0.0], [0.8, 1.0, -0.5], [0.0, -0.5, 1.0]]
+
+    def test_paths_have_the_target_correlation(self):
+        # Stochastic variances make Heston return correlations only approximately match
+        for dynamics, tolerance in (('gbm', 0.05), ('jumpdiffusion', 0.05), ('heston', 0.15)):
+            model = MultiAssetModel(S0=[500, 1000, 2000], mu=0.0, correlation=self.correlation, dt=1/252, T=20,
+                                    dynamics=dynamics, lambda_jump=1.0)
+            prices = model.simulate_paths(np.random.default_rng(1))
+            self.assertEqual(prices.shape, (3, model.N))
+            np.testing.assert_allclose(prices[:, 0], [500, 1000, 2000])
+            realized = np.corrcoef(np.diff(np.log(prices), axis=1))
+            np.testing.assert_allclose(realized, self.correlation, atol=tolerance)
+
+    def test_invalid_correlation_is_rejected(self):
+        with self.assertRaises(ValueError):
+            MultiAssetModel(S0=100, mu=0.0, correlation=[[1, 0.9], [0.9, 0.5]], dt=1/252, T=1)
+        with self.assertRaises(ValueError):
+            MultiAssetModel(S0=100, mu=0.0, correlation=[[1, 1.2], [1.2, 1]], dt=1/252, T=1)
+
+    def test_multi_book_snapshots(self):
+        generator = IntegratedDataGenerator('multiasset', S0=[100, 20, 35], mu=0.05, sigma=0.2, correlation=self.correlation,
+                                            names=['A', 'B', 'C'], dt=1/252, T=0.2, tick_size=0.01, initial_depth=5,
+                                            max_volume=100, price_step=0.01, spread_limit=0.05, depth_levels=3)
+        result = generator.run_simulation()
+        self.assertEqual(list(result), ['A', 'B', 'C'])
+        for df in result.values():
+            self.assertEqual(len(df), generator.model.N)
+            self.assertTrue((df['BidPrice_1'] < df['AskPrice_1']).all())
+            self.assertTrue((df['AskPrice_1'] - df['Price'] <= 0.05 + 1e-9).all())
+
+class TestSessionCalendar(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = SessionCalendar(start_date='2024-07-03', holidays=['2024-07-04'])
+
+    def test_timestamps_skip_nights_weekends_and_holidays(self):
+        stamps = self.calendar.datetimes(2 * 390 + 1, dt=1/(252 * 390))
+        self.assertEqual(str(stamps[0]), '2024-07-03 09:31:00')
+        self.assertEqual(str(stamps[389]), '2024-07-03 16:00:00')
+        self.assertEqual(str(stamps[390]), '2024-07-05 09:31:00')
+        self.assertEqual(str(stamps[780]), '2024-07-08 09:31:00')
+        daily = self.calendar.datetimes(3, dt=1/252)
+        self.assertEqual([str(t) for t in daily], ['2024-07-03 16:00:00', '2024-07-05 16:00:00', '2024-07-08 16:00:00'])
+        with self.assertRaises(ValueError):
+            self.calendar.timestamps(10, dt=2/252)
+
+    def test_intraday_profile_keeps_daily_variance(self):
+        model = JumpDiffusionModel(S0=1000, mu=0, sigma=0.2, lambda_jump=0, jump_mean=0, jump_std=0.01, T=2, dt=1/(252 * 78))
+        model.calendar = self.calendar
+        data = model.generate()
+        self.assertEqual(data['Timestamp'].dtype, np.int64)
+        returns = np.diff(np.log(model.simulate_paths(10, np.random.default_rng(0))), axis=1)
+        bar = np.arange(1, model.N) % 78
+        self.assertAlmostEqual(returns.std() * np.sqrt(252 * 78), 0.2, delta=0.01)
+        # Overnight gap on the first bar, U shape within the session
+        self.assertGreater(returns[:, bar == 0].std(), 3 * returns[:, bar == 1].std())
+        self.assertGreater(returns[:, bar == 1].std(), 1.5 * returns[:, bar == 39].std())
+
+    def test_intraday_profile_keeps_drift(self):
+        model = JumpDiffusionModel(S0=1000, mu=0.5, sigma=0.2, lambda_jump=0, jump_mean=0, jump_std=0.01, T=2, dt=1/(252 * 78))
+        model.calendar = self.calendar
+        returns = np.diff(np.log(model.simulate_paths(400, np.random.default_rng(0))), axis=1).sum(axis=1)
+        # Only the diffusion is rescaled, not (mu - sigma^2 / 2) dt
+        self.assertAlmostEqual(returns.mean(), (0.5 - 0.5 * 0.2**2) * model.dt * (model.N - 1), delta=0.04)
+
+class TestCleanCSV(unittest.TestCase):
+
+    def test_chunked_output_matches_even_spacing(self):
+        model = JumpDiffusionModel(S0=100, mu=0, sigma=0.2, lambda_jump=0, jump_mean=0, jump_std=0.01, T=1, dt=1/252)
+        data = model.generate().assign(Variance=0.04, BidAskSpread=0.01)
+        with tempfile.TemporaryDirectory() as tmp:
+            data.to_csv(f'{tmp}/in.csv', index=False)
+            rows = process_csv(f'{tmp}/in.csv', f'{tmp}/out.csv', '2024-01-01', '2024-01-01 02:06', chunksize=100)
+            out = pd.read_csv(f'{tmp}/out.csv', parse_dates=['Datetime'])
+        self.assertEqual(rows, len(data))
+        self.assertEqual(list(out.columns), ['Datetime', 'Price'])
+        self.assertTrue((out['Datetime'].diff().iloc[1:] == pd.Timedelta(seconds=30)).all())
+        np.testing.assert_allclose(out['Price'], data['Price'])
+
+    def test_calendar_timestamps_are_kept(self):
+        model = JumpDiffusionModel(S0=100, mu=0, sigma=0.2, lambda_jump=0, jump_mean=0, jump_std=0.01, T=0.1, dt=1/252)
+        model.calendar = SessionCalendar(start_date='2024-07-03')
+        data = model.generate()
+        with tempfile.TemporaryDirectory() as tmp:
+            data.to_csv(f'{tmp}/in.csv', index=False)
+            process_csv(f'{tmp}/in.csv', f'{tmp}/out.csv', chunksize=7)
+            out = pd.read_csv(f'{tmp}/out.csv', parse_dates=['Datetime'])
+        self.assertTrue((out['Datetime'] == model.calendar.datetimes(model.N, model.dt)).all())
+
+class TestHestonQE(unittest.TestCase):
+
+    def test_coarse_qe_matches_exact_values(self):
+        # Stressed parameters where Euler is strongly biased at coarse steps
+        params = dict(S0=100, V0=0.04, mu=0.0, kappa=0.5, theta=0.04, sigma_v=1.0, rho=-0.9)
+        exact = exact_values(make_model(params, 1.0, 10, 'qe'))
+        rng = np.random.default_rng(1)
+        qe = terminal_statistics(make_model(params, 1.0, 10, 'qe'), 20000, rng)
+        euler = terminal_statistics(make_model(params, 1.0, 10, 'euler'), 20000, rng)
+
+        self.assertAlmostEqual(qe['E[V_T]'], exact['E[V_T]'], delta=0.003)
+        self.assertAlmostEqual(qe['Var[V_T]'], exact['Var[V_T]'], delta=0.003)
+        self.assertAlmostEqual(qe['ATM call'], exact['ATM call'], delta=0.15)
+        self.assertGreater(abs(euler['ATM call'] - exact['ATM call']), 1.0)
+
+    def test_generate_with_qe(self):
+        np.random.seed(0)
+        model = make_model(dict(S0=100, V0=0.04, mu=0.05, kappa=2, theta=0.04, sigma_v=0.3, rho=-0.7), 1.0, 12, 'qe')
+        data = model.generate()
+        self.assertEqual(list(data.columns), ['Time', 'Price', 'Variance'])
+        self.assertTrue((data['Variance'] >= 0).all())
+
+class TestCalibration(unittest.TestCase):
+
+    def test_moments_of_gaussian_returns(self):
+        rng = np.random.default_rng(0)
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(20, 2000)), axis=1))
+        moments = return_moments(prices, dt=1/252)
+        self.assertAlmostEqual(moments['volatility'], 0.01 * np.sqrt(252), delta=0.005)
+        self.assertAlmostEqual(moments['kurtosis'], 0, delta=0.1)
+        self.assertAlmostEqual(moments['acf_squared'], 0, delta=0.02)
+
+    def test_recovers_jump_diffusion_parameters(self):
+        true_model = JumpDiffusionModel(S0=100, mu=0, sigma=0.25, lambda_jump=20, jump_mean=0, jump_std=0.03, T=1, dt=1/252)
+        targets = simulated_moments(true_model, 1000, seed=1)
+        del targets['acf_squared']
+        model = JumpDiffusionModel(S0=100, mu=0, sigma=0.1, lambda_jump=20, jump_mean=0, jump_std=0.01, T=1, dt=1/252)
+        result = calibrate(model, targets, bounds={'sigma': (0.05, 1.0), 'jump_std': (0.001, 0.1)},
+                           num_paths=200, population=16, iterations=8, processes=1)
+        self.assertAlmostEqual(result['params']['sigma'], 0.25, delta=0.03)
+        self.assertAlmostEqual(result['params']['jump_std'], 0.03, delta=0.01)
+        self.assertEqual(model.sigma, 0.1)
+
+class TestAccelerateKernels(unittest.TestCase):
+
+    def kernel(self, name):
+        # The scalar-loop kernel as plain Python, whether or not Numba compiled it
+        kernel = getattr(accelerate, name)
+        return getattr(kernel, 'py_func', kernel)
+
+    def test_kernels_match_numpy(self):
+        rng = np.random.default_rng(0)
+        Z, U = rng.normal(size=(50, 4)), rng.random((50, 4))
+        for params in [(0.04, 2.0, 0.04, 0.3, 1/52), (0.04, 0.5, 0.04, 1.0, 1/12)]:
+            np.testing.assert_allclose(self.kernel('_euler_variance_kernel')(*params, Z),
+                                       accelerate._euler_variance_numpy(*params, Z))
+            np.testing.assert_allclose(self.kernel('_qe_variance_kernel')(*params, Z, U, 1.5),
+                                       accelerate._qe_variance_numpy(*params, Z, U, 1.5), atol=1e-12)
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_stages_are_recorded_only_while_enabled(self):
+        profiler = Profiler()
+        with profiler.timer('idle'):
+            pass
+        self.assertEqual(profiler.stats, {})
+
+        profiler.enable(trace=True)
+        for _ in range(3):
+            with profiler.timer('step', items=2):
+                pass
+        profiler.count('fills', 5)
+        profiler.disable()
+        report = {row['stage']: row for row in profiler.report()}
+        self.assertEqual((report['step']['calls'], report['step']['items']), (3, 6))
+        self.assertEqual((report['fills']['items'], report['fills']['seconds']), (5, 0))
+        self.assertEqual(len(profiler.trace_events), 3)
+
+    def test_simulation_stages(self):
+        generator = IntegratedDataGenerator('jumpdiffusion', S0=100, mu=0.05, sigma=0.2, lambda_jump=0.1, jump_mean=0,
+                                            jump_std=0.02, T=0.1, dt=1/252, tick_size=0.01, initial_depth=5,
+                                            max_volume=100, price_step=0.01, spread_limit=0.05, depth_levels=5)
+        with contextlib.redirect_stdout(io.StringIO()), profile_session() as profiler:
+            generator.run_simulation(order_flow=True)
+        stages = {row['stage']: row['calls'] for row in profiler.report()}
+        self.assertEqual(stages['order_book.update'], generator.model.N)
+        self.assertIn('order_flow.apply_step', stages)
+        self.assertFalse(PROFILER.enabled)
+
+class TestRendering(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.y = np.cumsum(rng.normal(size=100_000))
+        self.y[5000] += 100  # spike
+        self.x = np.arange(len(self.y)) / 252
+
+    def test_lttb_keeps_endpoints_and_spikes(self):
+        kept = lttb_indices(self.x, self.y, 1000)
+        self.assertEqual(len(kept), 1000)
+        self.assertEqual((kept[0], kept[-1]), (0, len(self.y) - 1))
+        self.assertTrue(np.all(np.diff(kept) > 0))
+        self.assertIn(5000, kept)
+
+    def test_minmax_keeps_extremes(self):
+        kept = minmax_indices(self.y, 1000)
+        self.assertLessEqual(len(kept), 1002)
+        self.assertEqual(self.y[kept].max(), self.y.max())
+        self.assertEqual(self.y[kept].min(), self.y.min())
+
+    def test_downsample_frame_keeps_last_row(self):
+        df = pd.DataFrame({'Time': self.x, 'Price': self.y, 'Variance': None})
+        small = downsample_frame(df, 'Time', ['Price', 'Variance'], 500)
+        self.assertEqual(len(small), 500)
+        self.assertEqual(small.index[-1], df.index[-1])
+        self.assertIs(downsample_frame(small, 'Time', ['Price'], None), small)
+
+class TestBookDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'Time': np.arange(100) / 252, 'Price': 100 + rng.normal(size=100).cumsum(),
+                                'Variance': np.nan})
+        for i in range(1, 8):
+            self.df[f'BidPrice_{i}'] = self.df['Price'] - 0.01 * i
+            self.df[f'BidSize_{i}'] = float(i)
+            self.df[f'AskPrice_{i}'] = self.df['Price'] + 0.01 * i
+            self.df[f'AskSize_{i}'] = float(i)
+        self.df.loc[10, 'AskPrice_7'] = np.nan
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_csv_store_random_access(self):
+        path = os.path.join(self.directory.name, 'book.csv')
+        self.df.to_csv(path, index=False)
+        dataset = BookDataset.from_csv(path, os.path.join(self.directory.name, 'store'), chunksize=30)
+        self.assertIsInstance(dataset.columns['Price'], np.memmap)
+        self.assertEqual((len(dataset), dataset.depth_levels), (100, 7))
+        self.assertEqual(dataset.nearest(10.4 / 252), 10)
+        self.assertEqual(dataset.nearest(10.6 / 252), 11)
+        self.assertEqual((dataset.nearest(-1), dataset.nearest(1), dataset.nearest(np.inf)), (0, 99, 99))
+        bids, asks = dataset.depth(10)
+        self.assertEqual((len(bids), len(asks)), (7, 6))
+        self.assertAlmostEqual(asks[0][0], self.df.loc[10, 'AskPrice_1'])
+
+    def test_depth_grid_is_bounded_and_conserves_size(self):
+        dataset = BookDataset.from_frame(self.df)
+        times, prices, bids, asks = dataset.depth_grid(time_bins=7, price_bins=50, block_rows=13)
+        self.assertEqual((bids.shape, asks.shape, len(times), len(prices)), ((7, 50), (7, 50), 7, 50))
+        # Average resting size per step: 1 + ... + 7 on each side (one ask level is missing at step 10)
+        np.testing.assert_allclose(bids.sum(axis=1), 28)
+        steps_per_bin = np.diff(np.append(np.round(times * 252), 100))
+        self.assertAlmostEqual((asks.sum(axis=1) * steps_per_bin).sum(), 28 * 100 - 7)
+
+    def test_unsorted_times(self):
+        dataset = BookDataset.from_frame(self.df.sample(frac=1, random_state=0))
+        position = dataset.nearest(42 / 252)
+        self.assertAlmostEqual(dataset.row(position)['Price'], self.df.loc[42, 'Price'])
+
+class TestLiveStream(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = IntegratedDataGenerator('jumpdiffusion', S0=100, mu=0.05, sigma=0.2, lambda_jump=0.1,
+                                                 jump_mean=0, jump_std=0.02, T=0.2, dt=1/252, tick_size=0.01,
+                                                 initial_depth=5, max_volume=100, price_step=0.01,
+                                                 spread_limit=0.05, depth_levels=5)
+
+    def test_sinks_receive_the_simulation(self):
+        random.seed(3)
+        np.random.seed(3)
+        expected = self.generator.run_simulation(order_flow=True)
+
+        with tempfile.TemporaryDirectory() as directory:
+            queue = QueueSink()
+            server = TCPSink('127.0.0.1', 0, min_clients=1)
+            path = os.path.join(directory, 'live.jsonl')
+            live = LiveSimulation(self.generator, [queue, server, FileSink(path)])
+
+            async def main():
+                async def client():
+                    while server.port == 0:
+                        await asyncio.sleep(0.001)
+                    return [step async for step in subscribe('127.0.0.1', server.port)]
+                received = asyncio.create_task(client())
+                consumed = asyncio.create_task(self._collect(queue))
+                random.seed(3)
+                np.random.seed(3)
+                await live.run(order_flow=True)
+                return await consumed, await received
+
+            queued, served = asyncio.run(main())
+            with open(path) as f:
+                written = [json.loads(line) for line in f]
+
+        for steps in (queued, served, written):
+            self.assertEqual([step['Step'] for step in steps], list(range(len(expected))))
+            df = pd.DataFrame(steps)[expected.columns].astype(float)
+            pd.testing.assert_frame_equal(df, expected.astype(float))
+        self.assertEqual([row['delivered'] for row in live.stats()], [len(expected)] * 3)
+
+    def test_drop_newest_keeps_the_pace(self):
+        queue = QueueSink(maxsize=4, backpressure='drop_newest')
+        live = LiveSimulation(self.generator, [queue])
+
+        async def main():
+            consumed = asyncio.create_task(self._collect(queue, delay=0.005))
+            await live.run()
+            return await consumed
+
+        steps = asyncio.run(main())
+        stats = live.stats()[0]
+        self.assertGreater(stats['dropped'], 0)
+        self.assertEqual(stats['delivered'] + stats['dropped'], self.generator.model.N)
+        self.assertEqual(len(steps), stats['delivered'])
+        self.assertEqual(steps[0]['Step'], 0)
+
+    def test_failed_sink_stops_a_blocked_run(self):
+        class FailingSink(Sink):
+            async def deliver(self, message):
+                # Fails while the publisher waits for room in the full queue
+                await asyncio.sleep(0.01)
+                raise OSError("disk full")
+
+        live = LiveSimulation(self.generator, [FailingSink(maxsize=1)])
+        with self.assertRaisesRegex(OSError, "disk full"):
+            asyncio.run(asyncio.wait_for(live.run(), timeout=10))
+        # The error stops the run at once rather than the timeout cancelling a hung publish
+        self.assertLess(live.elapsed, 5)
+
+    def test_pace(self):
+        # One step is a 6.5 hour trading day; at 100 days per second it lasts 10 ms
+        live = LiveSimulation(self.generator, [], speed=6.5 * 3600 * 100)
+        self.assertAlmostEqual(live.step_interval(), 0.01)
+        self.assertEqual(LiveSimulation(self.generator, []).step_interval(), 0.0)
+
+    @staticmethod
+    async def _collect(queue, delay=0):
+        steps = []
+        async for step in queue:
+            steps.append(step)
+            await asyncio.sleep(delay)
+        return steps
+
+class TestStartup(unittest.TestCase):
+
+    def test_entry_points_do_not_load_the_scientific_stack(self):
+        # --help and argument errors must not pay for NumPy, pandas or matplotlib
+        code = ("import sys; sys.path.insert(0, 'backtester'); import simulation.simulator, run_backtest; "
+                "print(sorted({'numpy', 'pandas', 'matplotlib', 'numba'} & set(sys.modules)))")
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.stdout.strip(), '[]')
+
 if __name__ == '__main__':
     unittest.main()
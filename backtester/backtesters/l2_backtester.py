@@ -1,8 +1,24 @@
 # backtesters/l2_backtester.py
 from typing import Dict
 import pandas as pd
+from contextlib import nullcontext
 from utils.orderbook import OrderBook
 
+try:
+    # Stage timers of the repository's instrumentation module (on the path via run_backtest.py)
+    from instrumentation import PROFILER
+except ImportError:
+    class _NullProfiler:
+        """Stand-in when the backtester is used on its own: timers and counters do nothing."""
+
+        def timer(self, name, items=0):
+            return nullcontext()
+
+        def count(self, name, items=1):
+            pass
+
+    PROFILER = _NullProfiler()
+
 class L2Backtester:
     def __init__(self, data: pd.DataFrame, strategy):
         """
@@ -65,20 +81,25 @@ class L2Backtester:
         Returns:
             Dict containing backtest results
         """
-        for idx, row in self.data.iterrows():
-            # Update orderbook state
-            self.update_orderbook(row)
-            
-            # Get strategy signal
-            should_trade, side, size = self.strategy.generate_signal(row)
-            
-            if should_trade:
-                # Execute order
-                fill = self.execute_order(size, side, row)
-                if fill:
-                    self.strategy.update_position(fill['size'], fill['side'])
-                    self.fills.append(fill)
-                    
+        with PROFILER.timer('backtester.run', len(self.data)):
+            for idx, row in self.data.iterrows():
+                # Update orderbook state
+                with PROFILER.timer('backtester.update_orderbook', 1):
+                    self.update_orderbook(row)
+
+                # Get strategy signal
+                with PROFILER.timer('backtester.generate_signal', 1):
+                    should_trade, side, size = self.strategy.generate_signal(row)
+
+                if should_trade:
+                    # Execute order
+                    with PROFILER.timer('backtester.execute_order', 1):
+                        fill = self.execute_order(size, side, row)
+                    if fill:
+                        self.strategy.update_position(fill['size'], fill['side'])
+                        self.fills.append(fill)
+                        PROFILER.count('backtester.fills')
+
         return self.calculate_results()
         
     def calculate_results(self) -> Dict:
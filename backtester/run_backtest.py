@@ -1,12 +1,41 @@
 # run_backtest.py
-import pandas as pd
+import argparse
 import os
+import sys
 from pathlib import Path
-from strategies.l2_orderbook_strategy import L2OrderbookStrategy
-from backtesters.l2_backtester import L2Backtester
-from visualizer.pnl_visualizer import PnLVisualizer
+
+# The instrumentation and rendering modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrumentation import PROFILER, profile_session
+
+# pandas, the backtester and the visualizer are imported in run(), when a stage needs them,
+# so --help and argument errors return without loading the scientific stack
 
 def main():
+    parser = argparse.ArgumentParser(description='Backtest the L2 orderbook strategy on simulator output')
+    parser.add_argument('--plot', type=str, choices=['show', 'save', 'none'], default='show',
+                        help='Display and save the PnL plot, only save it (headless, rendered in a background process), or skip it')
+    parser.add_argument('--max_plot_points', type=int, default=None,
+                        help='Points kept per plotted series (LTTB downsampling, default 2000)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print wall time, calls and throughput of every backtest stage')
+    parser.add_argument('--profile_output', type=str, default=None,
+                        help='With --profile, also write a Chrome trace (.json) or a cProfile dump (any other extension)')
+    args = parser.parse_args()
+
+    if args.profile or args.profile_output is not None:
+        with profile_session(args.profile_output):
+            run(args)
+    else:
+        run(args)
+
+def run(args):
+    with PROFILER.timer('imports'):
+        import pandas as pd
+        from strategies.l2_orderbook_strategy import L2OrderbookStrategy
+        from backtesters.l2_backtester import L2Backtester
+
     # Load L2 data
     current_file_path = os.path.abspath(__file__)
     parent_dir = os.path.dirname(os.path.dirname(current_file_path))
@@ -14,9 +43,10 @@ def main():
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"L2 data file not found: {data_path}")
         
-    data = pd.read_csv(data_path)
-    # Convert datetime strings to pandas datetime objects
-    data['Datetime'] = pd.to_datetime(data['Datetime'])
+    with PROFILER.timer('backtester.load_data'):
+        data = pd.read_csv(data_path)
+        # Convert datetime strings to pandas datetime objects
+        data['Datetime'] = pd.to_datetime(data['Datetime'])
     print(f"Loaded L2 data: {len(data)} rows")
     
     # Strategy parameters
@@ -39,6 +69,12 @@ def main():
     for metric, value in results.items():
         print(f"{metric}: {value}")
 
+    if args.plot == 'none':
+        return
+
+    from rendering import DEFAULT_MAX_POINTS, BackgroundRenderer, downsample_frame
+    from visualizer.pnl_visualizer import PnLVisualizer, PLOTTED_COLUMNS
+
     # Initialize visualizer
     visualizer = PnLVisualizer(figsize=(15, 10))
     
@@ -51,17 +87,27 @@ def main():
     
     # Calculate and plot PnL metrics
     try:
-        pnl_df = visualizer.calculate_pnl_metrics(
-            trades=backtester.fills,
-            prices=data['Price'].tolist(),
-            timestamps=timestamps
-        )
-        
-        visualizer.plot_pnl(
-            df=pnl_df,
-            strategy_name='L2 Orderbook Strategy',
-            save_path=output_dir / 'l2_strategy_pnl.png'
-        )
+        with PROFILER.timer('visualizer.pnl_metrics', len(data)):
+            pnl_df = visualizer.calculate_pnl_metrics(
+                trades=backtester.fills,
+                prices=data['Price'].tolist(),
+                timestamps=timestamps
+            )
+            pnl_df = downsample_frame(pnl_df, None, PLOTTED_COLUMNS, args.max_plot_points or DEFAULT_MAX_POINTS)
+
+        with PROFILER.timer('visualizer.plot'):
+            if args.plot == 'save':
+                # Headless: render with the Agg backend in a separate process
+                with BackgroundRenderer() as renderer:
+                    renderer.submit(visualizer.plot_pnl, pnl_df, 'L2 Orderbook Strategy',
+                                    output_dir / 'l2_strategy_pnl.png', show=False, max_points=None)
+            else:
+                visualizer.plot_pnl(
+                    df=pnl_df,
+                    strategy_name='L2 Orderbook Strategy',
+                    save_path=output_dir / 'l2_strategy_pnl.png',
+                    max_points=None
+                )
         
         print("\nVisualization has been saved to data/output/l2_strategy_pnl.png")
         
@@ -2,10 +2,12 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from typing import List, Dict, Optional
 from datetime import datetime
 
+# Series drawn by plot_pnl
+PLOTTED_COLUMNS = ['price', 'position', 'unrealized_pnl', 'total_pnl']
+
 class PnLVisualizer:
     def __init__(self, figsize=(15, 10)):
         self.figsize = figsize
@@ -72,14 +74,28 @@ class PnLVisualizer:
         
         df['total_pnl'] = df['realized_pnl'] + df['unrealized_pnl']
         if len(df) > 1:
-            df['total_pnl'][0] = df['realized_pnl'][1] + df['unrealized_pnl'][0]
+            df.iloc[0, df.columns.get_loc('total_pnl')] = df['realized_pnl'].iloc[1] + df['unrealized_pnl'].iloc[0]
         
         return df
         
-    def plot_pnl(self, df: pd.DataFrame, strategy_name: str = '', save_path: Optional[str] = None):
+    def plot_pnl(self, df: pd.DataFrame, strategy_name: str = '', save_path: Optional[str] = None,
+                 show: bool = True, max_points: Optional[int] = 2000):
         """
         Plot PnL metrics
+
+        Args:
+            show: Display the figure (False to only save it, e.g. with the Agg backend)
+            max_points: Points kept per series (LTTB downsampling), None to plot every row.
+                Ignored when the repository's rendering module is not on the path.
         """
+        import matplotlib.pyplot as plt
+
+        try:
+            from rendering import downsample_frame
+        except ImportError:
+            downsample_frame = None
+        if downsample_frame is not None:
+            df = downsample_frame(df, None, PLOTTED_COLUMNS, max_points)
         fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=self.figsize)
         
         # Plot prices and position
@@ -106,4 +122,6 @@ class PnLVisualizer:
         
         if save_path:
             plt.savefig(save_path)
-        plt.show()
\ No newline at end of file
+        if show:
+            plt.show()
+        plt.close(fig)
\ No newline at end of file
@@ -0,0 +1,357 @@
+import argparse
+import fnmatch
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+'''
+Performance benchmarks of the data generators, the order book, the
+simulation loop, the L2 backtester and the market participants, each at
+several input sizes, and the startup time of the command-line tools. Every case reports its best time over a few runs and a
+throughput (steps, operations, rows or ticks per second). Results are
+written as JSON; --compare checks them against a stored baseline and exits
+with status 1 when a case got slower than the tolerance allows, so
+regressions can be caught before they are merged.
+
+    python benchmarks.py --output benchmarks/baseline.json
+    python benchmarks.py --compare benchmarks/baseline.json
+'''
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# The backtester and the participants are separate projects with their own import roots
+for path in (os.path.join(ROOT, 'backtester'), os.path.join(ROOT, 'market_participants_project')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from OrderBook.OrderBook import OrderBook
+from data_generator.HestonModel import HestonModel
+from data_generator.JumpDiffusionModel import JumpDiffusionModel
+from data_generator.RegimeSwitchingModel import RegimeSwitchingModel
+from data_generator.VarianceGammaModel import VarianceGammaModel
+from data_generator.MultiAssetModel import MultiAssetModel
+from data_generator.SessionCalendar import SessionCalendar
+from simulation.IntegratedDataGenerator import IntegratedDataGenerator
+from backtesters.l2_backtester import L2Backtester
+from strategies.l2_orderbook_strategy import L2OrderbookStrategy
+from market_participants.traders import (MarketMaker, PositionTaker, StatisticalArbitrageTrader, TWAPTrader,
+                                         VWAPTrader, MarketMakerPopulation)
+from market_participants.configs.participant_configs import (MarketMakerConfig, PositionTakerConfig, StatArbConfig,
+                                                             TWAPConfig, VWAPConfig)
+
+FORMAT_VERSION = 1
+
+# name, unit, sizes, setup(size) -> (run, units); setup is repeated before every timed run
+Case = namedtuple('Case', ['name', 'unit', 'sizes', 'setup'])
+
+SIMULATION_PARAMS = dict(S0=100, mu=0.05, sigma=0.2, lambda_jump=10, jump_mean=0.0, jump_std=0.02, tick_size=0.01,
+                         initial_depth=5, max_volume=100, price_step=0.01, spread_limit=0.05, depth_levels=5)
+
+
+# ----------------------------------------------------------------------
+# Data generators: steps per second of generate()
+# ----------------------------------------------------------------------
+
+def model_case(factory):
+    def setup(size):
+        model = factory(dt=1 / size, T=1)
+        np.random.seed(0)
+        return model.generate, model.N
+    return setup
+
+
+GENERATORS = {
+    'heston_euler': lambda dt, T: HestonModel(S0=100, V0=0.04, mu=0.05, kappa=2.0, theta=0.04, sigma_v=0.3, rho=-0.5,
+                                              dt=dt, T=T),
+    'heston_qe': lambda dt, T: HestonModel(S0=100, V0=0.04, mu=0.05, kappa=2.0, theta=0.04, sigma_v=0.3, rho=-0.5,
+                                           dt=dt, T=T, scheme='qe'),
+    'jumpdiffusion': lambda dt, T: JumpDiffusionModel(S0=100, mu=0.05, sigma=0.2, lambda_jump=10, jump_mean=0.0,
+                                                      jump_std=0.02, T=T, dt=dt),
+    'variancegamma': lambda dt, T: VarianceGammaModel(S0=100, mu=0.05, sigma=0.2, nu=0.1, dt=dt, T=T),
+    'regimeswitching': lambda dt, T: RegimeSwitchingModel(
+        S0=100, regimes={'bull': {'mu': 0.1, 'sigma': 0.2}, 'bear': {'mu': -0.1, 'sigma': 0.3}},
+        transition_matrix=[[0.99, 0.01], [0.02, 0.98]], dt=dt, T=T),
+    'multiasset_10': lambda dt, T: MultiAssetModel(S0=100, mu=0.05, correlation=np.full((10, 10), 0.3) + 0.7 * np.eye(10),
+                                                   dt=dt, T=T),
+}
+
+
+# ----------------------------------------------------------------------
+# Order book: operations per second with `size` price levels per side
+# ----------------------------------------------------------------------
+
+def filled_book(levels, rng):
+    book = OrderBook()
+    for i in range(levels):
+        book.add_bid(round(100 - 0.01 * (i + 1), 2), float(rng.uniform(1, 100)))
+        book.add_ask(round(100 + 0.01 * (i + 1), 2), float(rng.uniform(1, 100)))
+    return book
+
+
+def orderbook_case(operation, num_ops):
+    def setup(levels):
+        rng = np.random.default_rng(0)
+        book = OrderBook() if operation == 'add' else filled_book(levels, rng)
+        offsets = np.round(0.01 * rng.integers(1, levels + 1, num_ops), 2)
+        sizes = rng.uniform(0.1, 1.0, num_ops).tolist()
+        bids, asks = (100 - offsets).tolist(), (100 + offsets).tolist()
+
+        def run():
+            if operation == 'add':
+                for bid, ask, size in zip(bids, asks, sizes):
+                    book.add_bid(bid, size)
+                    book.add_ask(ask, size)
+            elif operation == 'remove':
+                for bid, ask, size in zip(bids, asks, sizes):
+                    book.remove_bid(bid, size)
+                    book.remove_ask(ask, size)
+            elif operation == 'best':
+                for _ in range(num_ops):
+                    book.get_best_bid()
+                    book.get_best_ask()
+            else:
+                for _ in range(num_ops):
+                    book.get_market_depth(5)
+        return run, num_ops
+    return setup
+
+
+# ----------------------------------------------------------------------
+# Simulation and backtest: rows per second
+# ----------------------------------------------------------------------
+
+def simulation_case(**kwargs):
+    def setup(size):
+        generator = IntegratedDataGenerator('jumpdiffusion', dt=1 / size, T=1, **SIMULATION_PARAMS)
+        np.random.seed(0)
+        return functools.partial(generator.run_simulation, **kwargs), generator.model.N
+    return setup
+
+
+@functools.lru_cache(maxsize=None)
+def backtest_data(size):
+    np.random.seed(0)
+    data = IntegratedDataGenerator('jumpdiffusion', dt=1 / size, T=1, **SIMULATION_PARAMS).run_simulation()
+    data.insert(0, 'Datetime', pd.date_range('2024-01-02 09:30', periods=len(data), freq='s'))
+    return data
+
+
+def backtest_setup(size):
+    data = backtest_data(size)
+    backtester = L2Backtester(data, L2OrderbookStrategy({'position_limit': 100, 'imbalance_threshold': 0.3,
+                                                         'trade_size': 2.0}))
+    return backtester.run, len(data)
+
+
+# ----------------------------------------------------------------------
+# Market participants: ticks per second of on_market_update
+# ----------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def market_ticks(size):
+    rng = np.random.default_rng(0)
+    prices = (100 * np.exp(np.cumsum(rng.normal(0, 0.0005, size)))).tolist()
+    volumes = rng.uniform(1, 100, size).tolist()
+    # One-second bars during trading sessions, so TWAP/VWAP windows are active
+    timestamps = SessionCalendar(start_date='2024-01-02').datetimes(size, dt=1 / (252 * 23400)).to_pydatetime()
+    return prices, volumes, list(timestamps)
+
+
+def trader_case(factory):
+    def setup(size):
+        trader = factory()
+        prices, volumes, timestamps = market_ticks(size)
+
+        def run():
+            for price, volume, timestamp in zip(prices, volumes, timestamps):
+                trader.on_market_update(price, volume, timestamp)
+        return run, size
+    return setup
+
+
+def population_setup(size, num_agents=1000):
+    configs = [MarketMakerConfig(spread_width=w, max_inventory=10.0)
+               for w in np.random.default_rng(0).uniform(0.0001, 0.002, num_agents)]
+    population = MarketMakerPopulation(configs)
+    prices, volumes, timestamps = market_ticks(size)
+
+    def run():
+        for price, volume, timestamp in zip(prices, volumes, timestamps):
+            population.on_market_update(price, volume, timestamp)
+    return run, size * num_agents
+
+
+TRADERS = {
+    'market_maker': lambda: MarketMaker(MarketMakerConfig(spread_width=0.0005, max_inventory=10.0)),
+    'position_taker': lambda: PositionTaker(PositionTakerConfig(entry_threshold=0.005, max_position_size=50.0)),
+    'stat_arb': lambda: StatisticalArbitrageTrader(StatArbConfig(lookback_period=50, entry_threshold=1.5)),
+    'twap': lambda: TWAPTrader(TWAPConfig(target_position=100.0)),
+    'vwap': lambda: VWAPTrader(VWAPConfig(target_position=100.0)),
+}
+
+
+# ----------------------------------------------------------------------
+# Command-line startup: launches per second of a fresh interpreter
+# ----------------------------------------------------------------------
+
+STARTUP_COMMANDS = {
+    'simulator_help': ['-m', 'simulation.simulator', '--help'],
+    'backtest_help': [os.path.join(ROOT, 'backtester', 'run_backtest.py'), '--help'],
+    'simulator_no_plot': ['-m', 'simulation.simulator', '--model', 'jumpdiffusion', '--T', '0.01', '--plot', 'none'],
+}
+
+
+def startup_case(arguments):
+    def setup(launches):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+
+        def run():
+            # Runs write their output under the working directory, so launch them in a scratch folder
+            with tempfile.TemporaryDirectory() as cwd:
+                for _ in range(launches):
+                    subprocess.run([sys.executable] + arguments, cwd=cwd, env=env, check=True,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return run, launches
+    return setup
+
+
+CASES = (
+    [Case(f'generator.{name}', 'steps', (10_000, 100_000, 1_000_000), model_case(factory))
+     for name, factory in GENERATORS.items()]
+    + [Case('orderbook.add', 'ops', (10, 100, 1000), orderbook_case('add', 10_000)),
+       Case('orderbook.remove', 'ops', (10, 100, 1000), orderbook_case('remove', 10_000)),
+       Case('orderbook.best', 'ops', (10, 100, 1000), orderbook_case('best', 2_000)),
+       Case('orderbook.depth', 'ops', (10, 100, 1000), orderbook_case('depth', 2_000)),
+       Case('simulation.snapshots', 'rows', (1_000, 10_000), simulation_case()),
+       Case('simulation.deltas', 'rows', (1_000, 10_000), simulation_case(output='deltas')),
+       Case('simulation.order_flow', 'rows', (1_000, 10_000), simulation_case(order_flow=True)),
+       Case('backtester.l2', 'rows', (1_000, 10_000), backtest_setup)]
+    + [Case(f'traders.{name}', 'ticks', (1_000, 10_000, 100_000), trader_case(factory))
+       for name, factory in TRADERS.items()]
+    + [Case('traders.market_maker_population_1000', 'agent-ticks', (1_000, 10_000), population_setup)]
+    + [Case(f'startup.{name}', 'launches', (5,), startup_case(arguments))
+       for name, arguments in STARTUP_COMMANDS.items()]
+)
+
+
+# ----------------------------------------------------------------------
+# Running and comparing
+# ----------------------------------------------------------------------
+
+def measure(case, size, repeats):
+    """Best time of `repeats` runs of one case, with a fresh setup before each run."""
+    best, units = np.inf, 0
+    for _ in range(repeats):
+        run, units = case.setup(size)
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return {'benchmark': case.name, 'size': size, 'unit': case.unit, 'units': int(units),
+            'seconds': best, 'rate': units / best}
+
+
+def run_benchmarks(pattern='*', quick=False, repeats=3, verbose=True):
+    """Run every case whose name matches pattern; quick runs the smallest size once."""
+    results = []
+    for case in CASES:
+        if not fnmatch.fnmatch(case.name, pattern):
+            continue
+        # Untimed warm-up: JIT compilation, imports and cached inputs are not part of the timings
+        run, _ = case.setup(case.sizes[0])
+        run()
+        for size in case.sizes[:1] if quick else case.sizes:
+            result = measure(case, size, 1 if quick else repeats)
+            results.append(result)
+            if verbose:
+                print(f"{case.name:<40}{size:>10,}{result['rate']:>16,.0f} {case.unit}/s"
+                      f"{result['seconds'] * 1e3:>12.1f} ms")
+    return {
+        'format': FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+                    'platform': platform.platform(), 'processor': platform.processor(), 'cpus': os.cpu_count()},
+        'results': results,
+    }
+
+
+def compare(baseline, current, tolerance=0.25):
+    """
+    Compare the rates of two result sets.
+
+    Returns a DataFrame with one row per case present in both, the rate ratio
+    (current / baseline) and whether it fell below 1 - tolerance.
+    """
+    def rates(results):
+        return {(r['benchmark'], r['size']): r for r in results['results']}
+
+    old, new = rates(baseline), rates(current)
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key]['rate'] / old[key]['rate']
+        rows.append({'benchmark': key[0], 'size': key[1], 'unit': new[key]['unit'],
+                     'baseline': old[key]['rate'], 'current': new[key]['rate'], 'ratio': ratio,
+                     'regression': ratio < 1 - tolerance})
+    return pd.DataFrame(rows, columns=['benchmark', 'size', 'unit', 'baseline', 'current', 'ratio', 'regression'])
+
+
+def print_comparison(table):
+    for row in table.itertuples():
+        status = 'REGRESSION' if row.regression else ('faster' if row.ratio > 1 else 'ok')
+        print(f"{row.benchmark:<40}{row.size:>10,}{row.baseline:>16,.0f}{row.current:>16,.0f} {row.unit}/s"
+              f"{row.ratio:>8.2f}x  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the performance benchmarks')
+    parser.add_argument('--filter', type=str, default='*', help="Glob on case names, e.g. 'generator.*'")
+    parser.add_argument('--quick', action='store_true', help='Smallest size of every case, one run each')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per case and size (best is kept)')
+    parser.add_argument('--output', type=str, default=None, help='Write the results to this JSON file')
+    parser.add_argument('--input', type=str, default=None, help='Load results from this JSON file instead of running')
+    parser.add_argument('--compare', type=str, default=None, help='Baseline JSON file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown before a case counts as a regression (0.25 = 25%%)')
+    parser.add_argument('--list', action='store_true', help='List the cases and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        for case in CASES:
+            print(f"{case.name:<40}{case.unit:<12}{', '.join(f'{size:,}' for size in case.sizes)}")
+        return
+
+    if args.input is not None:
+        with open(args.input) as f:
+            results = json.load(f)
+    else:
+        results = run_benchmarks(args.filter, args.quick, args.repeats)
+    if args.output is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        table = compare(baseline, results, args.tolerance)
+        if table.empty:
+            print("No cases in common with the baseline.")
+            return
+        print(f"\nComparison with {args.compare} (tolerance {args.tolerance:.0%})")
+        print_comparison(table)
+        regressions = int(table['regression'].sum())
+        print(f"{regressions} regression(s) in {len(table)} case(s).")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import os
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from abc import ABC, abstractmethod
 
 class BaseGenerator(ABC):
+    # Optional SessionCalendar: trading hours, overnight gaps and intraday seasonality
+    calendar = None
+
     @abstractmethod
     def generate(self):
         """
@@ -12,6 +15,65 @@ class BaseGenerator(ABC):
         """
         pass
 
+    def round_prices_to_tick(self, prices):
+        """
+        Round an array of prices to the nearest tick size (vectorized round_to_tick).
+        """
+        return np.round(prices / self.tick_size) * self.tick_size
+
+    def build_price_paths(self, log_returns, rng=np.random, nudge=True, drift=0.0):
+        """
+        Turn per-step log returns into tick-rounded price paths.
+
+        Parameters:
+        - log_returns: Array of shape (num_paths, N - 1)
+        - rng: np.random or a np.random.Generator
+        - nudge: Apply the small-move nudge below (the regime-switching model never had it)
+        - drift: Expected per-step log return contained in log_returns, a scalar or
+          an array broadcastable to its shape
+
+        Returns:
+        - Array of shape (num_paths, N) starting at the rounded S0 (S0 may also hold
+          one start price per path)
+
+        Like the step-by-step loops of the Heston, jump-diffusion and variance gamma
+        models, with nudge=True a step whose price change would be smaller than 1%
+        of a tick gets a small normal nudge (added in log space). The
+        path is accumulated unrounded and rounded once at the end, so moves
+        smaller than half a tick are not lost to rounding at every step.
+
+        With a session calendar, the deviations of the returns from the drift
+        are first scaled by its intraday volatility profile and overnight gaps.
+        The drift itself is not scaled, so the expected daily return is unchanged.
+        """
+        num_paths, num_steps = log_returns.shape
+        if self.calendar is not None:
+            multipliers = self.calendar.volatility_multipliers(num_steps, self.dt)
+            log_returns = drift + (log_returns - drift) * multipliers
+        start = self.round_prices_to_tick(np.asarray(self.S0, dtype=float)).reshape(-1, 1)
+        min_change = 0.01 * self.tick_size
+
+        log_paths = np.cumsum(log_returns, axis=1)
+        previous = start * np.exp(np.hstack([np.zeros((num_paths, 1)), log_paths[:, :-1]]))
+        small = np.abs(previous * np.expm1(log_returns)) < min_change
+        if nudge and small.any():
+            log_returns = log_returns.copy()
+            log_returns[small] += rng.normal(0, min_change, small.sum()) / previous[small]
+            log_paths = np.cumsum(log_returns, axis=1)
+
+        prices = np.empty((num_paths, num_steps + 1))
+        prices[:, :1] = start
+        prices[:, 1:] = start * np.exp(log_paths)
+        return self.round_prices_to_tick(prices)
+
+    def add_timestamps(self, data):
+        """
+        Insert an int64 nanosecond 'Timestamp' column after 'Time' when a session calendar is set.
+        """
+        if self.calendar is not None:
+            data.insert(1, 'Timestamp', self.calendar.timestamps(len(data), self.dt))
+        return data
+
     def save_to_file(self, filename, data):
         """
         Save generated data to a file in the 'generated_data/' folder.
@@ -43,6 +105,9 @@ class BaseGenerator(ABC):
         - tick_size: Tick size in USD (optional, default is None)
         - initial_price: Initial stock price in USD (optional, default is None)
         """
+        # Imported here so generating data does not load matplotlib
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(12, 6))
         for column in columns:
             plt.plot(data['Time'], data[column], label=column)
@@ -1,6 +1,9 @@
-import csv
 import os
-import pandas
+import shutil
+import pandas as pd
+
+CHUNKSIZE = 500_000
+
 
 def copy_csv_without_first_row(input_file, output_file):
     # Ensure the input file exists
@@ -9,44 +12,31 @@ def copy_csv_without_first_row(input_file, output_file):
         return
 
     try:
-        with open(input_file, 'r', newline='') as infile, open(output_file, 'w', newline='') as outfile:
-            reader = csv.reader(infile)
-            writer = csv.writer(outfile)
-
-            # Skip the first row
-            next(reader, None)
-
-            # Write all remaining rows to the output file
-            for row in reader:
-                writer.writerow(row)
+        with open(input_file, 'rb') as infile, open(output_file, 'wb') as outfile:
+            # Skip the first row, then copy the rest as raw bytes
+            infile.readline()
+            shutil.copyfileobj(infile, outfile, 1 << 24)
 
         print(f"Successfully copied '{input_file}' to '{output_file}' without the first row.")
     except IOError as e:
         print(f"Error: An I/O error occurred: {e}")
-    except csv.Error as e:
-        print(f"Error: A CSV error occurred: {e}")
-    except Exception as e:
-        print(f"Error: An unexpected error occurred: {e}")
 
-import pandas as pd
 
-def remove_specific_columns_from_csv(input_file, output_file):
+def remove_specific_columns_from_csv(input_file, output_file, columns_to_remove=('Price', 'Variance', 'BidAskSpread')):
     try:
-        # Read the CSV file into a DataFrame
-        df = pd.read_csv(input_file)
-        
-        # Define the columns to remove
-        columns_to_remove = ['Price', 'Variance', 'BidAskSpread']
-        
-        # Drop the specified columns
-        df = df.drop(columns=columns_to_remove)
-        
-        # Save the modified DataFrame to a new CSV file
-        df.to_csv(output_file, index=False)
-        
-        print(f"Successfully removed columns {columns_to_remove} from '{input_file}' and saved to '{output_file}'.")
+        # Read only the columns to keep, in chunks so large files are streamed
+        header = pd.read_csv(input_file, nrows=0).columns
+        missing = [col for col in columns_to_remove if col not in header]
+        if missing:
+            print(f"Error: Columns {missing} are not in '{input_file}'.")
+            return
+        usecols = [col for col in header if col not in columns_to_remove]
+        with open(output_file, 'w', newline='') as out:
+            for i, chunk in enumerate(pd.read_csv(input_file, usecols=usecols, chunksize=CHUNKSIZE)):
+                chunk[usecols].to_csv(out, index=False, header=i == 0)
+
+        print(f"Successfully removed columns {list(columns_to_remove)} from '{input_file}' and saved to '{output_file}'.")
     except FileNotFoundError:
         print(f"Error: The file '{input_file}' does not exist.")
     except Exception as e:
         print(f"An error occurred: {e}")
-
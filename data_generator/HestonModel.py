@@ -1,9 +1,10 @@
 import numpy as np
 import pandas as pd
 from .BaseGenerator import BaseGenerator
+from .accelerate import EULER_EPSILON, euler_variance, qe_variance
 
 class HestonModel(BaseGenerator):
-    def __init__(self, S0, V0, mu, kappa, theta, sigma_v, rho, dt, T, tick_size=0.01):
+    def __init__(self, S0, V0, mu, kappa, theta, sigma_v, rho, dt, T, tick_size=0.01, scheme='euler'):
         """
         Initialize the Heston model parameters with tick size support.
         
@@ -18,9 +19,15 @@ class HestonModel(BaseGenerator):
         - dt: Time step size (e.g., 1/252 for daily data)
         - T: Total simulation time (in years)
         - tick_size: Minimum tick size for the stock price (default 0.01 USD)
+        - scheme: Variance discretization, 'euler' (full truncation, default) or 'qe'
+          (Andersen's Quadratic-Exponential scheme, accurate at much coarser dt)
         """
         if tick_size < 0.01:
             raise ValueError("Tick size must be at least 0.01 USD")
+        if scheme not in ('euler', 'qe'):
+            raise ValueError(f"Unsupported scheme '{scheme}'. Choose 'euler' or 'qe'.")
+        if scheme == 'qe' and sigma_v <= 0:
+            raise ValueError("The QE scheme requires sigma_v > 0")
         
         self.S0 = S0
         self.V0 = V0
@@ -33,6 +40,7 @@ class HestonModel(BaseGenerator):
         self.T = T
         self.N = int(T / dt)  # Total number of time steps
         self.tick_size = tick_size
+        self.scheme = scheme
 
     def round_to_tick(self, price):
         """
@@ -40,39 +48,63 @@ class HestonModel(BaseGenerator):
         """
         return round(price / self.tick_size) * self.tick_size
 
-    def generate(self):
+    def simulate_paths(self, num_paths=1, rng=np.random):
         """
-        Generate stock prices using the Heston model with tick size restrictions.
+        Simulate independent price and variance paths, vectorized across paths.
+
+        Parameters:
+        - num_paths: Number of paths
+        - rng: np.random or a np.random.Generator
+
+        Returns:
+        - (prices, variances): Arrays of shape (num_paths, N); prices are tick-rounded
         """
-        # Initialize stock price array
-        S = np.zeros(self.N)
-        V = np.zeros(self.N)
-        S[0], V[0] = self.round_to_tick(self.S0), self.V0
+        if self.scheme == 'qe':
+            log_returns, V = self._simulate_qe(num_paths, rng)
+        else:
+            log_returns, V = self._simulate_euler(num_paths, rng)
+        drift = (self.mu - 0.5 * V[:, :-1]) * self.dt
+        return self.build_price_paths(log_returns, rng, drift=drift), V
+
+    def _simulate_euler(self, num_paths, rng):
+        """Full-truncation Euler for the variance, log-Euler for the price."""
+        # Correlated Brownian motions
+        Z1, Z2 = rng.normal(size=(2, self.N - 1, num_paths))
+        W_V = self.rho * Z1 + np.sqrt(1 - self.rho**2) * Z2
 
-        epsilon = 1e-8  # Stability floor for variance
-        min_change = 0.01 * self.tick_size  # Minimum change in price
+        # The variance recursion is sequential; the price increments then follow in one step
+        V = euler_variance(self.V0, self.kappa, self.theta, self.sigma_v, self.dt, W_V)
+        v = V[:, :-1]
+        log_returns = (self.mu - 0.5 * v) * self.dt + np.sqrt(np.maximum(v, EULER_EPSILON) * self.dt) * Z1.T
+        return log_returns, V
 
-        for t in range(1, self.N):
-            # Correlated Brownian motions
-            Z1, Z2 = np.random.normal(size=2)
-            W_S = Z1
-            W_V = self.rho * Z1 + np.sqrt(1 - self.rho**2) * Z2
-            
-            # Variance Dynamics: Update variance (V_t)
-            scaled_sigma_v = self.sigma_v * np.sqrt(self.dt)
-            V[t] = max(V[t-1] + self.kappa * (self.theta - V[t-1]) * self.dt + 
-                       scaled_sigma_v * np.sqrt(max(V[t-1], epsilon)) * W_V, epsilon)
-            
-            # Stock Price Dynamics: Update stock price (S_t)
-            scaled_mu = (self.mu - 0.5 * V[t-1]) * self.dt
-            scaled_volatility = np.sqrt(max(V[t-1], epsilon)) * np.sqrt(self.dt)
-            new_price = S[t-1] * np.exp(scaled_mu + scaled_volatility * W_S)
+    def _simulate_qe(self, num_paths, rng, psi_c=1.5):
+        """
+        Andersen's Quadratic-Exponential scheme (Andersen 2008).
 
-            # Ensure minimum change in price
-            if abs(new_price - S[t-1]) < min_change:
-                new_price += np.random.normal(0, min_change)
+        The next variance is drawn from a distribution matching the exact
+        conditional mean and variance of the CIR process: a scaled squared
+        normal when the variance is well away from zero (psi <= psi_c), else a
+        mixture of a point mass at zero and an exponential. The log-price uses
+        the matching central discretization of the integrated variance.
+        """
+        k, theta, sigma_v, rho, dt = self.kappa, self.theta, self.sigma_v, self.rho, self.dt
+        Z_V, Z_S = rng.normal(size=(2, self.N - 1, num_paths))
+        U = rng.random((self.N - 1, num_paths))
+        V = qe_variance(self.V0, k, theta, sigma_v, dt, Z_V, U, psi_c)
 
-            # Apply tick size restriction
-            S[t] = self.round_to_tick(new_price)
+        # Log-price coefficients with gamma1 = gamma2 = 1/2
+        K0 = -rho * k * theta * dt / sigma_v
+        K1 = 0.5 * dt * (k * rho / sigma_v - 0.5) - rho / sigma_v
+        K2 = 0.5 * dt * (k * rho / sigma_v - 0.5) + rho / sigma_v
+        K3 = 0.5 * dt * (1 - rho**2)
+        v, v_next = V[:, :-1], V[:, 1:]
+        log_returns = self.mu * dt + K0 + K1 * v + K2 * v_next + np.sqrt(K3 * (v + v_next)) * Z_S.T
+        return log_returns, V
 
-        return pd.DataFrame({'Time': np.linspace(0, self.T, self.N), 'Price': S, 'Variance': V})
+    def generate(self):
+        """
+        Generate stock prices using the Heston model with tick size restrictions.
+        """
+        S, V = self.simulate_paths()
+        return self.add_timestamps(pd.DataFrame({'Time': np.linspace(0, self.T, self.N), 'Price': S[0], 'Variance': V[0]}))
@@ -38,39 +38,37 @@ class JumpDiffusionModel(BaseGenerator):
         """
         return round(price / self.tick_size) * self.tick_size
 
-    def generate(self):
-        """
-        Generate stock prices using the Jump Diffusion model with tick size restrictions.
+    def simulate_paths(self, num_paths=1, rng=np.random):
         """
-        # Initialize stock price array
-        S = np.zeros(self.N)
-        S[0] = self.round_to_tick(self.S0)
+        Simulate independent price paths in one vectorized pass.
 
-        # Calculate Poisson parameter for jump occurrences
-        lambda_dt = self.lambda_jump * self.dt
+        All Poisson jump counts are drawn at once and the sum of k normal jumps
+        is sampled directly as N(jump_mean * k, jump_std^2 * k).
 
-        # Minimum price change threshold
-        min_change = 0.01 * self.tick_size
-
-        for t in range(1, self.N):
-            # Generate Brownian motion term (scaled for time step)
-            Z = np.random.normal()
-            scaled_volatility = self.sigma * np.sqrt(self.dt)
-            dW = Z * scaled_volatility
-
-            # Generate jump component
-            N_jumps = np.random.poisson(lambda_dt)  # Number of jumps in this time step
-            jump = np.sum(np.random.normal(self.jump_mean, self.jump_std, N_jumps))  # Total jump size
+        Parameters:
+        - num_paths: Number of paths
+        - rng: np.random or a np.random.Generator
 
-            # Update stock price
-            scaled_drift = (self.mu - 0.5 * self.sigma**2) * self.dt
-            new_price = S[t-1] * np.exp(scaled_drift + dW + jump)
+        Returns:
+        - Array of shape (num_paths, N) with tick-rounded prices
+        """
+        shape = (num_paths, self.N - 1)
+        scaled_drift = (self.mu - 0.5 * self.sigma**2) * self.dt
+        scaled_volatility = self.sigma * np.sqrt(self.dt)
+        log_returns = rng.normal(scaled_drift, scaled_volatility, shape)
 
-            # Ensure minimum change in price
-            if abs(new_price - S[t-1]) < min_change:
-                new_price += np.random.normal(0, min_change)
+        # Compound Poisson jumps, only sampled where at least one jump occurred
+        N_jumps = rng.poisson(self.lambda_jump * self.dt, shape)
+        jumped = N_jumps > 0
+        k = N_jumps[jumped]
+        log_returns[jumped] += self.jump_mean * k + self.jump_std * np.sqrt(k) * rng.normal(size=len(k))
 
-            # Apply tick size restriction
-            S[t] = self.round_to_tick(new_price)
+        expected_jump = self.lambda_jump * self.dt * self.jump_mean
+        return self.build_price_paths(log_returns, rng, drift=scaled_drift + expected_jump)
 
-        return pd.DataFrame({'Time': np.linspace(0, self.T, self.N), 'Price': S})
+    def generate(self):
+        """
+        Generate stock prices using the Jump Diffusion model with tick size restrictions.
+        """
+        S = self.simulate_paths()[0]
+        return self.add_timestamps(pd.DataFrame({'Time': np.linspace(0, self.T, self.N), 'Price': S}))
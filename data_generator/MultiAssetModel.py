@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+from .BaseGenerator import BaseGenerator
+from .accelerate import EULER_EPSILON, euler_variance, qe_variance
+
+class MultiAssetModel(BaseGenerator):
+    def __init__(self, S0, mu, correlation, dt, T, sigma=0.2, tick_size=0.01, dynamics='gbm', names=None,
+                 V0=0.04, kappa=2.0, theta=0.04, sigma_v=0.3, rho=-0.5, scheme='euler',
+                 lambda_jump=0.1, jump_mean=0.0, jump_std=0.02):
+        """
+        Initialize a model of K correlated assets.
+
+        The Brownian motions driving the assets are correlated through the
+        Cholesky factor of the correlation matrix, so all K paths come out of
+        one vectorized call. Per-asset parameters take a scalar (shared by all
+        assets) or a sequence of length K.
+
+        Parameters:
+        - S0: Initial prices (scalar or K values)
+        - mu: Drifts (scalar or K values)
+        - correlation: K x K correlation matrix of the assets' Brownian motions
+        - dt: Time step size (e.g., 1/252 for daily data)
+        - T: Total simulation time (in years)
+        - sigma: Volatilities (GBM and jump diffusion)
+        - tick_size: Minimum tick size for the stock prices (default 0.01 USD)
+        - dynamics: 'gbm', 'heston' or 'jumpdiffusion'
+        - names: Asset names (default 'Asset_1' ... 'Asset_K')
+        - V0, kappa, theta, sigma_v: Variance process (Heston only; shared by all assets)
+        - rho: Correlation between each asset's price and its variance (Heston only, scalar or K values)
+        - scheme: Variance discretization, 'euler' or 'qe' (Heston only)
+        - lambda_jump, jump_mean, jump_std: Jump intensity and size (jump diffusion only, scalar or
+          K values); jumps are independent across assets
+
+        For Heston, each asset's price and variance shocks are both correlated across assets, so the
+        price Brownian motions have exactly the given correlation when all assets share one rho.
+        """
+        if tick_size < 0.01:
+            raise ValueError("Tick size must be at least 0.01 USD")
+        if dynamics not in ('gbm', 'heston', 'jumpdiffusion'):
+            raise ValueError(f"Unsupported dynamics '{dynamics}'. Choose 'gbm', 'heston' or 'jumpdiffusion'.")
+        if scheme not in ('euler', 'qe'):
+            raise ValueError(f"Unsupported scheme '{scheme}'. Choose 'euler' or 'qe'.")
+        if dynamics == 'heston' and scheme == 'qe' and sigma_v <= 0:
+            raise ValueError("The QE scheme requires sigma_v > 0")
+
+        correlation = np.asarray(correlation, dtype=float)
+        if correlation.ndim != 2 or correlation.shape[0] != correlation.shape[1]:
+            raise ValueError("correlation must be a square matrix")
+        if not np.allclose(correlation, correlation.T) or not np.allclose(np.diag(correlation), 1):
+            raise ValueError("correlation must be symmetric with a unit diagonal")
+        try:
+            self.cholesky = np.linalg.cholesky(correlation)
+        except np.linalg.LinAlgError:
+            raise ValueError("correlation must be positive definite")
+        self.correlation = correlation
+        self.num_assets = K = len(correlation)
+
+        self.names = list(names) if names is not None else [f'Asset_{i}' for i in range(1, K + 1)]
+        if len(self.names) != K:
+            raise ValueError(f"Expected {K} asset names, got {len(self.names)}")
+        self.S0 = self._per_asset(S0, 'S0')
+        self.mu = self._per_asset(mu, 'mu')
+        self.sigma = self._per_asset(sigma, 'sigma')
+        self.rho = self._per_asset(rho, 'rho')
+        self.lambda_jump = self._per_asset(lambda_jump, 'lambda_jump')
+        self.jump_mean = self._per_asset(jump_mean, 'jump_mean')
+        self.jump_std = self._per_asset(jump_std, 'jump_std')
+        self.V0 = V0
+        self.kappa = kappa
+        self.theta = theta
+        self.sigma_v = sigma_v
+        self.dt = dt
+        self.T = T
+        self.N = int(T / dt)  # Total number of time steps
+        self.tick_size = tick_size
+        self.dynamics = dynamics
+        self.scheme = scheme
+
+    def _per_asset(self, value, name):
+        """Broadcast a scalar or length-K parameter to an array of K values."""
+        values = np.asarray(value, dtype=float)
+        if values.ndim == 0:
+            return np.full(self.num_assets, float(values))
+        if values.shape != (self.num_assets,):
+            raise ValueError(f"Parameter '{name}' needs one value or {self.num_assets} values")
+        return values.copy()
+
+    def round_to_tick(self, price):
+        """
+        Round the price to the nearest tick size.
+        """
+        return round(price / self.tick_size) * self.tick_size
+
+    def correlated_normals(self, num_steps, rng=np.random):
+        """Standard normals of shape (K, num_steps) whose rows have the model's correlation."""
+        return self.cholesky @ rng.normal(size=(self.num_assets, num_steps))
+
+    def simulate_paths(self, rng=np.random, return_variance=False):
+        """
+        Simulate all assets in one vectorized pass.
+
+        Parameters:
+        - rng: np.random or a np.random.Generator
+        - return_variance: Also return the variance paths (Heston only)
+
+        Returns:
+        - Array of shape (K, N) with tick-rounded prices, plus a (K, N) variance
+          array if return_variance is True
+        """
+        steps = self.N - 1
+        mu, sigma, dt = self.mu[:, None], self.sigma[:, None], self.dt
+        if self.dynamics == 'heston':
+            log_returns, V = self._heston_returns(steps, rng)
+            drift = (mu - 0.5 * V[:, :-1]) * dt
+        else:
+            drift = (mu - 0.5 * sigma**2) * dt
+            log_returns = drift + sigma * np.sqrt(dt) * self.correlated_normals(steps, rng)
+            V = None
+        if self.dynamics == 'jumpdiffusion':
+            # Compound Poisson jumps, only sampled where at least one jump occurred
+            shape = log_returns.shape
+            N_jumps = rng.poisson(np.broadcast_to(self.lambda_jump[:, None] * dt, shape))
+            jumped = N_jumps > 0
+            k = N_jumps[jumped]
+            jump_mean = np.broadcast_to(self.jump_mean[:, None], shape)[jumped]
+            jump_std = np.broadcast_to(self.jump_std[:, None], shape)[jumped]
+            log_returns[jumped] += jump_mean * k + jump_std * np.sqrt(k) * rng.normal(size=len(k))
+            drift = drift + (self.lambda_jump * self.jump_mean)[:, None] * dt
+
+        prices = self.build_price_paths(log_returns, rng, drift=drift)
+        if return_variance:
+            return prices, V
+        return prices
+
+    def _heston_returns(self, steps, rng):
+        """Heston log returns and variances of all assets (see HestonModel for the schemes)."""
+        k, theta, sigma_v, dt = self.kappa, self.theta, self.sigma_v, self.dt
+        mu, rho = self.mu[:, None], self.rho[:, None]
+        Z_S = self.correlated_normals(steps, rng)
+        Z_V = self.correlated_normals(steps, rng)
+
+        if self.scheme == 'qe':
+            U = rng.random((steps, self.num_assets))
+            V = qe_variance(self.V0, k, theta, sigma_v, dt, Z_V.T, U)
+            K0 = -rho * k * theta * dt / sigma_v
+            K1 = 0.5 * dt * (k * rho / sigma_v - 0.5) - rho / sigma_v
+            K2 = 0.5 * dt * (k * rho / sigma_v - 0.5) + rho / sigma_v
+            K3 = 0.5 * dt * (1 - rho**2)
+            v, v_next = V[:, :-1], V[:, 1:]
+            return mu * dt + K0 + K1 * v + K2 * v_next + np.sqrt(K3 * (v + v_next)) * Z_S, V
+
+        W_V = rho * Z_S + np.sqrt(1 - rho**2) * Z_V
+        V = euler_variance(self.V0, k, theta, sigma_v, dt, W_V.T)
+        v = np.maximum(V[:, :-1], EULER_EPSILON)
+        return (mu - 0.5 * v) * dt + np.sqrt(v * dt) * Z_S, V
+
+    def generate(self):
+        """
+        Generate correlated prices with tick size restrictions: a Time column plus one price column per asset.
+        """
+        S = self.simulate_paths()
+        data = pd.DataFrame(S.T, columns=self.names)
+        data.insert(0, 'Time', np.linspace(0, self.T, self.N))
+        return self.add_timestamps(data)
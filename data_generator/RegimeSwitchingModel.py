@@ -1,3 +1,5 @@
+import math
+from bisect import bisect_right
 import numpy as np
 import pandas as pd
 from .BaseGenerator import BaseGenerator
@@ -34,6 +36,19 @@ class RegimeSwitchingModel(BaseGenerator):
         if self.tick_size < 0.01:
             raise ValueError("Tick size must be at least 0.01 USD")
 
+        # Per-regime parameters as arrays, indexed by regime number
+        self.mu = np.array([regimes[name]['mu'] for name in self.regime_names], dtype=float)
+        self.sigma = np.array([regimes[name]['sigma'] for name in self.regime_names], dtype=float)
+
+        # Chain stepping tables: log of the staying probability (geometric holding
+        # times) and the cumulative distribution of the regime entered on a switch
+        stay = np.diag(self.transition_matrix)
+        with np.errstate(divide='ignore'):
+            self._log_stay = np.log(stay).tolist()
+        exits = self.transition_matrix * (1 - np.eye(self.num_regimes))
+        leave = np.where(stay < 1, 1 - stay, 1.0)
+        self._exit_cdf = (np.cumsum(exits, axis=1) / leave[:, None]).tolist()
+
 
     def round_to_tick(self, price):
         """
@@ -41,37 +56,69 @@ class RegimeSwitchingModel(BaseGenerator):
         """
         return round(price / self.tick_size) * self.tick_size
 
+    def sample_regimes(self, num_steps, rng=np.random):
+        """
+        Sample a regime sequence of the Markov chain.
+
+        Instead of drawing every step, the chain jumps from switch to switch:
+        the time spent in a regime is geometric with the staying probability
+        (drawn by inversion), and the next regime is drawn from the cumulative
+        off-diagonal transition row. All uniforms are drawn in bulk.
+
+        Returns:
+        - int8 array of regime numbers (indices into regime_names)
+        """
+        regimes = np.empty(num_steps, dtype=np.int8)
+        current = int(rng.choice(self.num_regimes))
+        uniforms, u = [], 0
+        t = 0
+        while t < num_steps:
+            if u + 1 >= len(uniforms):
+                uniforms, u = rng.random(4096).tolist(), 0
+            log_stay = self._log_stay[current]
+            if log_stay == 0:  # Absorbing regime
+                length = num_steps - t
+            elif log_stay == -math.inf:
+                length = 1
+            else:
+                length = max(1, math.ceil(math.log(1.0 - uniforms[u]) / log_stay))
+            regimes[t:t + length] = current
+            t += length
+            current = min(bisect_right(self._exit_cdf[current], uniforms[u + 1]), self.num_regimes - 1)
+            u += 2
+        return regimes
+
+    def simulate_paths(self, num_paths=1, rng=np.random, return_regimes=False):
+        """
+        Simulate independent price paths given sampled regime sequences.
+
+        Parameters:
+        - num_paths: Number of paths
+        - rng: np.random or a np.random.Generator
+        - return_regimes: Also return the (num_paths, N) int8 regime array
+
+        Returns:
+        - Array of shape (num_paths, N) with tick-rounded prices
+        """
+        regimes = np.stack([self.sample_regimes(self.N, rng) for _ in range(num_paths)])
+
+        # The return of step t uses the regime of step t
+        mu, sigma = self.mu[regimes[:, 1:]], self.sigma[regimes[:, 1:]]
+        dW = rng.normal(size=mu.shape) * np.sqrt(self.dt)
+        drift = (mu - 0.5 * sigma**2) * self.dt
+        prices = self.build_price_paths(drift + sigma * dW, rng, nudge=False, drift=drift)
+        if return_regimes:
+            return prices, regimes
+        return prices
+
     def generate(self):
         """
         Generate stock prices using the Regime-Switching model with tick size support.
         """
-        S = np.zeros(self.N)
-        S[0] = self.round_to_tick(self.S0)
-        regimes = np.zeros(self.N, dtype=int)
-
-        # Initialize first regime randomly
-        current_regime = np.random.choice(self.num_regimes)
-        regimes[0] = current_regime
-
-        for t in range(1, self.N):
-            # Determine the next regime using the transition matrix
-            current_regime = np.random.choice(
-                self.num_regimes, p=self.transition_matrix[current_regime]
-            )
-            regimes[t] = current_regime
-
-            # Get parameters for the current regime
-            regime_name = self.regime_names[current_regime]
-            mu = self.regimes[regime_name]['mu']
-            sigma = self.regimes[regime_name]['sigma']
-
-            # Update stock price
-            dW = np.random.normal() * np.sqrt(self.dt)
-            new_price = S[t-1] * np.exp((mu - 0.5 * sigma**2) * self.dt + sigma * dW)
-            S[t] = self.round_to_tick(new_price)
-
-        return pd.DataFrame({
+        S, regimes = self.simulate_paths(return_regimes=True)
+
+        return self.add_timestamps(pd.DataFrame({
             'Time': np.linspace(0, self.T, self.N),
-            'Price': S,
-            'Regime': [self.regime_names[r] for r in regimes]
-        })
+            'Price': S[0],
+            'Regime': pd.Categorical.from_codes(regimes[0], categories=self.regime_names)
+        }))
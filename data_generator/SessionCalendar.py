@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class SessionCalendar:
+    def __init__(self, start_date='2024-01-02', open_time='09:30', close_time='16:00', days_per_year=252,
+                 weekmask='Mon Tue Wed Thu Fri', holidays=(), volatility_u_shape=2.0, volume_u_shape=3.0,
+                 overnight_share=0.2):
+        """
+        Trading session calendar for the generators.
+
+        Maps the model time grid onto exchange sessions: a step of dt years is
+        dt * days_per_year of a session, steps only fall inside trading hours
+        on trading days, and the time between one session's close and the
+        next session's open is skipped. Each point of the grid is stamped with
+        the close of its bar (e.g. 09:31 ... 16:00 for 1-minute bars, 16:00 on
+        every trading day for daily bars) as int64 nanoseconds, local
+        exchange time.
+
+        Intraday seasonality:
+        - Volatility follows a U-shaped profile over the session whose
+          open/close level is volatility_u_shape times the midday level. It
+          is normalized so the variance of a whole day does not change.
+        - overnight_share of the daily variance is moved onto the first bar
+          of each session (the overnight gap).
+        - volume_u_shape gives the same kind of profile (mean 1 over the
+          session) for order arrival intensity.
+
+        Parameters:
+        - start_date: First trading day (rolled forward to a trading day)
+        - open_time, close_time: Session hours as 'HH:MM' or 'HH:MM:SS'
+        - days_per_year: Trading days per model year
+        - weekmask, holidays: Trading days, as for numpy.busdaycalendar
+        - volatility_u_shape: Open/close to midday volatility ratio (1 for flat)
+        - volume_u_shape: Open/close to midday volume ratio (1 for flat)
+        - overnight_share: Fraction of the daily variance in the overnight gap
+        """
+        open_ns = pd.Timedelta(_with_seconds(open_time)).value
+        close_ns = pd.Timedelta(_with_seconds(close_time)).value
+        if close_ns <= open_ns:
+            raise ValueError("close_time must be after open_time")
+        if volatility_u_shape <= 0 or volume_u_shape <= 0:
+            raise ValueError("U-shape ratios must be positive")
+        if not 0 <= overnight_share < 1:
+            raise ValueError("overnight_share must be in [0, 1)")
+
+        self.start_date = np.datetime64(pd.Timestamp(start_date).date(), 'D')
+        self.open_ns = open_ns
+        self.close_ns = close_ns
+        self.days_per_year = days_per_year
+        self.weekmask = weekmask
+        self.holidays = [str(np.datetime64(day, 'D')) for day in holidays]
+        self._busdaycalendar = np.busdaycalendar(weekmask=weekmask, holidays=self.holidays)
+        self.volatility_u_shape = volatility_u_shape
+        self.volume_u_shape = volume_u_shape
+        self.overnight_share = overnight_share
+
+    @property
+    def session_seconds(self):
+        return (self.close_ns - self.open_ns) / NS_PER_SECOND
+
+    def bars_per_session(self, dt):
+        """Number of steps of dt years in one session."""
+        bars = dt * self.days_per_year
+        if bars > 1 + 1e-9:
+            raise ValueError("A session calendar needs dt of at most one trading day (1 / days_per_year)")
+        return max(int(round(1 / bars)), 1)
+
+    def trading_days(self, num_days):
+        """The first num_days trading days as datetime64[D]."""
+        return np.busday_offset(self.start_date, np.arange(num_days), roll='forward',
+                                busdaycal=self._busdaycalendar)
+
+    def timestamps(self, num_points, dt):
+        """Bar close times of a grid of num_points points, as int64 nanoseconds since the epoch."""
+        bars = self.bars_per_session(dt)
+        index = np.arange(num_points)
+        day, bar = np.divmod(index, bars)
+        sessions = self.trading_days(int(day[-1]) + 1 if num_points else 0)
+        step_ns = (self.close_ns - self.open_ns) // bars
+        midnight = sessions.astype('datetime64[ns]').astype(np.int64)
+        return midnight[day] + self.open_ns + (bar + 1) * step_ns
+
+    def datetimes(self, num_points, dt):
+        """Same as timestamps() as a pandas DatetimeIndex."""
+        return pd.DatetimeIndex(self.timestamps(num_points, dt).view('datetime64[ns]'))
+
+    def _profile(self, bars, u_shape):
+        """U-shaped weights over the bars of a session with mean 1."""
+        x = (np.arange(bars) + 0.5) / bars
+        weights = 1 + (u_shape - 1) * (2 * x - 1)**2
+        return weights / weights.mean()
+
+    def volatility_multipliers(self, num_returns, dt):
+        """
+        Factors to scale the log returns between consecutive grid points with.
+
+        Return j goes from point j - 1 to point j. Squared factors average to 1
+        over a trading day, so the daily variance of the model is unchanged.
+        """
+        bars = self.bars_per_session(dt)
+        variance = self._profile(bars, self.volatility_u_shape**2) * (1 - self.overnight_share)
+        variance[0] += self.overnight_share * bars
+        bar = np.arange(1, num_returns + 1) % bars
+        return np.sqrt(variance[bar])
+
+    def volume_multipliers(self, num_points, dt):
+        """Relative order arrival intensity of each grid point (mean 1 over a session)."""
+        bars = self.bars_per_session(dt)
+        return self._profile(bars, self.volume_u_shape)[np.arange(num_points) % bars]
+
+
+def _with_seconds(value):
+    return value if value.count(':') == 2 else f'{value}:00'
@@ -36,37 +36,37 @@ class VarianceGammaModel(BaseGenerator):
         """
         return round(price / self.tick_size) * self.tick_size
 
-    def generate(self):
-        """
-        Generate stock prices using the Variance Gamma model.
+    def simulate_paths(self, num_paths=1, rng=np.random):
         """
-        # Initialize stock price array
-        S = np.zeros(self.N)
-        S[0] = self.round_to_tick(self.S0)
+        Simulate independent Variance Gamma price paths in one vectorized pass.
 
-        # Generate Gamma increments
-        gamma_increments = np.random.gamma(shape=self.dt / self.nu, scale=self.nu, size=self.N - 1)
-
-        # Generate Brownian motion increments evaluated at Gamma times
-        W_gamma = np.random.normal(loc=0, scale=1, size=self.N - 1)
+        Parameters:
+        - num_paths: Number of paths
+        - rng: np.random or a np.random.Generator
 
-        # Minimum threshold for price change
-        min_change = 0.01 * self.tick_size
+        Returns:
+        - Array of shape (num_paths, N) with tick-rounded prices
+        """
+        shape = (num_paths, self.N - 1)
 
-        # Simulate the price path
-        for t in range(1, self.N):
-            drift_term = (self.mu - 0.5 * self.sigma**2) * gamma_increments[t - 1]
-            diffusion_term = self.sigma * np.sqrt(self.dt) * W_gamma[t - 1]
-            new_price = S[t - 1] * np.exp(drift_term + diffusion_term)
+        # Generate Gamma increments and Brownian motion increments evaluated at Gamma times
+        gamma_increments = rng.gamma(shape=self.dt / self.nu, scale=self.nu, size=shape)
+        W_gamma = rng.normal(loc=0, scale=1, size=shape)
 
-            # Ensure minimum change in price
-            if abs(new_price - S[t - 1]) < min_change:
-                new_price += np.random.normal(0, min_change)
+        drift_term = (self.mu - 0.5 * self.sigma**2) * gamma_increments
+        diffusion_term = self.sigma * np.sqrt(self.dt) * W_gamma
+        # Gamma increments have mean dt
+        drift = (self.mu - 0.5 * self.sigma**2) * self.dt
+        return self.build_price_paths(drift_term + diffusion_term, rng, drift=drift)
 
-            S[t] = self.round_to_tick(new_price)
+    def generate(self):
+        """
+        Generate stock prices using the Variance Gamma model.
+        """
+        S = self.simulate_paths()[0]
 
         # Create DataFrame for output
-        return pd.DataFrame({
+        return self.add_timestamps(pd.DataFrame({
             'Time': np.linspace(0, self.T, self.N),
             'Price': S
-        })
+        }))
@@ -0,0 +1,160 @@
+"""
+Kernels for the sequential parts of the generators.
+
+Each recursion has a NumPy implementation (loop over time, vectorized across
+paths) and a plain scalar-loop kernel. When Numba is installed the kernels are
+JIT-compiled and used by default; otherwise the NumPy versions run and Numba is
+never imported by anything else, so it stays an optional dependency. Numba is
+only imported when a kernel first runs, so importing the generators (or a
+model that needs no kernel) does not pay for it.
+"""
+
+import importlib.util
+import math
+import numpy as np
+
+HAS_NUMBA = importlib.util.find_spec('numba') is not None
+
+_use_jit = HAS_NUMBA
+_compiled = {}
+
+
+def set_jit(enabled):
+    """Enable or disable the compiled kernels (they are only available with Numba)."""
+    global _use_jit
+    if enabled and not HAS_NUMBA:
+        raise ImportError("Numba is not installed; the NumPy implementations are used")
+    _use_jit = enabled
+
+
+def jit_enabled():
+    return _use_jit
+
+
+def _jit(kernel):
+    """Numba-compiled version of a scalar-loop kernel, built (or loaded from the cache) on first use."""
+    compiled = _compiled.get(kernel)
+    if compiled is None:
+        from numba import njit
+        compiled = _compiled[kernel] = njit(cache=True)(kernel)
+    return compiled
+
+
+# ----------------------------------------------------------------------
+# Heston variance, full-truncation Euler
+# ----------------------------------------------------------------------
+
+EULER_EPSILON = 1e-8  # Stability floor for variance
+
+
+def _euler_variance_kernel(V0, kappa, theta, sigma_v, dt, W_V):
+    num_steps, num_paths = W_V.shape
+    V = np.empty((num_paths, num_steps + 1))
+    scaled_sigma_v = sigma_v * math.sqrt(dt)
+    for p in range(num_paths):
+        v = V0
+        V[p, 0] = v
+        for t in range(num_steps):
+            v = max(v + kappa * (theta - v) * dt
+                    + scaled_sigma_v * math.sqrt(max(v, EULER_EPSILON)) * W_V[t, p], EULER_EPSILON)
+            V[p, t + 1] = v
+    return V
+
+
+def _euler_variance_numpy(V0, kappa, theta, sigma_v, dt, W_V):
+    num_steps, num_paths = W_V.shape
+    V = np.empty((num_paths, num_steps + 1))
+    V[:, 0] = V0
+    scaled_sigma_v = sigma_v * np.sqrt(dt)
+    for t in range(num_steps):
+        v = V[:, t]
+        V[:, t + 1] = np.maximum(v + kappa * (theta - v) * dt
+                                 + scaled_sigma_v * np.sqrt(np.maximum(v, EULER_EPSILON)) * W_V[t], EULER_EPSILON)
+    return V
+
+
+def euler_variance(V0, kappa, theta, sigma_v, dt, W_V):
+    """
+    Full-truncation Euler variance paths.
+
+    Parameters:
+    - W_V: Standard normal shocks of shape (N - 1, num_paths)
+
+    Returns:
+    - Array of shape (num_paths, N)
+    """
+    kernel = _jit(_euler_variance_kernel) if _use_jit else _euler_variance_numpy
+    return kernel(float(V0), float(kappa), float(theta), float(sigma_v), float(dt), np.ascontiguousarray(W_V))
+
+
+# ----------------------------------------------------------------------
+# Heston variance, Andersen Quadratic-Exponential scheme
+# ----------------------------------------------------------------------
+
+def _qe_variance_kernel(V0, kappa, theta, sigma_v, dt, Z_V, U, psi_c):
+    num_steps, num_paths = Z_V.shape
+    V = np.empty((num_paths, num_steps + 1))
+    E = math.exp(-kappa * dt)
+    c1 = sigma_v**2 * E * (1 - E) / kappa
+    c2 = theta * sigma_v**2 * (1 - E)**2 / (2 * kappa)
+    for p in range(num_paths):
+        v = V0
+        V[p, 0] = v
+        for t in range(num_steps):
+            m = theta + (v - theta) * E
+            psi = (v * c1 + c2) / (m * m)
+            if psi <= psi_c:
+                inv_psi = 2 / psi
+                b2 = max(inv_psi - 1 + math.sqrt(inv_psi * max(inv_psi - 1, 0.0)), 0.0)
+                a = m / (1 + b2)
+                v = a * (math.sqrt(b2) + Z_V[t, p])**2
+            else:
+                prob = (psi - 1) / (psi + 1)
+                u = U[t, p]
+                if u <= prob:
+                    v = 0.0
+                else:
+                    v = math.log((1 - prob) / (1 - u)) * m / (1 - prob)
+            V[p, t + 1] = v
+    return V
+
+
+def _qe_variance_numpy(V0, kappa, theta, sigma_v, dt, Z_V, U, psi_c):
+    num_steps, num_paths = Z_V.shape
+    V = np.empty((num_paths, num_steps + 1))
+    V[:, 0] = V0
+    E = np.exp(-kappa * dt)
+    c1 = sigma_v**2 * E * (1 - E) / kappa
+    c2 = theta * sigma_v**2 * (1 - E)**2 / (2 * kappa)
+    for t in range(num_steps):
+        v = V[:, t]
+        m = theta + (v - theta) * E
+        psi = (v * c1 + c2) / m**2
+
+        quadratic = psi <= psi_c
+        inv_psi = 2 / np.where(quadratic, psi, 1.0)
+        b2 = np.maximum(inv_psi - 1 + np.sqrt(inv_psi * np.maximum(inv_psi - 1, 0)), 0)
+        a = m / (1 + b2)
+        prob = (psi - 1) / (psi + 1)
+        u = U[t]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            exponential = np.where(u <= prob, 0.0, np.log((1 - prob) / (1 - u)) * m / (1 - prob))
+        V[:, t + 1] = np.where(quadratic, a * (np.sqrt(b2) + Z_V[t])**2, exponential)
+    return V
+
+
+def qe_variance(V0, kappa, theta, sigma_v, dt, Z_V, U, psi_c=1.5):
+    """
+    Andersen QE variance paths.
+
+    Parameters:
+    - Z_V: Standard normal shocks of shape (N - 1, num_paths)
+    - U: Uniforms of the same shape (used in the exponential branch)
+    - psi_c: Switching level between the quadratic and exponential branches
+
+    Returns:
+    - Array of shape (num_paths, N)
+    """
+    kernel = _jit(_qe_variance_kernel) if _use_jit else _qe_variance_numpy
+    return kernel(float(V0), float(kappa), float(theta), float(sigma_v), float(dt),
+                  np.ascontiguousarray(Z_V), np.ascontiguousarray(U), float(psi_c))
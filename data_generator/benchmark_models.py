@@ -0,0 +1,78 @@
+import argparse
+import time
+import numpy as np
+from .JumpDiffusionModel import JumpDiffusionModel
+from .VarianceGammaModel import VarianceGammaModel
+
+
+# Reference step-by-step implementations (the previous generate() loops)
+
+def loop_jump_diffusion(model):
+    S = np.zeros(model.N)
+    S[0] = model.round_to_tick(model.S0)
+    lambda_dt = model.lambda_jump * model.dt
+    min_change = 0.01 * model.tick_size
+    for t in range(1, model.N):
+        dW = np.random.normal() * model.sigma * np.sqrt(model.dt)
+        N_jumps = np.random.poisson(lambda_dt)
+        jump = np.sum(np.random.normal(model.jump_mean, model.jump_std, N_jumps))
+        new_price = S[t-1] * np.exp((model.mu - 0.5 * model.sigma**2) * model.dt + dW + jump)
+        if abs(new_price - S[t-1]) < min_change:
+            new_price += np.random.normal(0, min_change)
+        S[t] = model.round_to_tick(new_price)
+    return S
+
+
+def loop_variance_gamma(model):
+    S = np.zeros(model.N)
+    S[0] = model.round_to_tick(model.S0)
+    gamma_increments = np.random.gamma(shape=model.dt / model.nu, scale=model.nu, size=model.N - 1)
+    W_gamma = np.random.normal(loc=0, scale=1, size=model.N - 1)
+    min_change = 0.01 * model.tick_size
+    for t in range(1, model.N):
+        drift_term = (model.mu - 0.5 * model.sigma**2) * gamma_increments[t - 1]
+        diffusion_term = model.sigma * np.sqrt(model.dt) * W_gamma[t - 1]
+        new_price = S[t - 1] * np.exp(drift_term + diffusion_term)
+        if abs(new_price - S[t - 1]) < min_change:
+            new_price += np.random.normal(0, min_change)
+        S[t] = model.round_to_tick(new_price)
+    return S
+
+
+def best_time(func, repeats):
+    """Best wall time of several runs, in seconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark(num_steps=100000, num_paths=100, repeats=3):
+    """Compare the vectorized generators with the reference loops."""
+    T = 1.0
+    dt = T / num_steps
+    models = {
+        'jumpdiffusion': (JumpDiffusionModel(S0=100, mu=0.05, sigma=0.2, lambda_jump=10, jump_mean=0.0,
+                                             jump_std=0.02, T=T, dt=dt), loop_jump_diffusion),
+        'variancegamma': (VarianceGammaModel(S0=100, mu=0.05, sigma=0.2, nu=0.1, dt=dt, T=T), loop_variance_gamma),
+    }
+
+    print(f"{num_steps:,} steps, best of {repeats}")
+    print(f"{'model':<15}{'loop':>10}{'vectorized':>12}{'speedup':>9}{f'{num_paths} paths':>14}")
+    for name, (model, loop) in models.items():
+        loop_time = best_time(lambda: loop(model), repeats)
+        vector_time = best_time(lambda: model.simulate_paths(), repeats)
+        multi_time = best_time(lambda: model.simulate_paths(num_paths), repeats)
+        print(f"{name:<15}{loop_time * 1e3:>8.1f}ms{vector_time * 1e3:>10.1f}ms"
+              f"{loop_time / vector_time:>8.0f}x{multi_time * 1e3:>12.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark vectorized path generation against the step-by-step loops')
+    parser.add_argument('--steps', type=int, default=100000, help='Time steps per path')
+    parser.add_argument('--paths', type=int, default=100, help='Paths for the multi-path timing')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per timing (best is reported)')
+    args = parser.parse_args()
+    benchmark(args.steps, args.paths, args.repeats)
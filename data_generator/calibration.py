@@ -0,0 +1,208 @@
+import argparse
+import copy
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .HestonModel import HestonModel
+from .JumpDiffusionModel import JumpDiffusionModel
+
+'''
+Fits model parameters to target stylized facts of log returns: annualized
+volatility, excess kurtosis and the autocorrelation of squared returns
+(volatility clustering). Targets are given directly or measured on a
+reference price series. Every candidate parameter set is scored on a batch
+of paths simulated with the same random numbers (common random numbers),
+so differences between candidates reflect the parameters rather than
+sampling noise, and candidates are scored in parallel across a process pool.
+The search is a cross-entropy method: sample a population of candidates,
+keep the best quarter, refit the sampling distribution to them and repeat.
+'''
+
+# Parameters fitted by default and their search bounds
+DEFAULT_BOUNDS = {
+    'heston': {'kappa': (0.1, 10.0), 'theta': (0.005, 0.25), 'sigma_v': (0.05, 1.5), 'rho': (-0.95, 0.95)},
+    'jumpdiffusion': {'sigma': (0.05, 1.0), 'lambda_jump': (0.1, 100.0), 'jump_std': (0.001, 0.1)},
+}
+
+MOMENTS = ('volatility', 'kurtosis', 'acf_squared')
+
+
+def return_moments(prices, dt, acf_lag=1):
+    """
+    Stylized facts of log returns, averaged over paths.
+
+    Parameters:
+    - prices: Price path, or array of shape (num_paths, N)
+    - dt: Time step of the paths (in years)
+    - acf_lag: Lag of the squared return autocorrelation
+
+    Returns:
+    - Dict with 'volatility' (annualized), 'kurtosis' (excess) and 'acf_squared'
+    """
+    returns = np.diff(np.log(np.atleast_2d(np.asarray(prices, dtype=float))), axis=1)
+    returns = returns - returns.mean(axis=1, keepdims=True)
+    variance = (returns**2).mean(axis=1)
+    squared = returns**2 - variance[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kurtosis = (returns**4).mean(axis=1) / variance**2 - 3
+        acf = (squared[:, acf_lag:] * squared[:, :-acf_lag]).mean(axis=1) / (squared**2).mean(axis=1)
+    return {
+        'volatility': float(np.sqrt(variance.mean() / dt)),
+        'kurtosis': float(np.nanmean(kurtosis)) if np.isfinite(kurtosis).any() else np.nan,
+        'acf_squared': float(np.nanmean(acf)) if np.isfinite(acf).any() else np.nan,
+    }
+
+
+def simulated_moments(model, num_paths, seed, acf_lag=1):
+    """Moments of num_paths paths simulated from a fixed seed (the common random numbers)."""
+    paths = model.simulate_paths(num_paths, np.random.default_rng(seed))
+    if isinstance(paths, tuple):  # Heston also returns variances
+        paths = paths[0]
+    return return_moments(paths, model.dt, acf_lag)
+
+
+def loss(moments, targets, weights):
+    """Weighted squared relative error (floored at 0.05 for targets near zero)."""
+    total = 0.0
+    for name, target in targets.items():
+        value = moments[name]
+        if not np.isfinite(value):
+            return np.inf
+        total += weights.get(name, 1.0) * ((value - target) / max(abs(target), 0.05))**2
+    return total
+
+
+def _evaluate(task):
+    """Score one candidate (top-level so it can run in a worker process)."""
+    model, params, targets, weights, num_paths, seed, acf_lag = task
+    candidate = copy.copy(model)
+    for name, value in params.items():
+        setattr(candidate, name, value)
+    try:
+        moments = simulated_moments(candidate, num_paths, seed, acf_lag)
+    except (ValueError, FloatingPointError):
+        return np.inf, {}
+    return loss(moments, targets, weights), moments
+
+
+def calibrate(model, targets, bounds=None, weights=None, num_paths=200, population=32, iterations=15,
+              seed=0, processes=None, acf_lag=1, verbose=False):
+    """
+    Fit model parameters so that simulated paths match target moments.
+
+    Parameters:
+    - model: Model instance with simulate_paths(); its current values are the starting point
+      and all other parameters (dt, T, S0, ...) are kept
+    - targets: Dict with any of 'volatility', 'kurtosis', 'acf_squared'
+    - bounds: Dict of parameter name -> (low, high); defaults to DEFAULT_BOUNDS for the model
+    - weights: Optional dict of moment name -> weight in the loss
+    - num_paths: Paths simulated per candidate
+    - population: Candidates per iteration
+    - iterations: Number of iterations
+    - seed: Seed of the common random numbers and of the search
+    - processes: Worker processes (None for one per CPU, 1 to run in this process)
+    - acf_lag: Lag of the squared return autocorrelation
+
+    Returns:
+    - Dict with the fitted 'params', their 'moments', the final 'loss' and a 'history'
+      DataFrame with the best loss of every iteration
+    """
+    unknown = set(targets) - set(MOMENTS)
+    if unknown:
+        raise ValueError(f"Unknown target moments {sorted(unknown)}. Choose from {list(MOMENTS)}.")
+    if bounds is None:
+        bounds = DEFAULT_BOUNDS.get(_model_name(model))
+        if bounds is None:
+            raise ValueError(f"No default bounds for {type(model).__name__}; pass bounds explicitly")
+    weights = weights or {}
+    names = list(bounds)
+    low = np.array([bounds[name][0] for name in names], dtype=float)
+    high = np.array([bounds[name][1] for name in names], dtype=float)
+
+    # The search runs on parameters scaled to [0, 1]
+    rng = np.random.default_rng(seed)
+    start = np.clip([(getattr(model, name) - lo) / (hi - lo) for name, lo, hi in zip(names, low, high)], 0, 1)
+    mean, std = start, np.full(len(names), 0.3)
+    num_elite = max(2, population // 4)
+
+    def tasks(points):
+        return [(model, dict(zip(names, (low + point * (high - low)).tolist())), targets, weights,
+                 num_paths, seed, acf_lag) for point in points]
+
+    best_point, best_loss, best_moments = start, np.inf, {}
+    history = []
+    workers = processes or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        for iteration in range(iterations):
+            started = time.perf_counter()
+            points = np.clip(rng.normal(mean, std, size=(population, len(names))), 0, 1)
+            points[0] = best_point
+            if pool is not None:
+                results = list(pool.map(_evaluate, tasks(points), chunksize=max(1, population // (4 * workers))))
+            else:
+                results = [_evaluate(task) for task in tasks(points)]
+            losses = np.array([result[0] for result in results])
+
+            order = np.argsort(losses)
+            if losses[order[0]] < best_loss:
+                best_point, best_loss, best_moments = points[order[0]], losses[order[0]], results[order[0]][1]
+            elite = points[order[:num_elite]]
+            mean, std = elite.mean(axis=0), np.maximum(elite.std(axis=0), 0.01)
+
+            history.append({'Iteration': iteration, 'Loss': best_loss, 'Seconds': time.perf_counter() - started})
+            if verbose:
+                print(f"iteration {iteration:>3}  loss {best_loss:.6f}  ({history[-1]['Seconds']:.2f}s)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    params = dict(zip(names, (low + best_point * (high - low)).tolist()))
+    return {'params': params, 'moments': best_moments, 'loss': best_loss, 'history': pd.DataFrame(history)}
+
+
+def _model_name(model):
+    if isinstance(model, HestonModel):
+        return 'heston'
+    if isinstance(model, JumpDiffusionModel):
+        return 'jumpdiffusion'
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Calibrate model parameters to target return moments')
+    parser.add_argument('--model', type=str, choices=['heston', 'jumpdiffusion'], required=True)
+    parser.add_argument('--reference', type=str, default=None,
+                        help='CSV file with a Price column to take the target moments from')
+    parser.add_argument('--volatility', type=float, default=None, help='Target annualized volatility')
+    parser.add_argument('--kurtosis', type=float, default=None, help='Target excess kurtosis of returns')
+    parser.add_argument('--acf_squared', type=float, default=None, help='Target autocorrelation of squared returns')
+    parser.add_argument('--dt', type=float, default=1/252, help='Time step of the reference series and the model')
+    parser.add_argument('--T', type=float, default=1.0, help='Length of the simulated paths in years')
+    parser.add_argument('--paths', type=int, default=200, help='Paths simulated per candidate')
+    parser.add_argument('--population', type=int, default=32, help='Candidates per iteration')
+    parser.add_argument('--iterations', type=int, default=15, help='Search iterations')
+    parser.add_argument('--processes', type=int, default=None, help='Worker processes (default: one per CPU)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the common random numbers')
+    args = parser.parse_args()
+
+    if args.reference is not None:
+        targets = return_moments(pd.read_csv(args.reference)['Price'].to_numpy(), args.dt)
+    else:
+        targets = {name: getattr(args, name) for name in MOMENTS if getattr(args, name) is not None}
+    if not targets:
+        parser.error("Give --reference or at least one of --volatility, --kurtosis, --acf_squared")
+
+    if args.model == 'heston':
+        model = HestonModel(S0=100, V0=0.04, mu=0.0, kappa=2.0, theta=0.04, sigma_v=0.3, rho=-0.5,
+                            dt=args.dt, T=args.T, scheme='qe')
+    else:
+        model = JumpDiffusionModel(S0=100, mu=0.0, sigma=0.2, lambda_jump=10, jump_mean=0.0, jump_std=0.02,
+                                   T=args.T, dt=args.dt)
+    print("targets:", {name: round(value, 4) for name, value in targets.items()})
+    result = calibrate(model, targets, num_paths=args.paths, population=args.population,
+                       iterations=args.iterations, seed=args.seed, processes=args.processes, verbose=True)
+    print("params: ", {name: round(value, 4) for name, value in result['params'].items()})
+    print("moments:", {name: round(value, 4) for name, value in result['moments'].items()})
@@ -0,0 +1,112 @@
+import argparse
+import time
+import numpy as np
+from .HestonModel import HestonModel
+
+'''
+Compares the distribution of (S_T, V_T) from the Euler and QE Heston schemes at
+coarse time steps against exact values: the moments of the CIR variance process,
+the mean and variance of log S_T (cumulants of the Heston characteristic
+function) and the at-the-money call payoff E[(S_T - S_0)^+] (Fourier inversion).
+A fine-step Euler run is shown for comparison. The default parameters are a
+stressed set (strong vol of vol, Feller condition violated) where Euler needs
+very small steps to converge.
+'''
+
+
+def characteristic_function(model, u, T):
+    """Heston characteristic function of log S_T (Albrecher et al. formulation)."""
+    k, theta, sigma_v, rho = model.kappa, model.theta, model.sigma_v, model.rho
+    iu = 1j * u
+    d = np.sqrt((rho * sigma_v * iu - k)**2 + sigma_v**2 * (iu + u**2))
+    b = k - rho * sigma_v * iu
+    g = (b - d) / (b + d)
+    e = np.exp(-d * T)
+    return np.exp(iu * (np.log(model.S0) + model.mu * T)
+                  + k * theta / sigma_v**2 * ((b - d) * T - 2 * np.log((1 - g * e) / (1 - g)))
+                  + model.V0 / sigma_v**2 * (b - d) * (1 - e) / (1 - g * e))
+
+
+def exact_values(model):
+    """Exact statistics at the model's last time point."""
+    k, theta, sigma_v = model.kappa, model.theta, model.sigma_v
+    T = (model.N - 1) * model.dt
+    E = np.exp(-k * T)
+    mean_v = theta + (model.V0 - theta) * E
+    var_v = model.V0 * sigma_v**2 * E * (1 - E) / k + theta * sigma_v**2 * (1 - E)**2 / (2 * k)
+    integrated_v = theta * T + (model.V0 - theta) * (1 - E) / k
+    mean_log_s = np.log(model.S0) + model.mu * T - 0.5 * integrated_v
+
+    # Second cumulant of log S_T from a central difference of log(phi) at 0
+    h = 1e-4
+    log_phi = np.log(characteristic_function(model, np.array([-h, h]), T))
+    var_log_s = -np.real(log_phi[0] + log_phi[1]) / h**2
+
+    # E[(S_T - K)^+] by Fourier inversion with K = S0
+    u = np.linspace(1e-8, 200, 20000)
+    forward = model.S0 * np.exp(model.mu * T)
+    strike = np.exp(-1j * u * np.log(model.S0))
+    P1 = 0.5 + np.trapezoid(np.real(strike * characteristic_function(model, u - 1j, T) / (1j * u * forward)), u) / np.pi
+    P2 = 0.5 + np.trapezoid(np.real(strike * characteristic_function(model, u, T) / (1j * u)), u) / np.pi
+    call = forward * P1 - model.S0 * P2
+
+    return {'E[V_T]': mean_v, 'Var[V_T]': var_v, 'E[log S_T]': mean_log_s,
+            'Var[log S_T]': var_log_s, 'ATM call': call}
+
+
+def terminal_statistics(model, num_paths, rng):
+    """Moments of V_T and log S_T plus an at-the-money call payoff from simulated paths."""
+    S, V = model.simulate_paths(num_paths, rng)
+    log_s = np.log(S[:, -1])
+    return {
+        'E[V_T]': V[:, -1].mean(),
+        'Var[V_T]': V[:, -1].var(),
+        'E[log S_T]': log_s.mean(),
+        'Var[log S_T]': log_s.var(),
+        'ATM call': np.maximum(S[:, -1] - model.S0, 0).mean(),
+    }
+
+
+def make_model(params, T, steps, scheme):
+    """Model with `steps` increments ending exactly at T (the models use N = int(T / dt) points)."""
+    dt = T / steps
+    return HestonModel(dt=dt, T=(steps + 1.5) * dt, scheme=scheme, **params)
+
+
+def validate(params, T=1.0, num_paths=20000, reference_steps=1000, coarse_steps=(10, 25, 50), seed=0):
+    """Print simulated minus exact statistics per scheme and step count; return them as a dict."""
+    rng = np.random.default_rng(seed)
+    targets = exact_values(make_model(params, T, reference_steps, 'euler'))
+
+    print(f"{num_paths:,} paths, T={T}")
+    print(f"{'scheme':<8}{'steps':>6}" + ''.join(f"{name:>14}" for name in targets) + f"{'time':>8}")
+    print(f"{'exact':<8}{'':>6}" + ''.join(f"{value:>14.5f}" for value in targets.values()))
+
+    runs = [(scheme, steps) for steps in coarse_steps for scheme in ('euler', 'qe')]
+    results = {}
+    for scheme, steps in runs + [('euler', reference_steps)]:
+        model = make_model(params, T, steps, scheme)
+        start = time.perf_counter()
+        stats = terminal_statistics(model, num_paths, rng)
+        elapsed = time.perf_counter() - start
+        errors = {name: stats[name] - targets[name] for name in targets}
+        results[(scheme, steps)] = errors
+        print(f"{scheme:<8}{steps:>6}" + ''.join(f"{error:>+14.5f}" for error in errors.values())
+              + f"{elapsed:>7.2f}s")
+    print("(rows show simulated minus exact)")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Validate the Heston Euler and QE schemes against exact statistics')
+    parser.add_argument('--paths', type=int, default=20000, help='Simulated paths per scheme')
+    parser.add_argument('--reference_steps', type=int, default=1000, help='Steps of the fine Euler comparison run')
+    parser.add_argument('--default_params', action='store_true',
+                        help='Use the README example parameters instead of the stressed set')
+    args = parser.parse_args()
+
+    if args.default_params:
+        params = dict(S0=100, V0=0.04, mu=0.05, kappa=2, theta=0.04, sigma_v=0.3, rho=-0.7)
+    else:
+        params = dict(S0=100, V0=0.04, mu=0.0, kappa=0.5, theta=0.04, sigma_v=1.0, rho=-0.9)
+    validate(params, num_paths=args.paths, reference_steps=args.reference_steps)
@@ -0,0 +1,182 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+'''
+Lightweight timers and counters for the hot paths of the simulation and the
+backtester. Instrumented code asks the shared PROFILER for a named timer:
+
+    with PROFILER.timer('order_book.update'):
+        ...
+    PROFILER.count('backtester.fills')
+
+While the profiler is disabled (the default), timer() returns one shared
+no-op context manager and count() returns immediately, so the cost of an
+instrumented stage is a method call. profile_session() enables it around a
+run, prints the wall time, calls and throughput of every stage and can also
+write a cProfile (pstats) file or a Chrome trace (chrome://tracing, Perfetto).
+'''
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('profiler', 'name', 'items', 'start')
+
+    def __init__(self, profiler, name, items):
+        self.profiler = profiler
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.profiler._record(self.name, end - self.start, self.items, self.start)
+        return False
+
+
+class Profiler:
+    def __init__(self, max_trace_events=1_000_000):
+        """
+        Registry of named timers and counters.
+
+        Parameters:
+        - max_trace_events: Cap on the events kept for a Chrome trace (later events are dropped)
+        """
+        self.enabled = False
+        self.max_trace_events = max_trace_events
+        self.reset()
+
+    def reset(self):
+        """Clear all statistics and trace events."""
+        # name -> [calls, nanoseconds, items]
+        self.stats = {}
+        self.trace_events = None
+        self.started = time.perf_counter_ns()
+
+    def enable(self, trace=False):
+        """Start collecting statistics (and Chrome trace events if trace is True)."""
+        self.reset()
+        self.trace_events = [] if trace else None
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def timer(self, name, items=0):
+        """
+        Context manager timing one call of the stage `name`.
+
+        items: Units processed by the call (rows, steps, ...), reported as throughput
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, items)
+
+    def count(self, name, items=1):
+        """Add items to the counter `name` without timing anything."""
+        if not self.enabled:
+            return
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = [0, 0, 0]
+        stat[0] += 1
+        stat[2] += items
+
+    def _record(self, name, elapsed_ns, items, start_ns):
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = [0, 0, 0]
+        stat[0] += 1
+        stat[1] += elapsed_ns
+        stat[2] += items
+        if self.trace_events is not None and len(self.trace_events) < self.max_trace_events:
+            self.trace_events.append({'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                                      'ts': (start_ns - self.started) / 1000, 'dur': elapsed_ns / 1000})
+
+    def report(self):
+        """
+        Statistics as a list of dicts (one per stage, slowest first) with calls, seconds,
+        ms_per_call, items, items_per_sec and share of the wall time since enable().
+        """
+        wall = max(time.perf_counter_ns() - self.started, 1)
+        rows = []
+        for name, (calls, elapsed_ns, items) in self.stats.items():
+            seconds = elapsed_ns / 1e9
+            rows.append({
+                'stage': name,
+                'calls': calls,
+                'seconds': seconds,
+                'ms_per_call': 1e3 * seconds / calls if calls else 0.0,
+                'items': items,
+                'items_per_sec': items / seconds if seconds > 0 and items else None,
+                'share': elapsed_ns / wall,
+            })
+        return sorted(rows, key=lambda row: row['seconds'], reverse=True)
+
+    def format_report(self):
+        wall = (time.perf_counter_ns() - self.started) / 1e9
+        lines = [f"{'stage':<32}{'calls':>10}{'seconds':>10}{'ms/call':>10}{'items':>12}{'items/s':>14}{'share':>8}"]
+        for row in self.report():
+            rate = f"{row['items_per_sec']:,.0f}" if row['items_per_sec'] else '-'
+            share = f"{row['share']:.1%}" if row['seconds'] else '-'
+            lines.append(f"{row['stage']:<32}{row['calls']:>10,}{row['seconds']:>10.3f}{row['ms_per_call']:>10.3f}"
+                         f"{row['items']:>12,}{rate:>14}{share:>8}")
+        lines.append(f"wall time {wall:.3f}s (stages can nest, so shares may add up to more than 100%)")
+        return '\n'.join(lines)
+
+    def save_trace(self, path):
+        """Write the collected events as a Chrome trace JSON file."""
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.trace_events or [], 'displayTimeUnit': 'ms'}, f)
+
+
+PROFILER = Profiler()
+
+
+@contextmanager
+def profile_session(output=None, profiler=PROFILER):
+    """
+    Enable the profiler for the duration of a block, then print its report.
+
+    Parameters:
+    - output: Optional file for a detailed profile: a '.json' path gets a Chrome trace
+      of the instrumented stages, any other path a cProfile dump of every function call
+      (open with python -m pstats or snakeviz)
+    """
+    trace = output is not None and output.endswith('.json')
+    detailed = cProfile.Profile() if output is not None and not trace else None
+    profiler.enable(trace=trace)
+    if detailed is not None:
+        detailed.enable()
+    try:
+        yield profiler
+    finally:
+        if detailed is not None:
+            detailed.disable()
+        profiler.disable()
+        print("\n=== Profile ===")
+        print(profiler.format_report())
+        if trace:
+            profiler.save_trace(output)
+            print(f"Chrome trace saved to {output}")
+        elif detailed is not None:
+            detailed.dump_stats(output)
+            print(f"cProfile statistics saved to {output}")
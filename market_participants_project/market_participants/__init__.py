@@ -1,5 +1,13 @@
 # market_participants/__init__.py
-from .traders import MarketMaker, StatisticalArbitrageTrader, PositionTaker, TWAPTrader, VWAPTrader
+from .traders import (
+    MarketMaker,
+    StatisticalArbitrageTrader,
+    PositionTaker,
+    TWAPTrader,
+    VWAPTrader,
+    MarketMakerPopulation,
+    PositionTakerPopulation
+)
 from .configs.participant_configs import (
     MarketMakerConfig,
     StatArbConfig,
@@ -1,2 +1,3 @@
 # market_participants/base/__init__.py
-from .participant import Participant
\ No newline at end of file
+from .participant import Participant
+from .population import ParticipantPopulation
\ No newline at end of file
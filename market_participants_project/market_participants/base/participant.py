@@ -27,6 +27,10 @@ class Participant(ABC):
         self.risk_limit = risk_limit
         self.position = Position()
         
+        # Venue that collects orders instead of filling them at the quoted
+        # price (e.g. simulation.MatchingEngine); None fills immediately
+        self.order_sink = None
+        
         # Trading metrics
         self.trades: List[Dict] = []
         self.trade_history: List[Dict] = []
@@ -39,6 +43,19 @@ class Participant(ABC):
             'returns': []
         }
         
+    def check_limits(self, price: float, quantity: float) -> bool:
+        """Check whether trading `quantity` at `price` stays within position and risk limits"""
+        # Check position limits
+        if abs(self.position.quantity + quantity) > self.max_position_size:
+            return False
+            
+        # Check risk limits
+        potential_exposure = abs((self.position.quantity + quantity) * price)
+        if potential_exposure > self.risk_limit:
+            return False
+            
+        return True
+        
     def execute_trade(self, price: float, quantity: float, timestamp: Optional[datetime] = None) -> bool:
         """
         Execute a trade and update position
@@ -51,15 +68,47 @@ class Participant(ABC):
         Returns:
             bool: Whether trade was successful
         """
-        # Check position limits
-        if abs(self.position.quantity + quantity) > self.max_position_size:
+        if not self.check_limits(price, quantity):
             return False
             
-        # Check risk limits
-        potential_exposure = abs((self.position.quantity + quantity) * price)
-        if potential_exposure > self.risk_limit:
-            return False
+        # Route the order to the venue, which reports fills via on_fill
+        if self.order_sink is not None:
+            self.order_sink.submit(self, quantity)
+            return True
             
+        self.on_fill(price, quantity, timestamp)
+        return True
+        
+    def submit_limit_order(self, price: float, quantity: float, timestamp: Optional[datetime] = None) -> bool:
+        """
+        Submit a limit order that adds liquidity at the given price
+        
+        Without an order sink the order is filled immediately, like execute_trade.
+        
+        Args:
+            price: Limit price
+            quantity: Quantity to trade (positive for buy, negative for sell)
+            timestamp: Optional timestamp for the order
+        
+        Returns:
+            bool: Whether the order was accepted
+        """
+        if self.order_sink is None:
+            return self.execute_trade(price, quantity, timestamp)
+        if not self.check_limits(price, quantity):
+            return False
+        self.order_sink.submit(self, quantity, limit_price=price)
+        return True
+        
+    def on_fill(self, price: float, quantity: float, timestamp: Optional[datetime] = None):
+        """
+        Update position and record a (possibly partial) fill
+        
+        Args:
+            price: Average fill price
+            quantity: Filled quantity (positive for buy, negative for sell)
+            timestamp: Optional timestamp for the fill
+        """
         # Update position
         if self.position.quantity == 0:
             self.position.avg_entry_price = price
@@ -83,8 +132,6 @@ class Participant(ABC):
         self.trades.append(trade_record)
         self.metrics['total_trades'] += 1
         
-        return True
-        
     def update_position(self, current_price: float):
         """Update position metrics with current market price"""
         self.position.update_unrealized_pnl(current_price)
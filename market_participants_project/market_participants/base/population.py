@@ -0,0 +1,142 @@
+from abc import ABC, abstractmethod
+from dataclasses import fields
+from typing import Optional, Sequence
+import numpy as np
+from datetime import datetime
+
+
+class ParticipantPopulation(ABC):
+    """
+    Structure-of-arrays container for N participants of one trader type.
+
+    Every per-agent attribute that a single Participant keeps on its Position
+    dataclass (quantity, avg entry, PnL) and every config field is stored as a
+    NumPy array of length N, so one market update advances all agents with
+    array operations instead of N Python method calls.
+    """
+
+    def __init__(self, configs: Sequence):
+        if len(configs) == 0:
+            raise ValueError("A population needs at least one config")
+        self.configs = list(configs)
+        self.size = len(self.configs)
+
+        # Config parameters as parallel arrays
+        self.params = {
+            f.name: np.array([getattr(c, f.name) for c in self.configs])
+            for f in fields(self.configs[0])
+        }
+        self.capital = self.params['initial_capital'].astype(float)
+        self.max_position_size = self.params['max_position_size'].astype(float)
+        self.risk_limit = self.params['risk_limit'].astype(float)
+
+        # Position state (mirrors base.participant.Position)
+        self.quantity = np.zeros(self.size)
+        self.avg_entry_price = np.zeros(self.size)
+        self.realized_pnl = np.zeros(self.size)
+        self.unrealized_pnl = np.zeros(self.size)
+        self.last_update_price = np.zeros(self.size)
+        self.total_trades = np.zeros(self.size, dtype=np.int64)
+
+        # Venue that collects orders instead of filling them at the quoted
+        # price (e.g. simulation.MatchingEngine); None fills immediately
+        self.order_sink = None
+
+    @classmethod
+    def from_config(cls, config, size: int):
+        """Build a homogeneous population of `size` agents sharing one config."""
+        return cls([config] * size)
+
+    def execute_trades(self, price: float, quantity: np.ndarray,
+                       timestamp: Optional[datetime] = None) -> np.ndarray:
+        """
+        Execute one order per agent at the given price and update positions.
+
+        Args:
+            price: Execution price
+            quantity: Array of quantities (positive buy, negative sell, 0 = no order)
+            timestamp: Optional timestamp for the trades
+
+        Returns:
+            np.ndarray: Boolean mask of agents whose trade was executed
+        """
+        executed = self.check_limits(price, quantity)
+        if not executed.any():
+            return executed
+
+        # Route the orders to the venue, which reports fills via apply_fills
+        if self.order_sink is not None:
+            self.order_sink.submit_batch(self, np.where(executed, quantity, 0.0))
+        else:
+            self.apply_fills(np.where(executed, quantity, 0.0), price)
+        return executed
+
+    def submit_limit_orders(self, prices, quantity: np.ndarray,
+                            timestamp: Optional[datetime] = None) -> np.ndarray:
+        """
+        Submit one limit order per agent that adds liquidity at the given prices
+
+        Without an order sink the orders are filled immediately, like execute_trades.
+
+        Returns:
+            np.ndarray: Boolean mask of agents whose order was accepted
+        """
+        prices = np.broadcast_to(np.asarray(prices, dtype=float), (self.size,))
+        accepted = self.check_limits(prices, quantity)
+        if not accepted.any():
+            return accepted
+
+        if self.order_sink is not None:
+            self.order_sink.submit_batch(self, np.where(accepted, quantity, 0.0), limit_prices=prices)
+        else:
+            self.apply_fills(np.where(accepted, quantity, 0.0), prices)
+        return accepted
+
+    def check_limits(self, price, quantity: np.ndarray) -> np.ndarray:
+        """Mask of non-zero orders that stay within position and risk limits."""
+        new_position = self.quantity + quantity
+
+        # Position and risk limits, same checks as Participant.check_limits
+        return ((quantity != 0)
+                & (np.abs(new_position) <= self.max_position_size)
+                & (np.abs(new_position * price) <= self.risk_limit))
+
+    def apply_fills(self, quantity: np.ndarray, price, timestamp: Optional[datetime] = None):
+        """Apply fills (already risk-checked) at scalar or per-agent prices."""
+        filled = quantity != 0
+        flat = filled & (self.quantity == 0)
+        new_position = self.quantity + quantity
+        total_cost = self.quantity * self.avg_entry_price + quantity * price
+
+        # Flat agents enter at the fill price, others average in
+        reprice = filled & ~flat & (new_position != 0)
+        self.avg_entry_price = np.where(
+            flat, price,
+            np.where(reprice, total_cost / np.where(reprice, new_position, 1.0),
+                     self.avg_entry_price))
+        self.quantity = np.where(filled, new_position, self.quantity)
+        self.total_trades += filled
+
+    def update_positions(self, current_price: float):
+        """Update unrealized PnL of all agents with the current market price."""
+        in_position = self.quantity != 0
+        self.unrealized_pnl = np.where(
+            in_position, (current_price - self.avg_entry_price) * self.quantity,
+            self.unrealized_pnl)
+        self.last_update_price[:] = current_price
+
+    def get_total_pnl(self) -> np.ndarray:
+        """Get total PnL (realized + unrealized) per agent."""
+        return self.realized_pnl + self.unrealized_pnl
+
+    @abstractmethod
+    def on_market_update(self, price: float, volume: float, timestamp: datetime):
+        """
+        Advance every agent by one market update
+
+        Args:
+            price: Current market price
+            volume: Current market volume
+            timestamp: Update timestamp
+        """
+        pass
@@ -3,4 +3,5 @@ from .market_maker import MarketMaker
 from .position_taker import PositionTaker
 from .stat_arb import StatisticalArbitrageTrader
 from .twap import TWAPTrader
-from .vwap import VWAPTrader
\ No newline at end of file
+from .vwap import VWAPTrader
+from .population import MarketMakerPopulation, PositionTakerPopulation
\ No newline at end of file
@@ -0,0 +1,120 @@
+from datetime import datetime
+import numpy as np
+from ..base.population import ParticipantPopulation
+
+
+class MarketMakerPopulation(ParticipantPopulation):
+    """Vectorized equivalent of N MarketMaker agents (see market_maker.py)."""
+
+    def __init__(self, configs):
+        super().__init__(configs)
+        self.spread_width = self.params['spread_width'].astype(float)
+        self.max_inventory = self.params['max_inventory'].astype(float)
+        self.min_trade_size = self.params['min_trade_size'].astype(float)
+        self.last_price = None
+
+    def on_market_update(self, price: float, volume: float, timestamp: datetime):
+        """Handle market updates and make trading decisions for all agents."""
+        self.update_positions(price)
+
+        if self.last_price is not None:
+            # Always allow trading unless position limits are hit
+            can_trade = np.abs(self.quantity) < self.max_inventory
+            moved_up = price > self.last_price + self.spread_width * price
+            moved_down = price < self.last_price - self.spread_width * price
+
+            # Price moved above our last ask - sell; below our last bid - buy
+            sell = can_trade & moved_up & (self.quantity > -self.max_inventory)
+            buy = can_trade & ~moved_up & moved_down & (self.quantity < self.max_inventory)
+            orders = np.where(sell, -self.min_trade_size,
+                              np.where(buy, self.min_trade_size, 0.0))
+            self.execute_trades(price, orders, timestamp)
+
+        self.last_price = price
+
+        # Manage inventory if position is too large
+        self.manage_inventory(price, timestamp)
+
+    def manage_inventory(self, current_price: float, timestamp: datetime):
+        """Actively manage inventory to maintain target position."""
+        too_large = np.abs(self.quantity) > self.max_inventory * 0.8  # 80% of max
+        if too_large.any():
+            reduction = np.where(too_large, -np.sign(self.quantity) * self.min_trade_size, 0.0)
+            self.execute_trades(current_price, reduction, timestamp)
+
+
+class PositionTakerPopulation(ParticipantPopulation):
+    """Vectorized equivalent of N PositionTaker agents (see position_taker.py)."""
+
+    def __init__(self, configs):
+        super().__init__(configs)
+        self.momentum_period = self.params['momentum_period'].astype(int)
+        self.volatility_period = self.params['volatility_period'].astype(int)
+        self.entry_threshold = self.params['entry_threshold'].astype(float)
+        self.stop_loss = self.params['stop_loss'].astype(float)
+        self.take_profit = self.params['take_profit'].astype(float)
+        self.entry_price = np.full(self.size, np.nan)
+
+        # All agents see the same price stream, so they share one log-price
+        # buffer; signals are computed once per distinct lookback period.
+        self._periods, self._period_index = np.unique(self.momentum_period, return_inverse=True)
+        history_len = int(np.max(np.maximum(self.momentum_period, self.volatility_period)) * 2)
+        self._log_prices = np.zeros(history_len)
+        self._num_prices = 0
+
+    def calculate_signals(self):
+        """Calculate momentum and volatility signals for every agent."""
+        momentum = np.zeros(len(self._periods))
+        volatility = np.zeros(len(self._periods))
+        for i, period in enumerate(self._periods):
+            if self._num_prices < period:
+                continue
+            returns = np.diff(self._log_prices[-period:])
+            momentum[i] = np.mean(returns) * np.sqrt(252)  # Annualized momentum
+            volatility[i] = np.std(returns) * np.sqrt(252)  # Annualized volatility
+        return momentum[self._period_index], volatility[self._period_index]
+
+    def calculate_position_size(self, momentum: np.ndarray, volatility: np.ndarray) -> np.ndarray:
+        """Calculate position sizes based on volatility and momentum."""
+        safe_vol = np.where(volatility == 0, 1.0, volatility)
+        volatility_scalar = np.minimum(1.0, 0.2 / safe_vol)
+        momentum_scalar = np.minimum(1.0, np.abs(momentum) / self.entry_threshold)
+        base_size = self.max_position_size * 0.2  # Start with 20% of max
+        return np.where(volatility == 0, 0.0, base_size * volatility_scalar * momentum_scalar)
+
+    def on_market_update(self, price: float, volume: float, timestamp: datetime):
+        """Handle market updates and make trading decisions for all agents."""
+        self.update_positions(price)
+        self._log_prices[:-1] = self._log_prices[1:]
+        self._log_prices[-1] = np.log(price)
+        self._num_prices += 1
+
+        # Exit conditions for agents in a position
+        in_position = (self.quantity != 0) & ~np.isnan(self.entry_price)
+        long = self.quantity > 0
+        stop_hit = np.where(long, price <= self.entry_price * (1 - self.stop_loss),
+                            price >= self.entry_price * (1 + self.stop_loss))
+        target_hit = np.where(long, price >= self.entry_price * (1 + self.take_profit),
+                              price <= self.entry_price * (1 - self.take_profit))
+        exiting = in_position & (stop_hit | target_hit)
+        if exiting.any():
+            self.execute_trades(price, np.where(exiting, -self.quantity, 0.0), timestamp)
+            self.entry_price[exiting] = np.nan
+
+        # Entry logic for flat agents with a strong enough signal
+        momentum, volatility = self.calculate_signals()
+        entering = (~exiting & (momentum != 0) & (self.quantity == 0)
+                    & (np.abs(momentum) > self.entry_threshold))
+        if not entering.any():
+            return
+
+        trade_size = self.calculate_position_size(momentum, volatility) * np.sign(momentum)
+        entering &= np.abs(trade_size) >= 1.0  # Only trade if size is meaningful
+        self.execute_trades(price, np.where(entering, trade_size, 0.0), timestamp)
+
+    def apply_fills(self, quantity: np.ndarray, price, timestamp: datetime = None):
+        """Apply fills and track entry prices from them, as PositionTaker.on_fill does."""
+        super().apply_fills(quantity, price, timestamp)
+        adding = (quantity != 0) & (quantity * self.quantity > 0)  # Opened or added to the position
+        self.entry_price = np.where(self.quantity == 0, np.nan,
+                                    np.where(adding, self.avg_entry_price, self.entry_price))
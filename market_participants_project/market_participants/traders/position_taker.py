@@ -100,5 +100,12 @@ class PositionTaker(Participant):
                 trade_size = position_size * np.sign(signals['momentum'])
                 
                 if abs(trade_size) >= 1.0:  # Only trade if size is meaningful
-                    if self.execute_trade(price, trade_size, timestamp):
-                        self.entry_price = price
\ No newline at end of file
+                    self.execute_trade(price, trade_size, timestamp)
+                    
+    def on_fill(self, price: float, quantity: float, timestamp: datetime = None):
+        """Track the entry price from actual fills, which may come after the order was routed."""
+        super().on_fill(price, quantity, timestamp)
+        if self.position.quantity == 0:
+            self.entry_price = None
+        elif quantity * self.position.quantity > 0:  # Opened or added to the position
+            self.entry_price = self.position.avg_entry_price
\ No newline at end of file
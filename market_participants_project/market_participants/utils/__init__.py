@@ -1,2 +1,4 @@
 # market_participants/utils/__init__.py
-from .metrics import TradingMetrics
\ No newline at end of file
+from .metrics import TradingMetrics
+from .online_metrics import OnlineTradingMetrics, QuantileSketch
+from .resampling import bootstrap_metrics, resimulate_metrics
\ No newline at end of file
@@ -1,10 +1,21 @@
 # market_participants/utils/metrics.py
 
 import numpy as np
-from typing import List, Dict, Optional
+import pandas as pd
+from typing import List, Dict, Optional, Sequence
 from datetime import datetime
 
 class TradingMetrics:
+    # Return and risk columns of generate_batch_report, in report order
+    BATCH_COLUMN_ORDER = ('sharpe_ratio', 'sortino_ratio', 'calmar_ratio', 'annualized_return',
+                          'annualized_volatility', 'total_return', 'var_95', 'var_99', 'expected_shortfall_95',
+                          'expected_shortfall_99', 'skewness', 'kurtosis', 'max_drawdown', 'avg_drawdown',
+                          'drawdown_std', 'current_drawdown')
+    # Columns computed from the equity curve, and from the lower tail of the returns
+    PRICE_PATH_METRICS = ('calmar_ratio', 'total_return', 'max_drawdown', 'avg_drawdown', 'drawdown_std',
+                          'current_drawdown')
+    TAIL_RISK_METRICS = ('var_95', 'var_99', 'expected_shortfall_95', 'expected_shortfall_99')
+
     @staticmethod
     def calculate_returns(prices: List[float]) -> np.ndarray:
         """Calculate log returns from price series."""
@@ -80,6 +91,20 @@ class TradingMetrics:
         var = np.percentile(returns, (1 - confidence) * 100)
         return np.mean(returns[returns <= var])
         
+    @staticmethod
+    def calculate_skewness(returns: np.ndarray) -> float:
+        """Calculate skewness of returns (biased estimator, as scipy.stats.skew)."""
+        deviations = returns - np.mean(returns)
+        m2 = np.mean(deviations**2)
+        return float(np.mean(deviations**3) / m2**1.5) if m2 > 0 else float('nan')
+        
+    @staticmethod
+    def calculate_kurtosis(returns: np.ndarray) -> float:
+        """Calculate excess kurtosis of returns (biased estimator, as scipy.stats.kurtosis)."""
+        deviations = returns - np.mean(returns)
+        m2 = np.mean(deviations**2)
+        return float(np.mean(deviations**4) / m2**2 - 3) if m2 > 0 else float('nan')
+        
     @staticmethod
     def calculate_beta(returns: np.ndarray, market_returns: np.ndarray) -> float:
         """Calculate beta relative to market returns."""
@@ -182,8 +207,8 @@ class TradingMetrics:
             'var_99': TradingMetrics.calculate_var(returns, 0.99),
             'expected_shortfall_95': TradingMetrics.calculate_expected_shortfall(returns),
             'expected_shortfall_99': TradingMetrics.calculate_expected_shortfall(returns, 0.99),
-            'skewness': float(np.nan) if len(returns) < 2 else float(stats.skew(returns)),
-            'kurtosis': float(np.nan) if len(returns) < 2 else float(stats.kurtosis(returns)),
+            'skewness': TradingMetrics.calculate_skewness(returns),
+            'kurtosis': TradingMetrics.calculate_kurtosis(returns),
             **TradingMetrics.calculate_drawdown_metrics(prices)
         }
         
@@ -225,4 +250,223 @@ class TradingMetrics:
                 'tracking_error': np.std(returns - benchmark_returns) * np.sqrt(252)
             }
             
-        return report
\ No newline at end of file
+        return report
+        
+    @classmethod
+    def generate_batch_report(cls,
+                              returns: Optional[np.ndarray] = None,
+                              prices: Optional[np.ndarray] = None,
+                              fills: Optional[pd.DataFrame] = None,
+                              benchmark_returns: Optional[np.ndarray] = None,
+                              names: Optional[Sequence] = None,
+                              risk_free_rate: float = 0.0,
+                              metrics: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Performance report of many strategies at once, one row per strategy.
+        
+        Computes the risk, return, drawdown, benchmark and trade metrics of
+        generate_performance_report with axis-wise NumPy operations over a
+        (strategies x time) matrix instead of one strategy's lists, e.g. to
+        compare the results of a parameter sweep.
+        
+        Args:
+            returns: Log returns of shape (strategies, periods); derived from prices if omitted
+            prices: Equity curves of shape (strategies, periods + 1); built from returns if omitted
+            fills: Columnar table (DataFrame or dict of arrays) with a 'strategy' column (row
+                index or name) and a 'pnl' column per closed trade; 'price' and 'quantity'
+                columns add volume and VWAP
+            benchmark_returns: Benchmark returns shared by all strategies, shape (periods,)
+            names: Strategy names used as the index (default 0 .. strategies - 1)
+            risk_free_rate: Per-period risk free rate for the Sharpe and Sortino ratios
+            metrics: Columns to compute (default all); the equity curve and the tail risk
+                are only built when a requested column needs them
+        
+        Returns:
+            DataFrame indexed by strategy
+        """
+        if returns is None and prices is None:
+            raise ValueError("Pass returns or prices")
+        if returns is None:
+            prices = np.atleast_2d(np.asarray(prices, dtype=float))
+            returns = np.diff(np.log(prices), axis=1)
+        returns = np.atleast_2d(np.asarray(returns, dtype=float))
+        num_strategies, periods = returns.shape
+        wanted = None if metrics is None else set(metrics)
+        needs_prices = wanted is None or not wanted.isdisjoint(cls.PRICE_PATH_METRICS)
+        needs_tails = wanted is None or not wanted.isdisjoint(cls.TAIL_RISK_METRICS)
+        if needs_prices:
+            if prices is None:
+                prices = np.exp(np.concatenate([np.zeros((len(returns), 1)), np.cumsum(returns, axis=1)], axis=1))
+            prices = np.atleast_2d(np.asarray(prices, dtype=float))
+            if len(prices) != num_strategies:
+                raise ValueError("returns and prices must have one row per strategy")
+        index = pd.Index(range(num_strategies) if names is None else list(names), name='strategy')
+        report = {}
+        
+        # Moments of returns: row-wise dot products avoid extra (strategies x time) temporaries
+        mean = returns.mean(axis=1)
+        deviations = returns - mean[:, None]
+        squared = deviations * deviations
+        variance = squared.mean(axis=1)
+        std = np.sqrt(variance)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            skewness = np.einsum('ij,ij->i', squared, deviations) / periods / variance**1.5
+            kurtosis = np.einsum('ij,ij->i', squared, squared) / periods / variance**2 - 3
+            excess_mean = mean - risk_free_rate
+            sharpe = np.where(std != 0, np.sqrt(252) * excess_mean / std, np.nan)
+            
+            # Downside deviation: std of the negative returns of each strategy
+            downside = np.minimum(returns, 0.0)
+            num_negative = (downside < 0).sum(axis=1)
+            downside_mean = downside.sum(axis=1) / num_negative
+            downside_std = np.sqrt(np.maximum(np.einsum('ij,ij->i', downside, downside) / num_negative
+                                              - downside_mean**2, 0))
+            sortino = np.where((num_negative > 0) & (downside_std != 0), np.sqrt(252) * excess_mean / downside_std, 0.0)
+        enough = periods >= 2
+        
+        report.update({
+            'sharpe_ratio': sharpe if enough else np.zeros(num_strategies),
+            'sortino_ratio': sortino if enough else np.zeros(num_strategies),
+            'annualized_return': mean * 252,
+            'annualized_volatility': std * np.sqrt(252),
+            'skewness': skewness,
+            'kurtosis': kurtosis
+        })
+        
+        if needs_prices:
+            # Drawdowns of the equity curves
+            peaks = np.maximum.accumulate(prices, axis=1)
+            drawdowns = 1 - prices / peaks
+            max_drawdown = drawdowns.max(axis=1)
+            avg_drawdown = drawdowns.mean(axis=1)
+            drawdown_std = np.sqrt(np.maximum(np.einsum('ij,ij->i', drawdowns, drawdowns) / drawdowns.shape[1]
+                                              - avg_drawdown**2, 0))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                calmar = np.where(max_drawdown != 0, mean * 252 / max_drawdown, np.inf)
+            report.update({
+                'calmar_ratio': calmar if periods >= 1 and prices.shape[1] >= 2 else np.zeros(num_strategies),
+                'total_return': prices[:, -1] / prices[:, 0] - 1,
+                'max_drawdown': max_drawdown,
+                'avg_drawdown': avg_drawdown,
+                'drawdown_std': drawdown_std,
+                'current_drawdown': drawdowns[:, -1]
+            })
+            
+        if needs_tails:
+            (var_95, var_99), (shortfall_95, shortfall_99) = cls._batch_tail_risk(returns, (0.95, 0.99))
+            report.update({
+                'var_95': var_95,
+                'var_99': var_99,
+                'expected_shortfall_95': shortfall_95,
+                'expected_shortfall_99': shortfall_99
+            })
+        
+        if benchmark_returns is not None:
+            benchmark = np.asarray(benchmark_returns, dtype=float)
+            if benchmark.shape != (periods,):
+                raise ValueError("benchmark_returns must have one value per period")
+            benchmark_deviations = benchmark - benchmark.mean()
+            benchmark_variance = (benchmark_deviations**2).mean()
+            covariance = deviations @ benchmark_deviations
+            # Moments of the active returns follow from those of the returns and the benchmark
+            active_std = np.sqrt(np.maximum(variance + benchmark_variance - 2 * covariance / periods, 0))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                report.update({
+                    # Sample covariance over population variance, as calculate_beta
+                    'beta': covariance / (periods - 1) / benchmark_variance if benchmark_variance != 0 else 0.0,
+                    'information_ratio': np.where(active_std != 0, (mean - benchmark.mean()) / active_std, 0.0),
+                    'correlation': covariance / np.sqrt(variance * benchmark_variance) / periods,
+                    'tracking_error': active_std * np.sqrt(252)
+                })
+                
+        if fills is not None:
+            report.update(cls._batch_trade_statistics(fills, index))
+            
+        report = pd.DataFrame(report, index=index)
+        if wanted is None:
+            return report[[column for column in cls.BATCH_COLUMN_ORDER if column in report]
+                          + [column for column in report if column not in cls.BATCH_COLUMN_ORDER]]
+        return report[list(metrics)]
+        
+    @staticmethod
+    def _batch_tail_risk(returns: np.ndarray, confidences: Sequence[float]):
+        """
+        VaR (np.percentile with linear interpolation) and expected shortfall of every row.
+        
+        Only the lower tail is sorted: one partition moves the smallest values of each row to
+        the front, so the cost does not depend on a full per-row sort.
+        """
+        periods = returns.shape[1]
+        positions = [(1 - confidence) * (periods - 1) for confidence in confidences]
+        size = min(int(np.floor(max(positions))) + 2, periods)
+        tail = np.sort(np.partition(returns, size - 1, axis=1)[:, :size], axis=1) if size < periods \
+            else np.sort(returns, axis=1)
+        vars_, shortfalls = [], []
+        for position in positions:
+            low = int(np.floor(position))
+            high = min(low + 1, size - 1)
+            var = tail[:, low] + (position - low) * (tail[:, high] - tail[:, low])
+            below = tail <= var[:, None]
+            count = below.sum(axis=1)
+            total = (tail * below).sum(axis=1)
+            # Values equal to the VaR can also lie beyond the sorted tail
+            ties = np.flatnonzero(tail[:, -1] == var) if size < periods else []
+            if len(ties):
+                extra = (returns[ties] <= var[ties, None]).sum(axis=1) - count[ties]
+                count[ties] += extra
+                total[ties] += extra * var[ties]
+            vars_.append(var)
+            shortfalls.append(total / count)
+        return vars_, shortfalls
+        
+    @staticmethod
+    def _batch_trade_statistics(fills, index: pd.Index) -> Dict:
+        """Trade statistics of all strategies from a columnar fills table, grouped with bincount."""
+        strategy = np.asarray(fills['strategy'])
+        if strategy.dtype.kind in 'iu':
+            codes = strategy.astype(np.int64)
+        else:
+            codes = index.get_indexer(strategy)
+        if (codes < 0).any() or (codes >= len(index)).any():
+            raise ValueError("fills reference unknown strategies")
+        pnl = np.asarray(fills['pnl'], dtype=float)
+        size = len(index)
+        
+        def total(weights=None):
+            return np.bincount(codes, weights, minlength=size)
+            
+        profit, loss = pnl > 0, pnl < 0
+        count = total()
+        profitable = total(profit.astype(float))
+        losing = total(loss.astype(float))
+        gross_profit = total(np.where(profit, pnl, 0.0))
+        gross_loss = total(np.where(loss, pnl, 0.0))
+        pnl_sum = total(pnl)
+        largest_profit = np.zeros(size)
+        np.maximum.at(largest_profit, codes[profit], pnl[profit])
+        largest_loss = np.zeros(size)
+        np.minimum.at(largest_loss, codes[loss], pnl[loss])
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            average_pnl = pnl_sum / count
+            pnl_variance = total((pnl - average_pnl[codes])**2) / count
+            stats = {
+                'total_trades': count.astype(np.int64),
+                'profitable_trades': profitable.astype(np.int64),
+                'loss_trades': losing.astype(np.int64),
+                'win_rate': np.where(count > 0, profitable / count, 0.0),
+                'average_profit': np.where(profitable > 0, gross_profit / profitable, 0.0),
+                'average_loss': np.where(losing > 0, gross_loss / losing, 0.0),
+                'largest_profit': largest_profit,
+                'largest_loss': largest_loss,
+                'total_pnl': pnl_sum,
+                'profit_factor': np.where(losing > 0, np.abs(gross_profit / gross_loss), np.inf),
+                'average_trade_pnl': np.where(count > 0, average_pnl, 0.0),
+                'pnl_std': np.where(count > 0, np.sqrt(pnl_variance), 0.0)
+            }
+            if 'quantity' in fills and 'price' in fills:
+                volume = total(np.abs(np.asarray(fills['quantity'], dtype=float)))
+                notional = total(np.abs(np.asarray(fills['quantity'], dtype=float)) * np.asarray(fills['price'], dtype=float))
+                stats['volume'] = volume
+                stats['vwap'] = np.where(volume > 0, notional / volume, 0.0)
+        return stats
@@ -0,0 +1,389 @@
+# market_participants/utils/online_metrics.py
+
+import numpy as np
+from typing import Dict, Optional, Union
+from datetime import datetime
+
+ArrayLike = Union[float, np.ndarray, list]
+
+
+class QuantileSketch:
+    """
+    Streaming quantile estimate in bounded memory (a merging t-digest).
+
+    Values are buffered and periodically compressed into at most about
+    `compression` weighted centroids. Centroids are small in the tails and
+    large around the median, so tail quantiles such as VaR stay accurate.
+    Until the first compression the sketch is exact and matches np.percentile.
+    """
+
+    def __init__(self, compression: int = 500):
+        self.compression = compression
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._buffer = []
+        self._buffered = 0
+
+    def add(self, values: ArrayLike):
+        """Add one value or an array of values."""
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._buffer.append(values)
+        self._buffered += len(values)
+        if self._buffered >= 5 * self.compression:
+            self._compress()
+
+    def _compress(self):
+        """Merge the buffer into the centroids, each spanning at most about one unit of the k1 scale."""
+        means = np.concatenate([self._means, *self._buffer])
+        weights = np.concatenate([self._weights, np.ones(self._buffered)])
+        self._buffer, self._buffered = [], 0
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        if len(means) < 5 * self.compression:
+            # Few enough values to keep them all (e.g. a quantile read before the buffer filled up)
+            self._means, self._weights = means, weights
+            return
+
+        total = weights.sum()
+        q = (np.cumsum(weights) - 0.5 * weights) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        group = np.floor(k - k[0]).astype(np.int64)
+        # Centroids that already span more than one unit of k stay on their own
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+        self._weights = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(means * weights, starts) / self._weights
+
+    def _centroids(self):
+        if self._buffered:
+            self._compress()
+        return self._means, self._weights
+
+    def quantile(self, q: float) -> float:
+        """Estimate of np.percentile(values, 100 * q)."""
+        if self.count == 0:
+            return float('nan')
+        means, weights = self._centroids()
+        centers = np.cumsum(weights) - 0.5 * weights
+        rank = q * (self.count - 1) + 0.5
+        return float(np.interp(rank, np.r_[0.0, centers, self.count], np.r_[self.min, means, self.max]))
+
+    def tail_mean(self, q: float) -> float:
+        """Estimate of the mean of the values at or below the q-quantile (expected shortfall)."""
+        if self.count == 0:
+            return float('nan')
+        means, weights = self._centroids()
+        tail = np.floor(q * (self.count - 1)) + 1
+        mass = np.r_[0.0, np.cumsum(weights)]
+        total = np.r_[0.0, np.cumsum(means * weights)]
+        return float(np.interp(tail, mass, total) / tail)
+
+
+class _Moments:
+    """Count, mean and central moments M2..M4, updated by merging batches (Pebay's formulas)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+
+    def add(self, values: np.ndarray):
+        n_b = len(values)
+        if n_b == 0:
+            return
+        if n_b == 1:
+            self._merge(1, float(values[0]), 0.0, 0.0, 0.0)
+            return
+        mean_b = float(values.mean())
+        d = values - mean_b
+        d2 = d * d
+        self._merge(n_b, mean_b, float(d2.sum()), float((d2 * d).sum()), float((d2 * d2).sum()))
+
+    def _merge(self, n_b, mean_b, m2_b, m3_b, m4_b):
+        n_a, mean_a, m2_a, m3_a = self.n, self.mean, self.m2, self.m3
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        delta_n = delta / n
+        self.m4 += (m4_b + delta * delta_n**3 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b)
+                    + 6 * delta_n**2 * (n_a * n_a * m2_b + n_b * n_b * m2_a)
+                    + 4 * delta_n * (n_a * m3_b - n_b * m3_a))
+        self.m3 += (m3_b + delta * delta_n**2 * n_a * n_b * (n_a - n_b)
+                    + 3 * delta_n * (n_a * m2_b - n_b * m2_a))
+        self.m2 += m2_b + delta * delta_n * n_a * n_b
+        self.mean = mean_a + delta_n * n_b
+        self.n = n
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.n if self.n else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    @property
+    def skewness(self) -> float:
+        return self.m3 * np.sqrt(self.n) / self.m2**1.5 if self.m2 > 0 else float('nan')
+
+    @property
+    def kurtosis(self) -> float:
+        return self.n * self.m4 / self.m2**2 - 3 if self.m2 > 0 else float('nan')
+
+
+class OnlineTradingMetrics:
+    """
+    Incremental version of TradingMetrics.generate_performance_report.
+
+    Returns, prices, benchmark returns, trade PnLs, fills and positions are
+    added one value or one chunk at a time and folded into running
+    statistics. These are moments, the running peak and drawdown, win/loss
+    counts and a QuantileSketch for VaR and expected shortfall. Memory use
+    does not grow with the length of the simulation, so report() can be
+    called at any point, e.g. to refresh a live dashboard.
+
+    Everything except VaR and expected shortfall matches the batch report up
+    to floating point error. Those two come from the sketch and are exact
+    until it first compresses (5 * compression returns).
+    """
+
+    def __init__(self, compression: int = 500):
+        self.returns = _Moments()
+        self.downside = _Moments()
+        self.active = _Moments()
+        self.drawdowns = _Moments()
+        self.pnl = _Moments()
+        self.position_sizes = _Moments()
+        self.holding_periods = _Moments()
+        self.sketch = QuantileSketch(compression)
+
+        # Returns paired with benchmark returns
+        self.paired = 0
+        self.paired_mean = np.zeros(2)
+        self.paired_m2 = np.zeros(2)
+        self.paired_cov = 0.0
+
+        self.num_prices = 0
+        self.first_price = None
+        self.last_price = None
+        self.peak = -np.inf
+        self.max_drawdown = 0.0
+        self.current_drawdown = 0.0
+
+        self.num_trades = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.profitable_trades = 0
+        self.loss_trades = 0
+        self.largest_profit = 0.0
+        self.largest_loss = 0.0
+
+        self.num_fills = 0
+        self.fill_volume = 0.0
+        self.fill_notional = 0.0
+
+        self.num_positions = 0
+        self.max_position_size = -np.inf
+        self.min_position_size = np.inf
+        self.max_holding_period = -np.inf
+        self.min_holding_period = np.inf
+
+    def add_returns(self, returns: ArrayLike, benchmark_returns: Optional[ArrayLike] = None):
+        """Add one return or a chunk of returns, optionally with the benchmark returns of the same periods."""
+        returns = np.atleast_1d(np.asarray(returns, dtype=float))
+        self.returns.add(returns)
+        self.downside.add(returns[returns < 0])
+        self.sketch.add(returns)
+        if benchmark_returns is None:
+            return
+        benchmark = np.atleast_1d(np.asarray(benchmark_returns, dtype=float))
+        if benchmark.shape != returns.shape:
+            raise ValueError("returns and benchmark_returns must have the same length")
+        self.active.add(returns - benchmark)
+
+        pair = np.vstack([returns, benchmark])
+        n_a, n_b = self.paired, len(returns)
+        mean_b = pair.mean(axis=1)
+        d = pair - mean_b[:, None]
+        delta = mean_b - self.paired_mean
+        n = n_a + n_b
+        self.paired_cov += float(d[0] @ d[1]) + delta[0] * delta[1] * n_a * n_b / n
+        self.paired_m2 += (d * d).sum(axis=1) + delta**2 * n_a * n_b / n
+        self.paired_mean += delta * n_b / n
+        self.paired = n
+
+    def add_prices(self, prices: ArrayLike):
+        """Add one price or a chunk of prices of the equity curve (drawdowns and total return)."""
+        prices = np.atleast_1d(np.asarray(prices, dtype=float))
+        if len(prices) == 0:
+            return
+        if self.first_price is None:
+            self.first_price = float(prices[0])
+        peaks = np.maximum(np.maximum.accumulate(prices), self.peak)
+        drawdowns = (peaks - prices) / peaks
+        self.drawdowns.add(drawdowns)
+        self.peak = float(peaks[-1])
+        self.max_drawdown = max(self.max_drawdown, float(drawdowns.max()))
+        self.current_drawdown = float(drawdowns[-1])
+        self.last_price = float(prices[-1])
+        self.num_prices += len(prices)
+
+    def add_pnl(self, pnl: ArrayLike):
+        """Add the PnL of one closed trade or of a chunk of trades."""
+        pnl = np.atleast_1d(np.asarray(pnl, dtype=float))
+        if len(pnl) == 0:
+            return
+        profits, losses = pnl[pnl > 0], pnl[pnl < 0]
+        self.pnl.add(pnl)
+        self.num_trades += len(pnl)
+        self.profitable_trades += len(profits)
+        self.loss_trades += len(losses)
+        self.gross_profit += float(profits.sum())
+        self.gross_loss += float(losses.sum())
+        if len(profits):
+            self.largest_profit = max(self.largest_profit, float(profits.max()))
+        if len(losses):
+            self.largest_loss = min(self.largest_loss, float(losses.min()))
+
+    def add_trade(self, trade: Dict):
+        """Add a trade record with a 'pnl' entry (as in TradingMetrics.calculate_trade_statistics)."""
+        self.add_pnl(trade.get('pnl', 0))
+
+    def add_fill(self, price: float, quantity: float):
+        """Add a fill (quantity positive for buys, negative for sells)."""
+        self.num_fills += 1
+        self.fill_volume += abs(quantity)
+        self.fill_notional += abs(quantity) * price
+
+    def add_position(self, position: Dict):
+        """Add a position record with 'quantity' and optional 'entry_time' / 'exit_time'."""
+        size = abs(position.get('quantity', 0))
+        self.position_sizes.add(np.array([size], dtype=float))
+        self.max_position_size = max(self.max_position_size, size)
+        self.min_position_size = min(self.min_position_size, size)
+        self.num_positions += 1
+        if position.get('entry_time'):
+            hours = (position.get('exit_time', datetime.now()) - position['entry_time']).total_seconds() / 3600
+            self.holding_periods.add(np.array([hours]))
+            self.max_holding_period = max(self.max_holding_period, hours)
+            self.min_holding_period = min(self.min_holding_period, hours)
+
+    def trade_metrics(self) -> Dict:
+        if self.num_trades == 0:
+            return {}
+        return {
+            'total_trades': self.num_trades,
+            'profitable_trades': self.profitable_trades,
+            'loss_trades': self.loss_trades,
+            'win_rate': self.profitable_trades / self.num_trades,
+            'average_profit': self.gross_profit / self.profitable_trades if self.profitable_trades else 0,
+            'average_loss': self.gross_loss / self.loss_trades if self.loss_trades else 0,
+            'largest_profit': self.largest_profit,
+            'largest_loss': self.largest_loss,
+            'total_pnl': self.gross_profit + self.gross_loss,
+            'profit_factor': abs(self.gross_profit / self.gross_loss) if self.loss_trades else float('inf'),
+            'average_trade_pnl': self.pnl.mean,
+            'pnl_std': self.pnl.std
+        }
+
+    def position_metrics(self) -> Dict:
+        if self.num_positions == 0:
+            return {}
+        held = self.holding_periods.n > 0
+        return {
+            'avg_position_size': self.position_sizes.mean,
+            'max_position_size': self.max_position_size,
+            'min_position_size': self.min_position_size,
+            'position_size_std': self.position_sizes.std,
+            'avg_holding_period': self.holding_periods.mean if held else 0,
+            'max_holding_period': self.max_holding_period if held else 0,
+            'min_holding_period': self.min_holding_period if held else 0,
+            'holding_period_std': self.holding_periods.std if held else 0
+        }
+
+    def fill_metrics(self) -> Dict:
+        if self.num_fills == 0:
+            return {}
+        return {
+            'total_fills': self.num_fills,
+            'fill_volume': self.fill_volume,
+            'fill_vwap': self.fill_notional / self.fill_volume if self.fill_volume else 0.0
+        }
+
+    def drawdown_metrics(self) -> Dict:
+        if self.num_prices < 2:
+            return {}
+        return {
+            'max_drawdown': self.max_drawdown,
+            'avg_drawdown': self.drawdowns.mean,
+            'drawdown_std': self.drawdowns.std,
+            'current_drawdown': self.current_drawdown
+        }
+
+    def risk_metrics(self) -> Dict:
+        if self.returns.n < 2:
+            return {}
+        return {
+            'volatility': self.returns.std * np.sqrt(252),
+            'var_95': self.sketch.quantile(0.05),
+            'var_99': self.sketch.quantile(0.01),
+            'expected_shortfall_95': self.sketch.tail_mean(0.05),
+            'expected_shortfall_99': self.sketch.tail_mean(0.01),
+            'skewness': float(self.returns.skewness),
+            'kurtosis': float(self.returns.kurtosis),
+            **self.drawdown_metrics()
+        }
+
+    def return_metrics(self) -> Dict:
+        mean, std, n = self.returns.mean, self.returns.std, self.returns.n
+        sharpe = np.sqrt(252) * mean / std if n >= 2 else 0.0
+        sortino = 0.0
+        if n >= 2 and self.downside.n and self.downside.std != 0:
+            sortino = np.sqrt(252) * mean / self.downside.std
+        calmar = 0.0
+        if n >= 1 and self.num_prices >= 2:
+            calmar = mean * 252 / self.max_drawdown if self.max_drawdown != 0 else float('inf')
+        return {
+            'sharpe_ratio': sharpe,
+            'sortino_ratio': sortino,
+            'calmar_ratio': calmar,
+            'annualized_return': mean * 252 if n else float('nan'),
+            'annualized_volatility': std * np.sqrt(252) if n else float('nan'),
+            'total_return': self.last_price / self.first_price - 1 if self.num_prices > 1 else 0
+        }
+
+    def benchmark_metrics(self) -> Dict:
+        n = self.paired
+        if n == 0:
+            return {}
+        m2_returns, m2_benchmark = self.paired_m2
+        active_std = self.active.std
+        return {
+            'beta': (self.paired_cov / (n - 1)) / (m2_benchmark / n) if n > 1 and m2_benchmark != 0 else 0,
+            'information_ratio': self.active.mean / active_std if active_std != 0 else 0,
+            'correlation': self.paired_cov / np.sqrt(m2_returns * m2_benchmark) if m2_returns * m2_benchmark > 0
+            else float('nan'),
+            'tracking_error': active_std * np.sqrt(252)
+        }
+
+    def report(self) -> Dict:
+        """Performance report in the layout of TradingMetrics.generate_performance_report."""
+        report = {
+            'trade_metrics': self.trade_metrics(),
+            'position_metrics': self.position_metrics(),
+            'risk_metrics': self.risk_metrics(),
+            'return_metrics': self.return_metrics()
+        }
+        if self.paired:
+            report['benchmark_metrics'] = self.benchmark_metrics()
+        if self.num_fills:
+            report['fill_metrics'] = self.fill_metrics()
+        return report
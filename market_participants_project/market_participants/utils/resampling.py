@@ -0,0 +1,150 @@
+# market_participants/utils/resampling.py
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Sequence
+from .metrics import TradingMetrics
+
+'''
+Confidence intervals for strategy metrics. A Sharpe ratio or drawdown
+measured on one synthetic path is a single draw; the intervals here show how
+much it would move on other paths, either by resampling the path's returns
+(stationary block bootstrap, which keeps short-range dependence such as
+volatility clustering) or by re-running the simulation with other seeds.
+Resamples are evaluated in batches with TradingMetrics.generate_batch_report
+and batches can run in parallel across a process pool.
+'''
+
+# Metrics of generate_batch_report that only need returns
+RETURN_METRICS = ('sharpe_ratio', 'sortino_ratio', 'calmar_ratio', 'annualized_return', 'annualized_volatility',
+                  'var_95', 'var_99', 'expected_shortfall_95', 'expected_shortfall_99', 'max_drawdown')
+
+
+def stationary_bootstrap_indices(length: int, num_resamples: int, mean_block: float,
+                                 rng: np.random.Generator) -> np.ndarray:
+    """
+    Index matrix of the stationary bootstrap (Politis & Romano, 1994), shape (num_resamples, length).
+
+    Every resample is a sequence of blocks with geometrically distributed lengths (mean
+    mean_block) starting at uniformly random positions, wrapping around the end of the series.
+    """
+    positions = np.arange(length)
+    new_block = rng.random((num_resamples, length)) < 1 / mean_block
+    new_block[:, 0] = True
+    starts = rng.integers(0, length, (num_resamples, length))
+    # Position where the current block began, carried forward along each row
+    block_start = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+    return (np.take_along_axis(starts, block_start, axis=1) + positions - block_start) % length
+
+
+def summarize(samples: pd.DataFrame, estimates: pd.Series, confidence: float = 0.95) -> pd.DataFrame:
+    """Point estimate, mean, std and percentile interval of every metric (one row per metric)."""
+    alpha = (1 - confidence) / 2
+    values = samples.to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        lower, upper = np.nanpercentile(values, [100 * alpha, 100 * (1 - alpha)], axis=0)
+    return pd.DataFrame({
+        'estimate': estimates[samples.columns].to_numpy(dtype=float),
+        'mean': np.nanmean(values, axis=0),
+        'std': np.nanstd(values, axis=0),
+        'lower': lower,
+        'upper': upper
+    }, index=pd.Index(samples.columns, name='metric'))
+
+
+def _bootstrap_batch(task) -> pd.DataFrame:
+    """Metrics of one batch of resamples (top-level so it can run in a worker process)."""
+    returns, num_resamples, mean_block, seed, metrics = task
+    rng = np.random.default_rng(seed)
+    indices = stationary_bootstrap_indices(len(returns), num_resamples, mean_block, rng)
+    return TradingMetrics.generate_batch_report(returns[indices], metrics=metrics)
+
+
+def bootstrap_metrics(returns: np.ndarray,
+                      num_resamples: int = 10000,
+                      mean_block: Optional[float] = None,
+                      confidence: float = 0.95,
+                      metrics: Sequence[str] = RETURN_METRICS,
+                      seed: Optional[int] = None,
+                      batch_size: int = 1000,
+                      processes: Optional[int] = 1,
+                      return_samples: bool = False):
+    """
+    Stationary block bootstrap confidence intervals for the metrics of one return series.
+
+    Args:
+        returns: Returns (or PnL changes) of one strategy, shape (periods,)
+        num_resamples: Number of bootstrap resamples
+        mean_block: Mean block length (default periods ** (1/3))
+        confidence: Coverage of the percentile intervals
+        metrics: Columns of TradingMetrics.generate_batch_report to resample
+        seed: Seed of the resampling; for a given batch_size, results do not depend on processes
+        batch_size: Resamples evaluated per batch (bounds memory use)
+        processes: Worker processes (None for one per CPU, 1 to run in this process)
+        return_samples: Also return the metrics of every resample
+
+    Returns:
+        DataFrame with 'estimate', 'mean', 'std', 'lower' and 'upper' per metric, plus the
+        (num_resamples x metrics) samples if return_samples is True
+    """
+    returns = np.asarray(returns, dtype=float)
+    if returns.ndim != 1 or len(returns) < 2:
+        raise ValueError("returns must be a series of at least two periods")
+    metrics = list(metrics)
+    if mean_block is None:
+        mean_block = len(returns) ** (1 / 3)
+    if mean_block < 1:
+        raise ValueError("mean_block must be at least 1")
+
+    sizes = [min(batch_size, num_resamples - start) for start in range(0, num_resamples, batch_size)]
+    # One independent stream per batch, so the resamples do not depend on how batches are distributed
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(returns, size, mean_block, batch_seed, metrics) for size, batch_seed in zip(sizes, seeds)]
+    samples = pd.concat(_run(_bootstrap_batch, tasks, processes), ignore_index=True)
+
+    estimates = TradingMetrics.generate_batch_report(returns[None, :], metrics=metrics).iloc[0]
+    summary = summarize(samples, estimates, confidence)
+    return (summary, samples) if return_samples else summary
+
+
+def resimulate_metrics(simulate: Callable[[int], np.ndarray],
+                       seeds: Sequence[int],
+                       confidence: float = 0.95,
+                       metrics: Sequence[str] = RETURN_METRICS,
+                       processes: Optional[int] = 1,
+                       return_samples: bool = False):
+    """
+    Confidence intervals across independent simulation runs.
+
+    Args:
+        simulate: Function seed -> returns of one run (must be picklable for processes > 1,
+            i.e. defined at module level)
+        seeds: Seeds of the runs; paths of different lengths are cut to the shortest
+        confidence: Coverage of the percentile intervals
+        metrics: Columns of TradingMetrics.generate_batch_report to report
+        processes: Worker processes (None for one per CPU, 1 to run in this process)
+        return_samples: Also return the metrics of every run
+
+    Returns:
+        DataFrame with 'estimate' (mean across runs), 'mean', 'std',
+        'lower' and 'upper' per metric, plus the per-run metrics if return_samples is True
+    """
+    seeds = list(seeds)
+    if len(seeds) < 2:
+        raise ValueError("Pass at least two seeds")
+    paths = [np.asarray(path, dtype=float) for path in _run(simulate, seeds, processes)]
+    periods = min(len(path) for path in paths)
+    returns = np.vstack([path[:periods] for path in paths])
+    samples = TradingMetrics.generate_batch_report(returns, names=seeds, metrics=list(metrics))
+    summary = summarize(samples, samples.mean(), confidence)
+    return (summary, samples) if return_samples else summary
+
+
+def _run(function: Callable, tasks: list, processes: Optional[int]) -> list:
+    workers = min(processes or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            return list(pool.map(function, tasks))
+    return [function(task) for task in tasks]
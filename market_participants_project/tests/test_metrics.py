@@ -0,0 +1,139 @@
+# tests/test_metrics.py
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from market_participants.utils import TradingMetrics, OnlineTradingMetrics, QuantileSketch
+from market_participants.utils.resampling import bootstrap_metrics, stationary_bootstrap_indices
+
+def make_inputs(n=20000, seed=3):
+    """Fat-tailed returns with a correlated benchmark, an equity curve, trades and positions."""
+    rng = np.random.default_rng(seed)
+    returns = rng.standard_t(4, n) * 0.01
+    benchmark = 0.5 * returns + rng.normal(0, 0.01, n)
+    prices = 100 * np.exp(np.cumsum(returns))
+    trades = [{'pnl': pnl} for pnl in rng.normal(0.1, 1.0, 300)]
+    start = datetime(2024, 1, 1)
+    positions = [{'quantity': q, 'entry_time': start, 'exit_time': start + timedelta(hours=h)}
+                 for q, h in zip(rng.normal(0, 10, 40), rng.uniform(0, 10, 40))]
+    return returns, benchmark, prices, trades, positions
+
+def test_online_report_matches_batch_report():
+    returns, benchmark, prices, trades, positions = make_inputs()
+    expected = TradingMetrics.generate_performance_report(trades, positions, returns, prices, benchmark)
+
+    metrics = OnlineTradingMetrics()
+    for i in range(0, len(returns), 777):
+        metrics.add_returns(returns[i:i + 777], benchmark[i:i + 777])
+        metrics.add_prices(prices[i:i + 777])
+    for trade in trades:
+        metrics.add_trade(trade)
+    for position in positions:
+        metrics.add_position(position)
+    report = metrics.report()
+
+    sketched = {'var_95', 'var_99', 'expected_shortfall_95', 'expected_shortfall_99'}
+    for section, values in expected.items():
+        for name, value in values.items():
+            rtol = 0.01 if name in sketched else 1e-8
+            np.testing.assert_allclose(report[section][name], value, rtol=rtol, err_msg=f"{section}.{name}")
+
+def test_sketch_is_exact_before_compressing():
+    values = np.random.default_rng(0).normal(size=1000)
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    for q in (0.01, 0.05, 0.5, 0.95):
+        np.testing.assert_allclose(sketch.quantile(q), np.percentile(values, 100 * q))
+    var = np.percentile(values, 5)
+    np.testing.assert_allclose(sketch.tail_mean(0.05), values[values <= var].mean())
+
+def test_batch_report_matches_single_reports():
+    rng = np.random.default_rng(5)
+    returns = rng.standard_t(4, (6, 500)) * 0.01
+    returns[0] = np.where(rng.random(500) < 0.9, 0.0, returns[0])  # stale prices: ties at the VaR
+    benchmark = rng.normal(0, 0.01, 500)
+    prices = 100 * np.exp(np.cumsum(returns, axis=1))
+    fills = pd.DataFrame({'strategy': rng.integers(0, 6, 400), 'pnl': rng.normal(0, 1, 400)})
+    batch = TradingMetrics.generate_batch_report(returns, prices, fills, benchmark)
+
+    for i in range(len(returns)):
+        trades = fills.loc[fills['strategy'] == i, ['pnl']].to_dict('records')
+        report = TradingMetrics.generate_performance_report(trades, [], returns[i], prices[i], benchmark)
+        report['risk_metrics']['annualized_volatility'] = report['risk_metrics'].pop('volatility')
+        for section in ('trade_metrics', 'risk_metrics', 'return_metrics', 'benchmark_metrics'):
+            for name, value in report[section].items():
+                np.testing.assert_allclose(batch.loc[i, name], value, rtol=1e-9, err_msg=f"{i}: {name}")
+
+def test_bootstrap_intervals():
+    rng = np.random.default_rng(2)
+    indices = stationary_bootstrap_indices(500, 400, 10, rng)
+    assert indices.shape == (400, 500)
+    block_starts = np.diff(indices, axis=1) % 500 != 1
+    assert abs(1 / block_starts.mean() - 10) < 1
+
+    # For iid returns the standard error of the annualized Sharpe ratio is about sqrt(252 / n)
+    returns = rng.normal(0.0005, 0.01, 1000)
+    summary = bootstrap_metrics(returns, num_resamples=2000, mean_block=1, seed=0, batch_size=500)
+    sharpe = summary.loc['sharpe_ratio']
+    assert abs(sharpe['std'] / np.sqrt(252 / 1000) - 1) < 0.15
+    assert sharpe['lower'] < sharpe['estimate'] < sharpe['upper']
+    parallel = bootstrap_metrics(returns, num_resamples=2000, mean_block=1, seed=0, batch_size=500, processes=2)
+    pd.testing.assert_frame_equal(summary, parallel)
+
+def test_batch_report_metric_subset():
+    # Dollar PnL would overflow the equity curve; a Sharpe-only report never builds it
+    pnl = np.random.default_rng(4).normal(5, 200, (50, 1000))
+    with np.errstate(over='raise'):
+        subset = TradingMetrics.generate_batch_report(pnl, metrics=['sharpe_ratio'])
+    assert list(subset.columns) == ['sharpe_ratio']
+    returns = pnl / 1e6
+    full = TradingMetrics.generate_batch_report(returns)
+    pd.testing.assert_series_equal(full['sharpe_ratio'],
+                                   TradingMetrics.generate_batch_report(returns, metrics=['sharpe_ratio'])['sharpe_ratio'])
+
+def benchmark_online_metrics(num_returns=1_000_000):
+    """Time tick-by-tick and chunked updates."""
+    returns = np.random.default_rng(0).normal(0, 0.01, num_returns)
+    prices = 100 * np.exp(np.cumsum(returns))
+
+    metrics = OnlineTradingMetrics()
+    start = time.perf_counter()
+    for r, p in zip(returns[:100000], prices[:100000]):
+        metrics.add_returns(r)
+        metrics.add_prices(p)
+    elapsed = time.perf_counter() - start
+    print(f"tick updates: {elapsed / 100000 * 1e6:.1f} us per tick")
+
+    metrics = OnlineTradingMetrics()
+    start = time.perf_counter()
+    for i in range(0, num_returns, 10000):
+        metrics.add_returns(returns[i:i + 10000])
+        metrics.add_prices(prices[i:i + 10000])
+    metrics.report()
+    print(f"chunked updates: {num_returns / (time.perf_counter() - start):,.0f} returns/sec")
+
+def benchmark_batch_report(num_strategies=1000, periods=252):
+    """Time the report of a parameter sweep."""
+    returns = np.random.default_rng(0).normal(0, 0.01, (num_strategies, periods))
+    start = time.perf_counter()
+    TradingMetrics.generate_batch_report(returns)
+    print(f"batch report of {num_strategies} strategies x {periods} periods: "
+          f"{(time.perf_counter() - start) * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    test_online_report_matches_batch_report()
+    test_sketch_is_exact_before_compressing()
+    test_batch_report_matches_single_reports()
+    test_bootstrap_intervals()
+    test_batch_report_metric_subset()
+    print("Online and batch metrics match the single-strategy report")
+    benchmark_online_metrics()
+    benchmark_batch_report()
@@ -0,0 +1,112 @@
+# tests/test_population.py
+import os
+import sys
+import time
+import numpy as np
+from datetime import datetime
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from market_participants.traders import (
+    MarketMaker,
+    PositionTaker,
+    MarketMakerPopulation,
+    PositionTakerPopulation
+)
+from market_participants.configs.participant_configs import (
+    MarketMakerConfig,
+    PositionTakerConfig
+)
+
+def make_prices(n=2000, seed=7):
+    """Random walk price path with enough movement to trigger trades."""
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+
+def assert_population_matches(agents, population, prices):
+    timestamp = datetime(2024, 1, 1)
+    for price in prices:
+        for agent in agents:
+            agent.on_market_update(price=price, volume=1.0, timestamp=timestamp)
+        population.on_market_update(price=price, volume=1.0, timestamp=timestamp)
+
+    np.testing.assert_allclose(population.quantity, [a.position.quantity for a in agents])
+    np.testing.assert_allclose(population.avg_entry_price, [a.position.avg_entry_price for a in agents])
+    np.testing.assert_allclose(population.get_total_pnl(), [a.get_total_pnl() for a in agents])
+    np.testing.assert_array_equal(population.total_trades, [a.metrics['total_trades'] for a in agents])
+
+def test_market_maker_population_matches_agents():
+    configs = [
+        MarketMakerConfig(spread_width=w, max_inventory=inv, min_trade_size=size)
+        for w, inv, size in [(0.0005, 10.0, 0.5), (0.001, 5.0, 1.0), (0.002, 3.0, 2.0), (0.0001, 50.0, 1.0)]
+    ]
+    assert_population_matches([MarketMaker(c) for c in configs], MarketMakerPopulation(configs), make_prices())
+
+def test_position_taker_population_matches_agents():
+    configs = [
+        PositionTakerConfig(momentum_period=m, entry_threshold=e, stop_loss=sl, take_profit=tp, max_position_size=50.0)
+        for m, e, sl, tp in [(10, 0.02, 0.01, 0.02), (20, 0.01, 0.02, 0.01), (5, 0.05, 0.005, 0.005), (20, 0.005, 0.05, 0.1)]
+    ]
+    assert_population_matches([PositionTaker(c) for c in configs], PositionTakerPopulation(configs), make_prices())
+
+class SlippingSink:
+    """Venue that fills routed orders one unit above (buys) or below (sells) the last price."""
+
+    def __init__(self):
+        self.orders = []
+
+    def submit(self, participant, quantity, limit_price=None):
+        self.orders.append((participant, quantity))
+
+    def submit_batch(self, population, quantity, limit_prices=None):
+        self.orders.append((population, quantity))
+
+    def fill(self, price):
+        for owner, quantity in self.orders:
+            if hasattr(owner, 'apply_fills'):
+                owner.apply_fills(quantity, price + np.sign(quantity))
+            else:
+                owner.on_fill(price + np.sign(quantity), quantity)
+        self.orders = []
+
+def test_position_taker_entry_price_comes_from_fills():
+    configs = [PositionTakerConfig(momentum_period=5, entry_threshold=0.01, max_position_size=50.0)]
+    agent, population = PositionTaker(configs[0]), PositionTakerPopulation(configs)
+    sink = SlippingSink()
+    agent.order_sink = population.order_sink = sink
+    timestamp = datetime(2024, 1, 1)
+    for price in make_prices(200):
+        if agent.position.quantity != 0:
+            break
+        agent.on_market_update(price=price, volume=1.0, timestamp=timestamp)
+        population.on_market_update(price=price, volume=1.0, timestamp=timestamp)
+        if sink.orders:
+            assert agent.entry_price is None  # Nothing has filled yet
+            sink.fill(price)
+            fill_price = price + np.sign(agent.position.quantity)
+    assert agent.position.quantity != 0
+    assert agent.entry_price == fill_price
+    np.testing.assert_allclose(population.entry_price, [fill_price])
+
+def benchmark_population(num_agents=10000, num_ticks=1000):
+    """Time a large heterogeneous market maker population."""
+    rng = np.random.default_rng(0)
+    configs = [MarketMakerConfig(spread_width=w, max_inventory=10.0) for w in rng.uniform(0.0001, 0.002, num_agents)]
+    population = MarketMakerPopulation(configs)
+    timestamp = datetime(2024, 1, 1)
+
+    start = time.perf_counter()
+    for price in make_prices(num_ticks):
+        population.on_market_update(price=price, volume=1.0, timestamp=timestamp)
+    elapsed = time.perf_counter() - start
+    print(f"{num_agents} agents x {num_ticks} ticks: {elapsed:.2f}s "
+          f"({num_agents * num_ticks / elapsed:,.0f} agent-ticks/sec)")
+
+if __name__ == "__main__":
+    test_market_maker_population_matches_agents()
+    test_position_taker_population_matches_agents()
+    test_position_taker_entry_price_comes_from_fills()
+    print("Population results match individual agents")
+    benchmark_population()
@@ -17,6 +17,7 @@ from market_participants.traders import (
     TWAPTrader,
     VWAPTrader
 )
+from market_participants.utils import bootstrap_metrics
 from market_participants.configs.participant_configs import (
     MarketMakerConfig,
     StatArbConfig,
@@ -25,6 +26,9 @@ from market_participants.configs.participant_configs import (
     VWAPConfig
 )
 
+# Starting capital of every tested strategy
+INITIAL_CAPITAL = 1000000.0
+
 def load_and_prepare_data(file_path: str) -> pd.DataFrame:
     """Load and prepare the data for testing."""
     data_path = os.path.join(project_root, 'data', file_path)
@@ -46,7 +50,7 @@ def test_market_maker(data: pd.DataFrame):
         max_inventory=10.0,
         min_trade_size=0.5,
         max_trade_size=1.0,
-        initial_capital=1000000.0,
+        initial_capital=INITIAL_CAPITAL,
         risk_limit=100000.0
     )
     
@@ -83,7 +87,7 @@ def test_stat_arb(data: pd.DataFrame):
         entry_threshold=2.0,
         exit_threshold=0.0,
         position_size=5.0,
-        initial_capital=1000000.0,
+        initial_capital=INITIAL_CAPITAL,
         max_position_size=20.0,
         risk_limit=100000.0
     )
@@ -121,7 +125,7 @@ def test_twap(data: pd.DataFrame):
         end_time="16:00:00",
         num_slices=20,
         deviation_threshold=0.02,
-        initial_capital=1000000.0,
+        initial_capital=INITIAL_CAPITAL,
         max_position_size=100.0,
         risk_limit=100000.0
     )
@@ -159,7 +163,7 @@ def test_vwap(data: pd.DataFrame):
         end_time="16:00:00",
         participation_rate=0.1,
         max_participation_rate=0.3,
-        initial_capital=1000000.0,
+        initial_capital=INITIAL_CAPITAL,
         max_position_size=100.0,
         risk_limit=100000.0
     )
@@ -234,7 +238,11 @@ def print_strategy_summary(results_dict):
         pnl_returns = np.diff(pnls)
         if len(pnl_returns) > 0 and np.std(pnl_returns) > 0:
             sharpe = np.mean(pnl_returns) / np.std(pnl_returns) * np.sqrt(252)
-            print(f"Sharpe Ratio: {sharpe:.2f}")
+            # Bootstrap returns on capital, not dollar PnL changes
+            interval = bootstrap_metrics(pnl_returns / INITIAL_CAPITAL, num_resamples=2000,
+                                         metrics=['sharpe_ratio'], seed=0)
+            print(f"Sharpe Ratio: {sharpe:.2f} (95% CI {interval.loc['sharpe_ratio', 'lower']:.2f} "
+                  f"to {interval.loc['sharpe_ratio', 'upper']:.2f})")
 
 def main():
     try:
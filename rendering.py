@@ -0,0 +1,146 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+'''
+Plot helpers shared by the simulator and the backtester. A screen or a PNG
+a few thousand pixels wide cannot show more points than that, so series are
+downsampled before they reach matplotlib: LTTB (largest triangle three
+buckets) keeps the visual shape of a line, min/max keeps every spike.
+BackgroundRenderer draws figures with the headless Agg backend in a separate
+process, so a run can go on writing its output while the plots render.
+matplotlib is only imported where figures are drawn.
+'''
+
+DEFAULT_MAX_POINTS = 2000
+
+
+def _as_float(values):
+    """Series values (numbers or datetimes) as float64, with NaN replaced so they can be compared."""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        values = values.view(np.int64)
+    values = values.astype(float)
+    missing = np.isnan(values)
+    if missing.any():
+        values[missing] = np.nanmean(values) if not missing.all() else 0.0
+    return values
+
+
+def lttb_indices(x, y, max_points):
+    """
+    Positions of the points kept by largest triangle three buckets downsampling.
+
+    The first and last points are always kept; in between, every bucket contributes the
+    point forming the largest triangle with the point kept in the previous bucket and
+    the average of the next bucket.
+    """
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    x, y = _as_float(x), _as_float(y)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    # Averages of every bucket, plus the last point standing in for the bucket after the last
+    sums_x = np.add.reduceat(x[:-1], edges[:-1])
+    sums_y = np.add.reduceat(y[:-1], edges[:-1])
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x[bucket + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[bucket + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        kept[bucket + 1] = a
+    return kept
+
+
+def minmax_indices(y, max_points):
+    """
+    Positions of the minimum and maximum of each of max_points // 2 buckets, plus
+    the first and last points. Extremes such as jumps are never dropped.
+    """
+    n = len(y)
+    buckets = max_points // 2
+    if max_points >= n or buckets < 1:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = offsets + np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)
+    highs = offsets + np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)
+    kept = np.concatenate(([0, n - 1], lows, highs))
+    return np.unique(kept[kept < n])
+
+
+def downsample_indices(x, y, max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    if method == 'lttb':
+        return lttb_indices(x, y, max_points)
+    if method == 'minmax':
+        return minmax_indices(y, max_points)
+    raise ValueError(f"Unsupported downsampling method '{method}'. Choose 'lttb' or 'minmax'.")
+
+
+def downsample_frame(df, x, columns, max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    """
+    Rows of df kept when each of columns is downsampled against x (a column name, or None
+    for the index). The union of the rows chosen for every column is returned, so each
+    column keeps its shape; the first and last rows are always included.
+    """
+    if max_points is None or len(df) <= max_points:
+        return df
+    x_values = df.index if x is None else df[x]
+    kept = [downsample_indices(x_values, df[column], max_points, method)
+            for column in columns if column in df and df[column].notna().any()]
+    if not kept:
+        kept = [np.linspace(0, len(df) - 1, max_points).astype(np.int64)]
+    return df.iloc[np.unique(np.concatenate(kept))]
+
+
+def use_headless_backend():
+    """Switch matplotlib to the non-interactive Agg backend (figures can only be saved)."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+class BackgroundRenderer:
+    """
+    Renders plots in a separate process using the Agg backend. Submitted functions and their
+    arguments are pickled, so pass them downsampled data.
+
+    Usage:
+        with BackgroundRenderer() as renderer:
+            renderer.submit(plot_function, frame, ...)
+            ...  # keeps running while the figures render
+    """
+
+    def __init__(self):
+        self.pool = ProcessPoolExecutor(1, initializer=use_headless_backend)
+        self.futures = []
+
+    def submit(self, function, *args, **kwargs):
+        self.futures.append(self.pool.submit(function, *args, **kwargs))
+
+    def wait(self):
+        """Wait for all submitted plots; errors raised while rendering are raised here."""
+        try:
+            return [future.result() for future in self.futures]
+        finally:
+            self.futures = []
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.wait()
+        else:
+            self.pool.shutdown(cancel_futures=True)
+        return False
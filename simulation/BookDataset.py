@@ -0,0 +1,234 @@
+import json
+import os
+import shutil
+import uuid
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+DEFAULT_CHUNKSIZE = 500_000
+# Datetime columns (simulator --calendar, CleanCSV output), stored as datetime64[ns]
+DATETIME_COLUMNS = ('Timestamp', 'Datetime')
+
+
+class BookDataset:
+    def __init__(self, columns, rows=None, time_sorted=None):
+        """
+        Random access to the steps of a snapshot table (run_simulation's default output).
+
+        Columns are plain or memory-mapped NumPy arrays, so opening a stored dataset
+        costs the same for a thousand steps or a billion and a step is read without
+        touching the rest of the file. The nearest step to a time is found by binary
+        search; a table whose Time column is not sorted gets a sort permutation once
+        instead of being sorted in memory.
+
+        Parameters:
+        - columns: Dict of column name -> 1-d array, including 'Time'
+        - rows: Number of steps (taken from the columns when omitted)
+        - time_sorted: Whether Time is known to be non-decreasing (checked when None)
+        """
+        if 'Time' not in columns:
+            raise ValueError("The dataset has no 'Time' column")
+        self.columns = columns
+        self.rows = len(columns['Time']) if rows is None else rows
+        times = columns['Time']
+        if time_sorted is None:
+            time_sorted = self.rows < 2 or not np.any(times[1:] < times[:-1])
+        if not time_sorted:
+            self.order = np.argsort(times, kind='stable')
+            self.times = times[self.order]
+        else:
+            self.order = None
+            self.times = times
+        self.depth_levels = max([int(name.rsplit('_', 1)[1]) for name in columns
+                                 if name.startswith(('BidPrice_', 'AskPrice_'))], default=0)
+
+    def __len__(self):
+        return self.rows
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_frame(cls, df):
+        """Dataset over the numeric and datetime columns of a DataFrame (held in memory)."""
+        columns = {}
+        for column in df.columns:
+            values = df[column]
+            if column in DATETIME_COLUMNS:
+                columns[column] = pd.to_datetime(values).to_numpy(dtype='datetime64[ns]')
+            elif values.dtype.kind in 'biuf':
+                columns[column] = values.to_numpy(dtype=float)
+        return cls(columns, len(df))
+
+    @classmethod
+    def from_parquet(cls, path):
+        """Dataset from a Parquet file (requires pyarrow or fastparquet)."""
+        return cls.from_frame(pd.read_parquet(path))
+
+    @classmethod
+    def from_csv(cls, source, directory, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Convert a snapshot CSV into a memory-mapped column store and open it.
+
+        The file is read chunksize rows at a time and every chunk is appended to one
+        binary file per column, so memory use does not depend on the file size.
+
+        Parameters:
+        - source: CSV path or file object
+        - directory: Folder of the column store (replaced if it exists)
+        """
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        # Write into a private folder and rename it, so readers never see a partial store
+        staging = os.path.join(parent, f'.{os.path.basename(directory)}.{uuid.uuid4().hex}')
+        os.makedirs(staging)
+        columns, files, rows = None, {}, 0
+        time_sorted, last_time = True, -np.inf
+        try:
+            for chunk in pd.read_csv(source, chunksize=chunksize):
+                if columns is None:
+                    # Non-numeric columns other than the datetimes are left out
+                    columns = {column: 'datetime64[ns]' if column in DATETIME_COLUMNS else 'float64'
+                               for column in chunk.columns
+                               if column in DATETIME_COLUMNS or chunk[column].dtype.kind in 'biuf'}
+                    files = {column: open(os.path.join(staging, f'{i}.bin'), 'wb')
+                             for i, column in enumerate(columns)}
+                for column, dtype in columns.items():
+                    if dtype == 'float64':
+                        values = pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=float)
+                    else:
+                        values = pd.to_datetime(chunk[column]).to_numpy(dtype='datetime64[ns]')
+                    values.tofile(files[column])
+                    if column == 'Time' and len(values):
+                        time_sorted &= bool(values[0] >= last_time and not np.any(values[1:] < values[:-1]))
+                        last_time = values[-1]
+                rows += len(chunk)
+        finally:
+            for f in files.values():
+                f.close()
+        if columns is None:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise ValueError("The CSV file has no rows")
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump({'format': FORMAT_VERSION, 'rows': rows, 'columns': list(columns.items()),
+                       'time_sorted': time_sorted}, f)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.rename(staging, directory)
+        return cls.load(directory)
+
+    @classmethod
+    def load(cls, directory):
+        """Open a column store written by from_csv; columns are memory-mapped read-only."""
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported dataset format in '{directory}'")
+        rows = meta['rows']
+        columns = {}
+        for i, (column, dtype) in enumerate(meta['columns']):
+            path = os.path.join(directory, f'{i}.bin')
+            columns[column] = np.memmap(path, dtype=dtype, mode='r', shape=(rows,)) if rows else np.empty(0, dtype)
+        return cls(columns, rows, meta['time_sorted'])
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def nearest(self, time):
+        """Position (in time order) of the step closest to time, by binary search."""
+        times = self.times
+        position = int(np.searchsorted(times, time))
+        if position == self.rows or (position > 0 and time - times[position - 1] <= times[position] - time):
+            position -= 1
+        return position
+
+    def row(self, position):
+        """Dict of column -> value of the step at a position in time order."""
+        index = int(self.order[position]) if self.order is not None else position
+        row = {}
+        for column, values in self.columns.items():
+            value = values[index]
+            row[column] = pd.Timestamp(value) if values.dtype.kind == 'M' else float(value)
+        return row
+
+    def depth(self, position):
+        """(bids, asks) of a step as lists of (price, size), best first, without empty levels."""
+        row = self.row(position)
+        levels = []
+        for side in ('Bid', 'Ask'):
+            side_levels = []
+            for i in range(1, self.depth_levels + 1):
+                price, size = row.get(f'{side}Price_{i}', np.nan), row.get(f'{side}Size_{i}', np.nan)
+                if not (np.isnan(price) or np.isnan(size)):
+                    side_levels.append((price, size))
+            levels.append(side_levels)
+        return tuple(levels)
+
+    def _blocks(self, start, end, block_rows):
+        """Row selections covering the positions [start, end) in time order, block_rows at a time."""
+        for block_start in range(start, end, block_rows):
+            block_end = min(block_start + block_rows, end)
+            rows = slice(block_start, block_end) if self.order is None else self.order[block_start:block_end]
+            yield block_start, block_end, rows
+
+    def _side_levels(self, side, rows, count):
+        """(prices, sizes) of one side for count selected rows, shape (count, depth_levels)."""
+        def stack(field):
+            return np.column_stack([self.columns[name][rows] if name in self.columns else np.full(count, np.nan)
+                                    for name in (f'{side}{field}_{i}' for i in range(1, self.depth_levels + 1))])
+        return stack('Price'), stack('Size')
+
+    def depth_grid(self, start=0, end=None, time_bins=400, price_bins=200, block_rows=250_000):
+        """
+        Resting size on a (time bucket x price bucket) grid, for a depth heatmap.
+
+        The steps [start, end) (positions in time order) are split into time_bins buckets
+        of consecutive steps and the price range into price_bins equal buckets; every book
+        level adds its size to its cell, and each cell is divided by the number of steps
+        in its time bucket. Rows are processed block_rows at a time with bincount, so the
+        result has at most time_bins x price_bins cells whatever the number of steps.
+
+        Returns:
+        - times: Time of the first step of every time bucket
+        - prices: Center of every price bucket
+        - bids, asks: Average resting size per cell, shape (time buckets, price_bins)
+        """
+        end = self.rows if end is None else min(end, self.rows)
+        steps = end - start
+        if steps <= 0 or self.depth_levels == 0:
+            raise ValueError("The selection holds no book levels")
+        time_bins = min(time_bins, steps)
+
+        low, high = np.inf, -np.inf
+        for block_start, block_end, rows in self._blocks(start, end, block_rows):
+            for side in ('Bid', 'Ask'):
+                prices = self._side_levels(side, rows, block_end - block_start)[0]
+                prices = prices[~np.isnan(prices)]
+                if len(prices):
+                    low, high = min(low, prices.min()), max(high, prices.max())
+        if low > high:
+            raise ValueError("The selection holds no book levels")
+        width = (high - low) / price_bins or 1.0
+
+        grids = {side: np.zeros(time_bins * price_bins) for side in ('Bid', 'Ask')}
+        for block_start, block_end, rows in self._blocks(start, end, block_rows):
+            time_bin = (np.arange(block_start, block_end) - start) * time_bins // steps
+            for side, grid in grids.items():
+                prices, sizes = self._side_levels(side, rows, block_end - block_start)
+                valid = ~(np.isnan(prices) | np.isnan(sizes))
+                price_bin = np.minimum(((prices[valid] - low) / width).astype(np.int64), price_bins - 1)
+                cells = np.broadcast_to(time_bin[:, None], prices.shape)[valid] * price_bins + price_bin
+                grid += np.bincount(cells, weights=sizes[valid], minlength=grid.size)
+
+        first_steps = start + (np.arange(time_bins) * steps + time_bins - 1) // time_bins
+        steps_per_bin = np.diff(np.append(first_steps, end))
+        times = self.times[first_steps]
+        prices = low + width * (np.arange(price_bins) + 0.5)
+        bids, asks = (grids[side].reshape(time_bins, price_bins) / steps_per_bin[:, None] for side in ('Bid', 'Ask'))
+        return np.asarray(times), prices, bids, asks
+
+    def head(self, n=5):
+        """First n rows (in file order) as a DataFrame."""
+        return pd.DataFrame({column: np.asarray(values[:n]) for column, values in self.columns.items()})
@@ -1,8 +1,14 @@
 from OrderBook.OrderBook import OrderBook
+from OrderBook.L3OrderBook import L3OrderBook
+from .MatchingEngine import MatchingEngine
+from .OrderFlowGenerator import OrderFlowGenerator
+from .L2DeltaStream import L2DeltaEncoder
 from data_generator.HestonModel import HestonModel
 from data_generator.JumpDiffusionModel import JumpDiffusionModel
 from data_generator.RegimeSwitchingModel import RegimeSwitchingModel
 from data_generator.VarianceGammaModel import VarianceGammaModel
+from data_generator.MultiAssetModel import MultiAssetModel
+from instrumentation import PROFILER
 import random
 import numpy as np
 import pandas as pd
@@ -13,24 +19,39 @@ class IntegratedDataGenerator:
         Initialize the Integrated Data Generator with the specified model.
         
         Parameters:
-        - model_type: 'heston', 'jumpdiffusion', 'regimeswitching', or 'variancegamma'
+        - model_type: 'heston', 'jumpdiffusion', 'regimeswitching', 'variancegamma', or 'multiasset'
         - kwargs: Parameters required for the chosen model and simulation, including:
             'S0', 'V0' (for Heston),
             'mu', 'kappa', 'theta', 'sigma_v', 'rho' (for Heston),
             'lambda_jump', 'jump_mean', 'jump_std' (for JumpDiffusion),
+            'scheme' (optional for Heston: 'euler' or 'qe'),
             'regimes', 'transition_matrix' (for RegimeSwitching),
             'nu' (for VarianceGamma),
+            'correlation' plus optional 'dynamics', 'names' and the GBM/Heston/jump parameters above,
+            scalar or one per asset (for MultiAsset; one order book per asset),
             'dt', 'T', 'tick_size', 'initial_depth', 'max_volume', 
-            'price_step', 'spread_limit', 'depth_levels'
+            'price_step', 'spread_limit', 'depth_levels',
+            'book_type' (optional: 'l2' aggregated levels (default) or 'l3' individual orders),
+            'calendar' (optional SessionCalendar: trading hours, overnight gaps, intraday
+            volatility and volume profiles, and an int64 nanosecond 'Timestamp' column)
         """
         self.model_type = model_type.lower()
         self._validate_params(kwargs)
         
         # Initialize the chosen model
         self.model = self._initialize_model(self.model_type, **kwargs)
+        self.calendar = kwargs.get('calendar')
+        if self.calendar is not None:
+            self.model.calendar = self.calendar
         
         # Order book parameters with default values
-        self.order_book = OrderBook()
+        book_type = kwargs.get('book_type', 'l2').lower()
+        if book_type not in ('l2', 'l3'):
+            raise ValueError(f"Unsupported book type '{book_type}'. Choose 'l2' or 'l3'.")
+        num_books = self.model.num_assets if isinstance(self.model, MultiAssetModel) else 1
+        self.order_books = [OrderBook() if book_type == 'l2' else L3OrderBook(tick_size=kwargs['tick_size'])
+                            for _ in range(num_books)]
+        self.order_book = self.order_books[0]
         self.initial_depth = kwargs.get('initial_depth', 5)
         self.max_volume = kwargs.get('max_volume', 100)
         self.price_step = kwargs.get('price_step', 0.01)
@@ -38,6 +59,11 @@ class IntegratedDataGenerator:
         self.depth_levels = kwargs.get('depth_levels', 5)
         self.tick_size = kwargs['tick_size']
 
+        # Executions of the last run_simulation() with participants or order flow
+        self.trades = None
+        # Model path of the last single-asset run
+        self.price_data = None
+
     def _validate_params(self, params):
         """
         Validate input parameters to ensure all required parameters are present and valid.
@@ -70,7 +96,8 @@ class IntegratedDataGenerator:
                 S0=kwargs['S0'], V0=kwargs['V0'], mu=kwargs['mu'],
                 kappa=kwargs['kappa'], theta=kwargs['theta'],
                 sigma_v=kwargs['sigma_v'], rho=kwargs['rho'],
-                dt=kwargs['dt'], T=kwargs['T'], tick_size=kwargs['tick_size']
+                dt=kwargs['dt'], T=kwargs['T'], tick_size=kwargs['tick_size'],
+                scheme=kwargs.get('scheme', 'euler')
             )
         elif model_type == 'jumpdiffusion':
             required_params = ['S0', 'mu', 'sigma', 'lambda_jump', 'jump_mean', 'jump_std', 'T', 'dt', 'tick_size']
@@ -105,170 +132,372 @@ class IntegratedDataGenerator:
                 S0=kwargs['S0'], mu=kwargs['mu'], sigma=kwargs['sigma'],
                 nu=kwargs['nu'], dt=kwargs['dt'], T=kwargs['T'], tick_size=kwargs['tick_size']
             )
+        elif model_type == 'multiasset':
+            required_params = ['S0', 'mu', 'correlation', 'dt', 'T', 'tick_size']
+            for param in required_params:
+                if param not in kwargs:
+                    raise ValueError(f"Missing parameter '{param}' for MultiAssetModel")
+            optional_params = ['sigma', 'dynamics', 'names', 'V0', 'kappa', 'theta', 'sigma_v', 'rho', 'scheme',
+                               'lambda_jump', 'jump_mean', 'jump_std']
+            return MultiAssetModel(
+                S0=kwargs['S0'], mu=kwargs['mu'], correlation=kwargs['correlation'],
+                dt=kwargs['dt'], T=kwargs['T'], tick_size=kwargs['tick_size'],
+                **{param: kwargs[param] for param in optional_params if param in kwargs}
+            )
         else:
-            raise ValueError("Invalid model_type. Choose 'heston', 'jumpdiffusion', 'regimeswitching', or 'variancegamma'")
+            raise ValueError("Invalid model_type. Choose 'heston', 'jumpdiffusion', 'regimeswitching', 'variancegamma', or 'multiasset'")
 
-    def initialize_order_book(self):
+    def initialize_order_book(self, order_book=None, start_price=None):
         """
         Initialize the order book around the initial price S0 with random volumes,
         ensuring all prices align with the tick size and maintaining initial depth.
+        In multi-asset mode the book of one asset and its start price are passed in.
         """
-        start_price = self.model.round_to_tick(self.model.S0)
+        if order_book is None:
+            order_book = self.order_book
+        if start_price is None:
+            start_price = self.model.round_to_tick(self.model.S0)
 
         # Create initial bids below S0
         for i in range(1, self.initial_depth + 1):
             bid_price = self.model.round_to_tick(start_price - self.price_step * i)
             bid_size = random.uniform(1, self.max_volume)
-            self.order_book.add_bid(bid_price, bid_size)
+            order_book.add_bid(bid_price, bid_size)
 
         # Create initial asks above S0
         for i in range(1, self.initial_depth + 1):
             ask_price = self.model.round_to_tick(start_price + self.price_step * i)
             ask_size = random.uniform(1, self.max_volume)
-            self.order_book.add_ask(ask_price, ask_size)
+            order_book.add_ask(ask_price, ask_size)
 
-    def update_order_book(self, current_price):
+    def update_order_book(self, current_price, order_book=None):
         """
         Update the order book given the new price from the chosen model,
         ensuring all new orders align with the tick size and maintaining market depth.
+        In multi-asset mode the book of one asset is passed in.
         """
+        if order_book is None:
+            order_book = self.order_book
         # Remove stale bids outside the spread limit
-        for bid_price in list(self.order_book.bid_volume.keys()):
+        for bid_price in list(order_book.bid_volume.keys()):
             if (current_price - bid_price) > self.spread_limit:
-                self.order_book.remove_bid(bid_price, self.order_book.bid_volume[bid_price])
+                order_book.remove_bid(bid_price, order_book.bid_volume[bid_price])
 
         # Remove stale asks outside the spread limit
-        for ask_price in list(self.order_book.ask_volume.keys()):
+        for ask_price in list(order_book.ask_volume.keys()):
             if (ask_price - current_price) > self.spread_limit:
-                self.order_book.remove_ask(ask_price, self.order_book.ask_volume[ask_price])
+                order_book.remove_ask(ask_price, order_book.ask_volume[ask_price])
 
         # Maintain depth by adding new bids if needed
-        current_bids = sorted(self.order_book.bid_volume.keys(), reverse=True)
+        current_bids = sorted(order_book.bid_volume.keys(), reverse=True)
         new_bid_index = len(current_bids) + 1  # Start indexing for new bids
         while len(current_bids) < self.depth_levels:
             new_bid_price = self.model.round_to_tick(current_price - self.price_step * new_bid_index)
             # Ensure the new bid price is unique and not already in the bid_volume
-            if new_bid_price not in self.order_book.bid_volume:
+            if new_bid_price not in order_book.bid_volume:
                 bid_size = random.uniform(1, self.max_volume)
-                self.order_book.add_bid(new_bid_price, bid_size)
-                current_bids = sorted(self.order_book.bid_volume.keys(), reverse=True)
+                order_book.add_bid(new_bid_price, bid_size)
+                current_bids = sorted(order_book.bid_volume.keys(), reverse=True)
             # Increment the index for the next bid price calculation
             new_bid_index += 1
 
             # Maintain depth by adding new asks if needed
-        current_asks = sorted(self.order_book.ask_volume.keys())
+        current_asks = sorted(order_book.ask_volume.keys())
         new_ask_index = len(current_asks) + 1  # Start indexing for new asks
         while len(current_asks) < self.depth_levels:
             new_ask_price = self.model.round_to_tick(current_price + self.price_step * new_ask_index)
             # Ensure the new ask price is unique and not already in the ask_volume
-            if new_ask_price not in self.order_book.ask_volume:
+            if new_ask_price not in order_book.ask_volume:
                 ask_size = random.uniform(1, self.max_volume)
-                self.order_book.add_ask(new_ask_price, ask_size)
-                current_asks = sorted(self.order_book.ask_volume.keys())
+                order_book.add_ask(new_ask_price, ask_size)
+                current_asks = sorted(order_book.ask_volume.keys())
             # Increment the index for the next ask price calculation
             new_ask_index += 1
 
 
         # Ensure that we have at least depth_levels of bids and asks within spread limits
         # Remove bids that are above current price or violate spread limit
-        for bid_price in list(self.order_book.bid_volume.keys()):
+        for bid_price in list(order_book.bid_volume.keys()):
             if bid_price > current_price or (current_price - bid_price) > self.spread_limit:
-                self.order_book.remove_bid(bid_price, self.order_book.bid_volume[bid_price])
+                order_book.remove_bid(bid_price, order_book.bid_volume[bid_price])
 
         # Remove asks that are below current price or violate spread limit
-        for ask_price in list(self.order_book.ask_volume.keys()):
+        for ask_price in list(order_book.ask_volume.keys()):
             if ask_price < current_price or (ask_price - current_price) > self.spread_limit:
-                self.order_book.remove_ask(ask_price, self.order_book.ask_volume[ask_price])
+                order_book.remove_ask(ask_price, order_book.ask_volume[ask_price])
 
             # After removals, ensure depth_levels are maintained
         # Re-add if necessary
 
         # Maintain bids
-        current_bids = sorted(self.order_book.bid_volume.keys(), reverse=True)
+        current_bids = sorted(order_book.bid_volume.keys(), reverse=True)
         new_bid_index = len(current_bids) + 1
         while len(current_bids) < self.depth_levels:
             new_bid_price = self.model.round_to_tick(current_price - self.price_step * new_bid_index)
             # Ensure the new bid price is unique
-            if new_bid_price not in self.order_book.bid_volume:
+            if new_bid_price not in order_book.bid_volume:
                 bid_size = random.uniform(1, self.max_volume)
-                self.order_book.add_bid(new_bid_price, bid_size)
-                current_bids = sorted(self.order_book.bid_volume.keys(), reverse=True)
+                order_book.add_bid(new_bid_price, bid_size)
+                current_bids = sorted(order_book.bid_volume.keys(), reverse=True)
             # Increment the index for the next bid price
             new_bid_index += 1
 
         # Maintain asks
-        current_asks = sorted(self.order_book.ask_volume.keys())
+        current_asks = sorted(order_book.ask_volume.keys())
         new_ask_index = len(current_asks) + 1
         while len(current_asks) < self.depth_levels:
             new_ask_price = self.model.round_to_tick(current_price + self.price_step * new_ask_index)
             # Ensure the new ask price is unique
-            if new_ask_price not in self.order_book.ask_volume:
+            if new_ask_price not in order_book.ask_volume:
                 ask_size = random.uniform(1, self.max_volume)
-                self.order_book.add_ask(new_ask_price, ask_size)
-                current_asks = sorted(self.order_book.ask_volume.keys())
+                order_book.add_ask(new_ask_price, ask_size)
+                current_asks = sorted(order_book.ask_volume.keys())
             # Increment the index for the next ask price
             new_ask_index += 1
 
 
-    def run_simulation(self):
+    def run_simulation(self, participants=None, order_flow=None, start_time='2024-01-01', time_unit='D',
+                       output='snapshots', keyframe_interval=100):
         """
         Run the selected model simulation and update the order book at each step.
         Return a DataFrame with time, price, variance (if applicable), and multiple levels of bids/asks.
+
+        Parameters:
+        - participants: Optional list of market participants (Participant objects or
+          ParticipantPopulation containers). When given, the simulation runs in
+          matching mode: their orders are matched against the order book through a
+          MatchingEngine, consume or add liquidity, and the resulting mid-price
+          impact carries over to all subsequent prices.
+        - order_flow: Optional OrderFlowGenerator (or True for default parameters).
+          Its limit orders, cancellations and market orders are applied to the
+          book at every step, and participants see the resulting volume.
+        - start_time: Timestamp of Time == 0, passed to participants (matching mode only)
+        - time_unit: Unit of the model's Time axis for building timestamps (matching mode only)
+          With a session calendar, participants get the calendar's timestamps instead.
+        - output: 'snapshots' (default) returns the full top-N book at every step as a
+          DataFrame; 'deltas' returns an L2DeltaStream holding only the levels that
+          changed between steps, with a full keyframe every keyframe_interval steps
+        - keyframe_interval: Steps between keyframes (deltas output only)
+
+        With participants or order flow, 'Volume' and 'VWAP' columns with the traded
+        volume per step are added, and every execution is recorded in the trade
+        stream self.trades (Time, Price, Size, aggressor Side).
+
+        With a 'multiasset' model, every asset has its own order book and the result
+        is a dict of asset name -> snapshot DataFrame (participants, order flow and
+        deltas output are not supported in this mode).
+        """
+        if output not in ('snapshots', 'deltas'):
+            raise ValueError(f"Unsupported output '{output}'. Choose 'snapshots' or 'deltas'.")
+        if isinstance(self.model, MultiAssetModel):
+            if participants or order_flow is not None or output != 'snapshots':
+                raise ValueError("Multi-asset mode supports neither participants, order flow nor deltas output")
+            return self._run_multi_asset()
+        encoder = L2DeltaEncoder(self.depth_levels, keyframe_interval) if output == 'deltas' else None
+
+        snapshots = []
+        steps = self.iter_simulation(participants, order_flow, start_time, time_unit, book=encoder is None)
+        for snapshot in steps:
+            if encoder is not None:
+                # The generator is paused after the step, so the book still holds its levels
+                with PROFILER.timer('snapshot.encode', 1):
+                    encoder.add(snapshot, self.order_book.get_market_depth(levels=self.depth_levels))
+            else:
+                snapshots.append(snapshot)
+        price_data = self.price_data
+
+        if encoder is not None:
+            with PROFILER.timer('snapshot.finish', len(price_data)):
+                result = encoder.finish()
+            if 'Timestamp' in price_data:
+                result.steps.insert(1, 'Timestamp', price_data['Timestamp'].to_numpy())
+            return result
+        with PROFILER.timer('snapshot.finish', len(snapshots)):
+            result = pd.DataFrame(snapshots)
+        if 'Timestamp' in price_data:
+            result.insert(1, 'Timestamp', price_data['Timestamp'].to_numpy())
+        return result
+
+    def iter_simulation(self, participants=None, order_flow=None, start_time='2024-01-01', time_unit='D',
+                        book=True, timestamps=False):
+        """
+        Run a single-asset simulation one step at a time, yielding every step as soon as
+        the order book has been updated (run_simulation collects these steps; the live
+        mode in LiveStream publishes them as they are produced).
+
+        Participants, order flow, start_time and time_unit are as in run_simulation. Each
+        step is a dict with Time, Price and Variance, the top depth_levels of the book
+        (book=True) and, with participants or order flow, Volume and VWAP. With
+        timestamps=True a calendar run also carries its int64 nanosecond Timestamp.
+        With book=False the levels are left out; self.order_book holds them until the
+        next step is requested. The model path is kept in self.price_data, and
+        self.trades is set once the last step has been consumed.
         """
+        if isinstance(self.model, MultiAssetModel):
+            raise ValueError("Multi-asset mode cannot be run step by step")
+
         # Generate price (and variance if Heston) data from the selected model
-        price_data = self.model.generate()
+        with PROFILER.timer('model.generate', self.model.N):
+            price_data = self.model.generate()
+        self.price_data = price_data
 
         # Initialize the order book
         self.initialize_order_book()
 
-        snapshots = []
+        engine = None
+        if participants:
+            engine = MatchingEngine(self.order_book, participants, tick_size=self.tick_size)
+            if 'Timestamp' in price_data:
+                participant_times = pd.Series(pd.to_datetime(price_data['Timestamp']))
+            else:
+                participant_times = pd.Timestamp(start_time) + pd.to_timedelta(price_data['Time'], unit=time_unit)
+        if order_flow is True:
+            order_flow = OrderFlowGenerator(self.tick_size)
+        if order_flow is not None:
+            intensity = None
+            if self.calendar is not None:
+                intensity = self.calendar.volume_multipliers(len(price_data), self.model.dt)
+            with PROFILER.timer('order_flow.sample', len(price_data)):
+                order_flow.sample(price_data['Time'].to_numpy(), price_data['Price'].to_numpy(), intensity)
+        step_timestamps = price_data['Timestamp'].to_numpy() if timestamps and 'Timestamp' in price_data else None
+        price_impact = 0.0
+        last_volume = 0.0
+        agent_trades = []
 
         for idx, row in price_data.iterrows():
             current_price = row['Price']
             current_time = row['Time']
             current_variance = row.get('Variance', None)  # Only Heston has Variance
 
+            if engine is not None:
+                # Shift the model path by the cumulative impact of agent trades
+                current_price = self.model.round_to_tick(current_price + price_impact)
+
             # Update the order book for the new price
-            self.update_order_book(current_price)
-
-            # Get multiple levels from the order book
-            depth = self.order_book.get_market_depth(levels=self.depth_levels)
-            bid_levels = depth['bids']
-            ask_levels = depth['asks']
-
-            # Prepare snapshot dictionary
-            snapshot = {
-                'Time': current_time,
-                'Price': current_price,
-                'Variance': current_variance
-            }
-
-            # Record bid levels
-            for i, (bp, bs) in enumerate(bid_levels, start=1):
-                snapshot[f'BidPrice_{i}'] = bp
-                snapshot[f'BidSize_{i}'] = bs
-
-            # If fewer than depth_levels exist, fill remaining levels with None
-            for i in range(len(bid_levels) + 1, self.depth_levels + 1):
-                snapshot[f'BidPrice_{i}'] = None
-                snapshot[f'BidSize_{i}'] = None
-
-            # Record ask levels
-            for i, (ap, asz) in enumerate(ask_levels, start=1):
-                snapshot[f'AskPrice_{i}'] = ap
-                snapshot[f'AskSize_{i}'] = asz
-
-            # If fewer than depth_levels exist, fill remaining ask levels with None
-            for i in range(len(ask_levels) + 1, self.depth_levels + 1):
-                snapshot[f'AskPrice_{i}'] = None
-                snapshot[f'AskSize_{i}'] = None
-
-            # Calculate bid-ask spread if top levels exist
-            if bid_levels and ask_levels:
-                snapshot['BidAskSpread'] = ask_levels[0][0] - bid_levels[0][0]
-            else:
-                snapshot['BidAskSpread'] = None
+            with PROFILER.timer('order_book.update', 1):
+                self.update_order_book(current_price)
+
+            volume, notional = 0.0, 0.0
+            if order_flow is not None:
+                with PROFILER.timer('order_flow.apply_step', 1):
+                    volume, notional = order_flow.apply_step(self.order_book, idx, current_price, engine)
+
+            if engine is not None:
+                mid_before = engine.get_mid_price()
+                with PROFILER.timer('participants.on_market_update', len(participants)):
+                    for participant in participants:
+                        participant.on_market_update(price=current_price, volume=last_volume,
+                                                     timestamp=participant_times.iloc[idx])
+                with PROFILER.timer('matching.match', 1):
+                    engine.match(participant_times.iloc[idx])
+                PROFILER.count('matching.trades', len(engine.last_trades))
+                volume += engine.last_volume
+                notional += sum(price * size for price, size, _ in engine.last_trades)
+                agent_trades.extend((current_time, price, size, side) for price, size, side in engine.last_trades)
+                mid_after = engine.get_mid_price()
+                if mid_before is not None and mid_after is not None:
+                    price_impact += mid_after - mid_before
+            last_volume = volume
+
+            with PROFILER.timer('snapshot.build', 1):
+                if book:
+                    snapshot = self._build_snapshot(current_time, current_price, current_variance)
+                else:
+                    snapshot = {'Time': current_time, 'Price': current_price, 'Variance': current_variance}
+                if engine is not None or order_flow is not None:
+                    snapshot['Volume'] = volume
+                    snapshot['VWAP'] = notional / volume if volume > 0 else None
+                if step_timestamps is not None:
+                    snapshot = {'Time': current_time, 'Timestamp': int(step_timestamps[idx]),
+                                **{k: v for k, v in snapshot.items() if k != 'Time'}}
+            yield snapshot
+
+        trades = [order_flow.get_trades()] if order_flow is not None else []
+        trades.append(pd.DataFrame(agent_trades, columns=['Time', 'Price', 'Size', 'Side']))
+        self.trades = pd.concat(trades, ignore_index=True).sort_values('Time', kind='stable', ignore_index=True)
+
+    def _run_multi_asset(self):
+        """
+        Simulate all assets in one vectorized call, then step every asset's order book
+        and return a dict of asset name -> snapshot DataFrame (same columns as a single-asset run).
+        """
+        model = self.model
+        with PROFILER.timer('model.generate', model.num_assets * model.N):
+            prices, variances = model.simulate_paths(return_variance=True)
+        times = np.linspace(0, model.T, model.N)
+        if self.calendar is not None:
+            timestamps = self.calendar.timestamps(model.N, model.dt)
+        depth = self.depth_levels
+
+        # Book levels per asset and step: bid prices, bid sizes, ask prices, ask sizes
+        levels = np.full((model.num_assets, model.N, 4, depth), np.nan)
+        for asset, book in enumerate(self.order_books):
+            self.initialize_order_book(book, prices[asset, 0])
+            for step, current_price in enumerate(prices[asset].tolist()):
+                with PROFILER.timer('order_book.update', 1):
+                    self.update_order_book(current_price, book)
+                book_depth = book.get_market_depth(levels=depth)
+                for side, side_levels in enumerate((book_depth['bids'], book_depth['asks'])):
+                    if side_levels:
+                        count = len(side_levels)
+                        levels[asset, step, 2 * side, :count], levels[asset, step, 2 * side + 1, :count] = zip(*side_levels)
+
+        results = {}
+        for asset, name in enumerate(model.names):
+            data = {'Time': times}
+            if self.calendar is not None:
+                data['Timestamp'] = timestamps
+            data.update({'Price': prices[asset],
+                         'Variance': variances[asset] if variances is not None else None})
+            for side, label in enumerate(('Bid', 'Ask')):
+                for i in range(depth):
+                    data[f'{label}Price_{i + 1}'] = levels[asset, :, 2 * side, i]
+                    data[f'{label}Size_{i + 1}'] = levels[asset, :, 2 * side + 1, i]
+            data['BidAskSpread'] = levels[asset, :, 2, 0] - levels[asset, :, 0, 0]
+            results[name] = pd.DataFrame(data)
+        self.trades = None
+        return results
 
-            snapshots.append(snapshot)
+    def _build_snapshot(self, current_time, current_price, current_variance):
+        """
+        Record the top depth_levels of the order book at one time step.
+        """
+        # Get multiple levels from the order book
+        depth = self.order_book.get_market_depth(levels=self.depth_levels)
+        bid_levels = depth['bids']
+        ask_levels = depth['asks']
+
+        # Prepare snapshot dictionary
+        snapshot = {
+            'Time': current_time,
+            'Price': current_price,
+            'Variance': current_variance
+        }
+
+        # Record bid levels
+        for i, (bp, bs) in enumerate(bid_levels, start=1):
+            snapshot[f'BidPrice_{i}'] = bp
+            snapshot[f'BidSize_{i}'] = bs
+
+        # If fewer than depth_levels exist, fill remaining levels with None
+        for i in range(len(bid_levels) + 1, self.depth_levels + 1):
+            snapshot[f'BidPrice_{i}'] = None
+            snapshot[f'BidSize_{i}'] = None
+
+        # Record ask levels
+        for i, (ap, asz) in enumerate(ask_levels, start=1):
+            snapshot[f'AskPrice_{i}'] = ap
+            snapshot[f'AskSize_{i}'] = asz
+
+        # If fewer than depth_levels exist, fill remaining ask levels with None
+        for i in range(len(ask_levels) + 1, self.depth_levels + 1):
+            snapshot[f'AskPrice_{i}'] = None
+            snapshot[f'AskSize_{i}'] = None
+
+        # Calculate bid-ask spread if top levels exist
+        if bid_levels and ask_levels:
+            snapshot['BidAskSpread'] = ask_levels[0][0] - bid_levels[0][0]
+        else:
+            snapshot['BidAskSpread'] = None
 
-        return pd.DataFrame(snapshots)
+        return snapshot
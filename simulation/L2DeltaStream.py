@@ -0,0 +1,181 @@
+import json
+import numpy as np
+import pandas as pd
+
+BID, ASK = 0, 1
+SIDE_NAMES = ('Bid', 'Ask')
+
+
+class L2DeltaEncoder:
+    def __init__(self, depth_levels, keyframe_interval=100):
+        """
+        Encode consecutive top-N book snapshots as price level deltas.
+
+        Each step records its scalar fields (Time, Price, ...) and only the
+        price levels of the top-N view that were added, resized or dropped since
+        the previous step, as (Step, Side, Price, Size) rows; a dropped level has
+        a NaN size. Deltas are keyed by price rather than by level index because
+        a one-tick move shifts every index but only touches one or two prices.
+        Every keyframe_interval steps the whole view is written (a keyframe), so
+        any snapshot can be rebuilt from the nearest keyframe without replaying
+        the whole stream.
+        """
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.depth_levels = depth_levels
+        self.keyframe_interval = keyframe_interval
+        self._levels = ({}, {})
+        self._steps = []
+        self._deltas = []
+
+    def add(self, fields, depth):
+        """
+        Record one step.
+
+        Parameters:
+        - fields: Dict of per-step scalars (e.g. Time, Price, Variance, Volume)
+        - depth: Output of get_market_depth(levels=depth_levels)
+        """
+        step = len(self._steps)
+        keyframe = step % self.keyframe_interval == 0
+        self._steps.append(dict(fields, Keyframe=keyframe))
+
+        deltas = self._deltas
+        for side, book_levels in ((BID, depth['bids']), (ASK, depth['asks'])):
+            previous = self._levels[side]
+            current = dict(book_levels[:self.depth_levels])
+            for price, size in current.items():
+                if keyframe or previous.get(price) != size:
+                    deltas.append((step, side, price, size))
+            if not keyframe:
+                for price in previous.keys() - current.keys():
+                    deltas.append((step, side, price, np.nan))
+            self._levels = self._levels[:side] + (current,) + self._levels[side + 1:]
+
+    def finish(self):
+        """Return the encoded stream."""
+        steps = pd.DataFrame(self._steps)
+        deltas = pd.DataFrame(self._deltas, columns=['Step', 'Side', 'Price', 'Size'])
+        return L2DeltaStream(steps, deltas.astype({'Step': np.int64, 'Side': np.int8}), self.depth_levels)
+
+
+class L2DeltaStream:
+    def __init__(self, steps, deltas, depth_levels):
+        """
+        Delta-encoded L2 output of IntegratedDataGenerator.run_simulation(output='deltas').
+
+        - steps: One row per time step with its scalar fields and a Keyframe flag
+        - deltas: (Step, Side, Price, Size) rows sorted by Step; Side is 0 (bid) or 1 (ask)
+          and a NaN size removes the price level
+        - depth_levels: Number of levels per side in rebuilt snapshots
+        """
+        self.steps = steps
+        self.deltas = deltas
+        self.depth_levels = depth_levels
+        self._keyframes = np.flatnonzero(steps['Keyframe'].to_numpy())
+        self._bounds = np.searchsorted(deltas['Step'].to_numpy(), np.arange(len(steps) + 1))
+
+    def __len__(self):
+        return len(self.steps)
+
+    def _columns(self):
+        names = []
+        for side in SIDE_NAMES:
+            for i in range(1, self.depth_levels + 1):
+                names += [f'{side}Price_{i}', f'{side}Size_{i}']
+        return names
+
+    def _replay(self, start_step, end_step):
+        """Yield (step, bid levels, ask levels) for steps in [start_step, end_step), starting at a keyframe."""
+        sides = self.deltas['Side'].to_numpy().tolist()
+        prices = self.deltas['Price'].to_numpy().tolist()
+        sizes = self.deltas['Size'].to_numpy().tolist()
+        keyframe = self.steps['Keyframe'].to_numpy()
+        bounds = self._bounds
+        levels = ({}, {})
+        for step in range(start_step, end_step):
+            if keyframe[step]:
+                levels = ({}, {})
+            for i in range(bounds[step], bounds[step + 1]):
+                if sizes[i] != sizes[i]:  # NaN size removes the level
+                    levels[sides[i]].pop(prices[i], None)
+                else:
+                    levels[sides[i]][prices[i]] = sizes[i]
+            yield step, levels
+
+    def _top_levels(self, levels):
+        """Top depth_levels (price, size) per side: bids descending, asks ascending."""
+        bids = sorted(levels[BID].items(), reverse=True)[:self.depth_levels]
+        asks = sorted(levels[ASK].items())[:self.depth_levels]
+        return bids, asks
+
+    def snapshot(self, step):
+        """Rebuild the full snapshot of one step from the nearest keyframe at or before it."""
+        if not 0 <= step < len(self.steps):
+            raise IndexError(f"Step {step} is out of range")
+        keyframe = self._keyframes[np.searchsorted(self._keyframes, step, side='right') - 1]
+        for _, levels in self._replay(keyframe, step + 1):
+            pass
+        bids, asks = self._top_levels(levels)
+
+        book = {}
+        for side, side_levels in (('Bid', bids), ('Ask', asks)):
+            for i in range(1, self.depth_levels + 1):
+                price, size = side_levels[i - 1] if i <= len(side_levels) else (None, None)
+                book[f'{side}Price_{i}'] = price
+                book[f'{side}Size_{i}'] = size
+        fields = self.steps.iloc[step].drop('Keyframe').to_dict()
+        return self._assemble(fields, book)
+
+    def to_snapshots(self):
+        """Rebuild the full snapshot DataFrame (same layout as run_simulation's default output)."""
+        num_steps, depth = len(self.steps), self.depth_levels
+        prices = np.full((num_steps, 2, depth), np.nan)
+        sizes = np.full((num_steps, 2, depth), np.nan)
+        for step, levels in self._replay(0, num_steps):
+            for side, side_levels in enumerate(self._top_levels(levels)):
+                if side_levels:
+                    prices[step, side, :len(side_levels)], sizes[step, side, :len(side_levels)] = zip(*side_levels)
+
+        book = {}
+        for side, name in enumerate(SIDE_NAMES):
+            for i in range(depth):
+                book[f'{name}Price_{i + 1}'] = prices[:, side, i]
+                book[f'{name}Size_{i + 1}'] = sizes[:, side, i]
+        return self._assemble(self.steps.drop(columns='Keyframe'), book)
+
+    def _assemble(self, fields, levels):
+        """Order columns like IntegratedDataGenerator._build_snapshot."""
+        head = [k for k in ('Time', 'Timestamp', 'Price', 'Variance') if k in fields]
+        out = {k: fields[k] for k in head}
+        out.update((name, levels[name]) for name in self._columns())
+
+        bid, ask = levels['BidPrice_1'], levels['AskPrice_1']
+        if isinstance(fields, pd.DataFrame):
+            out['BidAskSpread'] = ask - bid
+        else:
+            out['BidAskSpread'] = ask - bid if bid is not None and ask is not None else None
+        out.update((k, fields[k]) for k in fields if k not in head)
+
+        return pd.DataFrame(out) if isinstance(fields, pd.DataFrame) else out
+
+    def save(self, prefix):
+        """Write the stream to <prefix>_steps.csv, <prefix>_deltas.csv and <prefix>_meta.json."""
+        self.steps.to_csv(f'{prefix}_steps.csv', index=False)
+        self.deltas.to_csv(f'{prefix}_deltas.csv', index=False)
+        with open(f'{prefix}_meta.json', 'w') as f:
+            json.dump({'depth_levels': self.depth_levels}, f)
+
+    @classmethod
+    def load(cls, prefix):
+        """Read a stream written by save()."""
+        steps = pd.read_csv(f'{prefix}_steps.csv')
+        deltas = pd.read_csv(f'{prefix}_deltas.csv', dtype={'Step': np.int64, 'Side': np.int8})
+        try:
+            with open(f'{prefix}_meta.json') as f:
+                depth_levels = json.load(f)['depth_levels']
+        except FileNotFoundError:
+            # Streams saved without metadata: the widest keyframe is the best guess of the depth
+            keyframe_rows = deltas[deltas['Step'].isin(np.flatnonzero(steps['Keyframe'].to_numpy()))]
+            depth_levels = int(keyframe_rows.groupby(['Step', 'Side']).size().max()) if len(keyframe_rows) else 0
+        return cls(steps, deltas, depth_levels)
@@ -0,0 +1,410 @@
+import asyncio
+import csv
+import json
+import math
+import time
+from collections import deque
+
+'''
+Live mode: IntegratedDataGenerator.iter_simulation() steps are published to
+sinks as they are produced, at the pace of a real market (or faster), instead
+of being written to a CSV at the end of the run.
+
+    sinks = [TCPSink('127.0.0.1', 8765), FileSink('simulation_output/live.jsonl')]
+    live = LiveSimulation(generator, sinks, speed=60)   # 60x real time
+    asyncio.run(live.run(order_flow=flow))
+    print(live.format_stats())
+
+Every sink has a bounded queue drained by its own task. When a consumer falls
+behind and the queue is full, the sink's backpressure policy decides: 'block'
+holds the simulation back until there is room (nothing is lost, the pace
+slips), 'drop_oldest' discards the oldest queued step and 'drop_newest' the
+step being published (the pace holds, drops are counted). Each sink measures
+the latency from publication to delivery and its throughput.
+'''
+
+BACKPRESSURE_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+# Trading seconds in a model year without a session calendar: 252 days of 6.5 hours
+TRADING_SECONDS_PER_YEAR = 252 * 6.5 * 3600
+LATENCY_SAMPLES = 100_000
+
+
+class Message:
+    __slots__ = ('step', 'data', 'published', '_line')
+
+    def __init__(self, step, data):
+        """One published step: the snapshot dict plus its step number and publication time."""
+        self.step = step
+        self.data = data
+        self.published = time.perf_counter()
+        self._line = None
+
+    def line(self):
+        """The step as one line of JSON (NaN written as null), encoded once for all sinks."""
+        if self._line is None:
+            record = {'Step': self.step, 'SentAt': time.time()}
+            for key, value in self.data.items():
+                record[key] = None if isinstance(value, float) and math.isnan(value) else value
+            self._line = (json.dumps(record, allow_nan=False) + '\n').encode()
+        return self._line
+
+
+class Sink:
+    def __init__(self, maxsize=1024, backpressure='block', name=None):
+        """
+        Base class of the live sinks: a bounded queue of messages and a task that
+        delivers them one at a time with deliver().
+
+        Parameters:
+        - maxsize: Messages queued before the backpressure policy applies
+        - backpressure: 'block', 'drop_oldest' or 'drop_newest'
+        - name: Label in the statistics (defaults to a description of the sink)
+        """
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unsupported backpressure policy '{backpressure}'. "
+                             f"Choose one of {', '.join(BACKPRESSURE_POLICIES)}.")
+        if maxsize < 1:
+            raise ValueError("A sink queue must hold at least one message")
+        self.maxsize = maxsize
+        self.backpressure = backpressure
+        self.name = name or type(self).__name__
+        self.queue = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._first_published = None
+        self._last_delivered = None
+        self._task = None
+
+    async def start(self):
+        """Open the sink; called by LiveSimulation before the first step."""
+        self.queue = asyncio.Queue(self.maxsize)
+        self._task = asyncio.create_task(self._pump())
+
+    async def publish(self, message):
+        """Queue a message, applying the backpressure policy when the queue is full."""
+        if self._task is not None and self._task.done():
+            self._task.result()  # Raise the error that stopped the delivery task
+        if self._first_published is None:
+            self._first_published = message.published
+        self.published += 1
+        if self.queue.full():
+            if self.backpressure == 'drop_newest':
+                self.dropped += 1
+                return
+            if self.backpressure == 'drop_oldest':
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.dropped += 1
+        if not self.queue.full():
+            self.queue.put_nowait(message)
+        elif self._task is None:
+            await self.queue.put(message)
+        else:
+            # Wait for room, but stop if the delivery task fails (it would never make room)
+            put = asyncio.ensure_future(self.queue.put(message))
+            await asyncio.wait([put, self._task], return_when=asyncio.FIRST_COMPLETED)
+            if not put.done():
+                put.cancel()
+                self._task.result()
+
+    def _record(self, message):
+        now = time.perf_counter()
+        self.latencies.append(now - message.published)
+        self.delivered += 1
+        self._last_delivered = now
+
+    async def _pump(self):
+        while True:
+            message = await self.queue.get()
+            try:
+                await self.deliver(message)
+                self._record(message)
+            finally:
+                self.queue.task_done()
+
+    async def deliver(self, message):
+        raise NotImplementedError
+
+    async def close(self):
+        """Deliver everything still queued, then stop the sink."""
+        if self._task is not None:
+            task, self._task = self._task, None
+            drained = asyncio.ensure_future(self.queue.join())
+            await asyncio.wait([drained, task], return_when=asyncio.FIRST_COMPLETED)
+            drained.cancel()
+            if task.done():
+                task.result()  # The delivery task only stops on an error
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def stats(self):
+        """Delivered and dropped steps, latency from publication to delivery (ms) and throughput."""
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1e3 if latencies else None
+
+        elapsed = None
+        if self._first_published is not None and self._last_delivered is not None:
+            elapsed = self._last_delivered - self._first_published
+        return {
+            'sink': self.name,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'latency_mean_ms': sum(latencies) / len(latencies) * 1e3 if latencies else None,
+            'latency_p50_ms': percentile(0.5),
+            'latency_p99_ms': percentile(0.99),
+            'latency_max_ms': latencies[-1] * 1e3 if latencies else None,
+            'steps_per_sec': self.delivered / elapsed if elapsed else None,
+        }
+
+
+class QueueSink(Sink):
+    def __init__(self, maxsize=1024, backpressure='block', name='queue'):
+        """
+        In-process sink: consumers in the same event loop read the snapshot dicts
+        (with a 'Step' key) with get() or async iteration, which ends after the last step.
+        Latency is measured when the consumer receives the step.
+        """
+        super().__init__(maxsize, backpressure, name)
+
+    async def start(self):
+        self.queue = asyncio.Queue(self.maxsize)
+
+    async def get(self):
+        """Next step as a dict, or None once the simulation has finished and the queue is empty."""
+        message = await self.queue.get()
+        self.queue.task_done()
+        if message is None:
+            return None
+        self._record(message)
+        return {'Step': message.step, **message.data}
+
+    async def close(self):
+        # The end marker is never dropped, so the consumer always sees the end of the run
+        await self.queue.put(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        step = await self.get()
+        if step is None:
+            raise StopAsyncIteration
+        return step
+
+
+class FileSink(Sink):
+    def __init__(self, path, maxsize=1024, backpressure='block', name=None):
+        """
+        Append steps to a file as they arrive: one JSON object per line, or CSV rows
+        if the path ends in .csv (the columns are those of the first step). The file is
+        flushed whenever the queue runs empty, so a reader tailing it is at most one
+        burst behind.
+        """
+        super().__init__(maxsize, backpressure, name or f'file:{path}')
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    async def start(self):
+        if self.path.endswith('.csv'):
+            self._file = open(self.path, 'w', newline='')
+        else:
+            self._file = open(self.path, 'wb')
+        await super().start()
+
+    async def deliver(self, message):
+        if self._writer is None and self.path.endswith('.csv'):
+            self._writer = csv.DictWriter(self._file, ['Step', *message.data])
+            self._writer.writeheader()
+        if self._writer is not None:
+            self._writer.writerow({'Step': message.step, **message.data})
+        else:
+            self._file.write(message.line())
+        if self.queue.empty():
+            self._file.flush()
+
+    async def close(self):
+        await super().close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class TCPSink(Sink):
+    def __init__(self, host='127.0.0.1', port=8765, maxsize=1024, backpressure='block', min_clients=0,
+                 name=None):
+        """
+        Serve the steps as newline-delimited JSON to every connected TCP client
+        (see subscribe()). A step is delivered once every client's socket buffer has
+        taken it, so a slow client slows the sink and its backpressure policy applies.
+        Clients that disconnect are dropped. With min_clients, start() waits until that
+        many clients are connected, so they do not miss the first steps.
+        Port 0 picks a free port (read it from self.port after start()).
+        """
+        super().__init__(maxsize, backpressure, name or f'tcp:{host}:{port}')
+        self.host = host
+        self.port = port
+        self.min_clients = min_clients
+        self.clients = set()
+        self._server = None
+        self._connected = None
+
+    async def start(self):
+        self._connected = asyncio.Condition()
+        self._server = await asyncio.start_server(self._accept, self.host, self.port)
+        if self.port == 0 and self.name.endswith(':0'):
+            self.name = f'tcp:{self.host}:{self._server.sockets[0].getsockname()[1]}'
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.min_clients:
+            async with self._connected:
+                await self._connected.wait_for(lambda: len(self.clients) >= self.min_clients)
+        await super().start()
+
+    async def _accept(self, reader, writer):
+        async with self._connected:
+            self.clients.add(writer)
+            self._connected.notify_all()
+
+    async def deliver(self, message):
+        line = message.line()
+        clients = list(self.clients)
+        for writer in clients:
+            writer.write(line)
+        # drain() returns at once unless a client's buffer is over its limit, so awaiting the
+        # clients in turn costs no more than the slowest one
+        for writer in clients:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                self.clients.discard(writer)
+                writer.close()
+
+    async def close(self):
+        await super().close()
+        if self._server is not None:
+            self._server.close()
+            for writer in self.clients:
+                writer.close()
+            await asyncio.gather(*(writer.wait_closed() for writer in self.clients), return_exceptions=True)
+            self.clients.clear()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def subscribe(host='127.0.0.1', port=8765):
+    """Async iterator over the steps served by a TCPSink, as dicts; ends when the server closes."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while line := await reader.readline():
+            yield json.loads(line)
+    finally:
+        writer.close()
+
+
+def parse_sink(spec, maxsize=1024, backpressure='block', min_clients=0):
+    """Sink from a command-line spec: 'tcp:HOST:PORT' or 'file:PATH' (.jsonl or .csv)."""
+    kind, _, target = spec.partition(':')
+    if kind == 'file' and target:
+        return FileSink(target, maxsize, backpressure)
+    if kind == 'tcp':
+        host, _, port = target.rpartition(':')
+        if port.isdigit():
+            return TCPSink(host or '127.0.0.1', int(port), maxsize, backpressure, min_clients)
+    raise ValueError(f"Invalid sink '{spec}'. Use tcp:HOST:PORT or file:PATH.")
+
+
+class LiveSimulation:
+    def __init__(self, generator, sinks, speed=None):
+        """
+        Publish the steps of a single-asset IntegratedDataGenerator run to sinks while it runs.
+
+        Parameters:
+        - generator: IntegratedDataGenerator (snapshot output; multi-asset is not supported)
+        - sinks: List of Sink objects
+        - speed: Simulated trading seconds per wall-clock second (1 = real time, 60 = a
+          trading hour per minute), or None to publish as fast as the sinks take them.
+          A model year has the calendar's trading seconds (days_per_year sessions), or
+          252 days of 6.5 hours without a calendar.
+        """
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive (or None for as fast as possible)")
+        self.generator = generator
+        self.sinks = sinks
+        self.speed = speed
+        self.steps = 0
+        self.late_steps = 0
+        self.elapsed = None
+
+    def step_interval(self):
+        """Wall-clock seconds between steps, or 0 without pacing."""
+        if self.speed is None:
+            return 0.0
+        calendar = self.generator.calendar
+        seconds_per_year = (calendar.days_per_year * calendar.session_seconds if calendar is not None
+                            else TRADING_SECONDS_PER_YEAR)
+        return self.generator.model.dt * seconds_per_year / self.speed
+
+    async def run(self, participants=None, order_flow=None, start_time='2024-01-01', time_unit='D'):
+        """
+        Run the simulation and publish every step (arguments as in run_simulation).
+        Steps are scheduled on absolute deadlines, so the time spent simulating and
+        publishing does not accumulate into drift; a step that is already late is
+        published at once and counted in late_steps.
+        """
+        loop = asyncio.get_running_loop()
+        interval = self.step_interval()
+        self.steps = self.late_steps = 0
+        for sink in self.sinks:
+            await sink.start()
+        started = loop.time()
+        try:
+            steps = self.generator.iter_simulation(participants, order_flow, start_time, time_unit,
+                                                   timestamps=True)
+            for step, snapshot in enumerate(steps):
+                if interval:
+                    delay = started + step * interval - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    else:
+                        self.late_steps += step > 0
+                message = Message(step, snapshot)
+                for sink in self.sinks:
+                    await sink.publish(message)
+                if not interval:
+                    # Let the sink tasks run between steps
+                    await asyncio.sleep(0)
+                self.steps += 1
+        finally:
+            # Close every sink even if one of them failed, then report the first failure
+            errors = []
+            for sink in self.sinks:
+                try:
+                    await sink.close()
+                except Exception as e:
+                    errors.append(e)
+            self.elapsed = loop.time() - started
+            if errors:
+                raise errors[0]
+
+    def stats(self):
+        """Statistics of every sink (see Sink.stats)."""
+        return [sink.stats() for sink in self.sinks]
+
+    def format_stats(self):
+        def ms(value):
+            return f"{value:.3f}" if value is not None else '-'
+
+        lines = [f"{'sink':<32}{'delivered':>11}{'dropped':>9}{'mean ms':>10}{'p50 ms':>10}"
+                 f"{'p99 ms':>10}{'max ms':>10}{'steps/s':>12}"]
+        for row in self.stats():
+            rate = f"{row['steps_per_sec']:,.0f}" if row['steps_per_sec'] else '-'
+            lines.append(f"{row['sink']:<32}{row['delivered']:>11,}{row['dropped']:>9,}"
+                         f"{ms(row['latency_mean_ms']):>10}{ms(row['latency_p50_ms']):>10}"
+                         f"{ms(row['latency_p99_ms']):>10}{ms(row['latency_max_ms']):>10}{rate:>12}")
+        lines.append(f"{self.steps:,} steps in {self.elapsed or 0:.3f}s, {self.late_steps:,} published late")
+        return '\n'.join(lines)
@@ -0,0 +1,228 @@
+from collections import defaultdict
+import numpy as np
+
+
+class MatchingEngine:
+    def __init__(self, order_book, participants=(), tick_size=None):
+        """
+        Route participant orders into an order book instead of filling them at
+        the quoted price.
+
+        Participants (single `Participant` objects or `ParticipantPopulation`
+        containers) get this engine as their `order_sink`. Orders submitted
+        during a time step are collected and matched together in `match()`:
+
+        - Market orders (and the marketable part of limit orders) sweep the
+          opposite side of the book level by level. When several orders compete
+          for one level its volume is allocated pro-rata, so the result does not
+          depend on submission order.
+        - The non-marketable part of a limit order rests in the book and adds
+          liquidity. Resting agent volume is filled pro-rata with the rest of
+          its price level when later orders trade through it, and is cancelled
+          when the level is removed from the book.
+
+        Parameters:
+        - order_book: Book exposing bid_volume/ask_volume, add_*/remove_* (OrderBook.OrderBook)
+        - participants: Participants or populations to connect to the engine
+        - tick_size: If given, limit prices are rounded to this tick size (a book
+          with to_tick/to_price, such as L3OrderBook, rounds them to its own grid)
+        """
+        self.order_book = order_book
+        self.tick_size = tick_size
+        self.participants = []
+        self._owner_ids = {}
+
+        # Orders collected for the next match, one entry per submit call
+        self._pending = []
+
+        # Resting agent orders: side -> price -> list of [owner_id, agent, remaining]
+        self._resting = {'buy': defaultdict(list), 'sell': defaultdict(list)}
+
+        # Passive fills not yet reported to their owners: (owner_id, agent, quantity, price)
+        self._passive_fills = []
+
+        self.last_volume = 0.0
+        self.last_vwap = None
+        # Executions of the last match: (price, size, aggressor side)
+        self.last_trades = []
+        self.total_volume = 0.0
+
+        for participant in participants:
+            self.add_participant(participant)
+
+    def add_participant(self, participant):
+        """Connect a participant or population so its orders are routed here."""
+        participant.order_sink = self
+        self._owner_ids[id(participant)] = len(self.participants)
+        self.participants.append(participant)
+
+    def submit(self, owner, quantity, limit_price=None):
+        """Queue a single order (positive quantity buys, negative sells)."""
+        limits = None if limit_price is None else np.array([limit_price], dtype=float)
+        self._queue(owner, np.zeros(1, dtype=np.int64), np.array([quantity], dtype=float), limits)
+
+    def submit_batch(self, owner, quantities, limit_prices=None):
+        """Queue one order per population agent; zero quantities are skipped."""
+        agents = np.flatnonzero(quantities)
+        if len(agents) == 0:
+            return
+        limits = None if limit_prices is None else np.asarray(limit_prices, dtype=float)[agents]
+        self._queue(owner, agents, np.asarray(quantities, dtype=float)[agents], limits)
+
+    def _queue(self, owner, agents, quantities, limit_prices):
+        book = self.order_book
+        if limit_prices is None:
+            limit_prices = np.full(len(agents), np.nan)
+        elif hasattr(book, 'to_price'):
+            # An order-level book reports prices on its own tick grid (L3OrderBook.to_price);
+            # resting orders must be keyed by those prices to receive their passive fills
+            limit_prices = np.array([price if np.isnan(price) else book.to_price(book.to_tick(price))
+                                     for price in limit_prices.tolist()])
+        elif self.tick_size is not None:
+            limit_prices = np.round(limit_prices / self.tick_size) * self.tick_size
+        owner_ids = np.full(len(agents), self._owner_ids[id(owner)])
+        self._pending.append((owner_ids, agents, quantities, limit_prices))
+
+    def match(self, timestamp=None):
+        """
+        Match all orders submitted since the last call and report fills.
+
+        Returns:
+        - Total traded volume in this step
+        """
+        self._sync_resting()
+        volume, notional = 0.0, 0.0
+        self.last_trades = []
+
+        if self._pending:
+            owner_ids, agents, quantities, limit_prices = (np.concatenate(c) for c in zip(*self._pending))
+            self._pending = []
+
+            filled = np.zeros(len(quantities))
+            cost = np.zeros(len(quantities))
+            for side in ('buy', 'sell'):
+                orders = quantities > 0 if side == 'buy' else quantities < 0
+                if not orders.any():
+                    continue
+                idx = np.flatnonzero(orders)
+                side_filled, side_cost, remaining = self._sweep(side, np.abs(quantities[idx]), limit_prices[idx])
+                sign = 1.0 if side == 'buy' else -1.0
+                filled[idx] = sign * side_filled
+                cost[idx] = side_cost
+                volume += side_filled.sum()
+                notional += side_cost.sum()
+
+                # Unfilled limit orders rest in the book and add liquidity
+                resting = (remaining > 0) & ~np.isnan(limit_prices[idx])
+                for i, rem in zip(idx[resting], remaining[resting]):
+                    self._rest(side, limit_prices[i], owner_ids[i], agents[i], rem)
+
+            traded = filled != 0
+            avg_price = np.divide(cost, np.abs(filled), out=np.zeros(len(cost)), where=traded)
+            self._report(owner_ids[traded], agents[traded], filled[traded], avg_price[traded], timestamp)
+
+        if self._passive_fills:
+            owner_ids, agents, quantities, prices = (np.array(c) for c in zip(*self._passive_fills))
+            self._passive_fills = []
+            self._report(owner_ids, agents, quantities, prices, timestamp)
+
+        self.last_volume = volume
+        self.last_vwap = notional / volume if volume > 0 else None
+        self.total_volume += volume
+        return volume
+
+    def _sweep(self, side, sizes, limit_prices):
+        """Walk the opposite side of the book, splitting each level pro-rata."""
+        if side == 'buy':
+            book, remove = self.order_book.ask_volume, self.order_book.remove_ask
+            levels = sorted(book.items())
+            limits = np.where(np.isnan(limit_prices), np.inf, limit_prices)
+        else:
+            book, remove = self.order_book.bid_volume, self.order_book.remove_bid
+            levels = sorted(book.items(), reverse=True)
+            limits = np.where(np.isnan(limit_prices), -np.inf, limit_prices)
+
+        remaining = sizes.copy()
+        filled = np.zeros(len(sizes))
+        cost = np.zeros(len(sizes))
+        for price, level_volume in levels:
+            eligible = (remaining > 0) & ((limits >= price) if side == 'buy' else (limits <= price))
+            demand = remaining[eligible].sum()
+            if demand <= 0:
+                break  # Later levels are worse, so no order can reach them
+            traded = min(level_volume, demand)
+            fill = np.where(eligible, remaining * (traded / demand), 0.0)
+            remaining -= fill
+            filled += fill
+            cost += fill * price
+            self.on_trade('sell' if side == 'buy' else 'buy', price, traded, level_volume)
+            remove(price, traded)
+            self.last_trades.append((price, traded, side))
+        return filled, cost, remaining
+
+    def _rest(self, side, price, owner_id, agent, size):
+        if side == 'buy':
+            self.order_book.add_bid(price, size)
+        else:
+            self.order_book.add_ask(price, size)
+        self._resting[side][price].append([owner_id, agent, size])
+
+    def on_trade(self, resting_side, price, traded, level_volume=None):
+        """
+        Allocate a trade against a book level to the agent orders resting there.
+        Also call this when volume is taken from the book outside the engine
+        (e.g. by background order flow) so agents get their passive fills.
+        """
+        entries = self._resting[resting_side].get(price)
+        if not entries:
+            return
+        if level_volume is None:
+            book = self.order_book.bid_volume if resting_side == 'buy' else self.order_book.ask_volume
+            level_volume = book.get(price, 0.0)
+        share = min(1.0, traded / level_volume) if level_volume > 0 else 1.0
+        sign = 1.0 if resting_side == 'buy' else -1.0
+        for entry in entries:
+            fill = entry[2] * share
+            entry[2] -= fill
+            self._passive_fills.append((entry[0], entry[1], sign * fill, price))
+        self._resting[resting_side][price] = [e for e in entries if e[2] > 1e-12]
+
+    def _sync_resting(self):
+        """Cancel resting agent volume that no longer exists in the book."""
+        for side, levels in self._resting.items():
+            book = self.order_book.bid_volume if side == 'buy' else self.order_book.ask_volume
+            for price in list(levels.keys()):
+                entries = levels[price]
+                total = sum(e[2] for e in entries)
+                available = book.get(price, 0.0)
+                if total <= 0 or available <= 0:
+                    del levels[price]
+                elif available < total:
+                    for entry in entries:
+                        entry[2] *= available / total
+
+    def _report(self, owner_ids, agents, quantities, prices, timestamp):
+        """Send fills to their owners, one average-price fill per agent and side."""
+        for owner_id in np.unique(owner_ids):
+            owner = self.participants[owner_id]
+            mine = owner_ids == owner_id
+            for side_mask in (quantities > 0, quantities < 0):
+                sel = mine & side_mask
+                if not sel.any():
+                    continue
+                if hasattr(owner, 'apply_fills'):
+                    qty = np.bincount(agents[sel], weights=quantities[sel], minlength=owner.size)
+                    notional = np.bincount(agents[sel], weights=quantities[sel] * prices[sel], minlength=owner.size)
+                    avg_price = np.divide(notional, qty, out=np.zeros(owner.size), where=qty != 0)
+                    owner.apply_fills(qty, avg_price, timestamp)
+                else:
+                    qty = quantities[sel].sum()
+                    owner.on_fill(float((quantities[sel] * prices[sel]).sum() / qty), float(qty), timestamp)
+
+    def get_mid_price(self):
+        """Mid price of the book, or None if one side is empty."""
+        best_bid, _ = self.order_book.get_best_bid()
+        best_ask, _ = self.order_book.get_best_ask()
+        if best_bid is None or best_ask is None:
+            return None
+        return (best_bid + best_ask) / 2
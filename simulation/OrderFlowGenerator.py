@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+# Event types
+LIMIT, CANCEL, MARKET = 0, 1, 2
+
+
+class OrderFlowGenerator:
+    def __init__(self, tick_size, limit_rate=20.0, cancel_rate=10.0, market_rate=5.0,
+                 mean_limit_size=10.0, mean_cancel_size=10.0, mean_market_size=5.0,
+                 mean_offset_ticks=2.0, direction_sensitivity=1.0):
+        """
+        Background order flow around a model price path.
+
+        Limit order arrivals, cancellations and market orders are independent
+        Poisson processes. All inter-arrival times, event types, sides, sizes
+        and price offsets for the whole path are sampled up front with NumPy in
+        sample(); apply_step() then only replays the events of one time step
+        against the order book.
+
+        - Limit orders rest a geometric number of ticks (mean mean_offset_ticks,
+          at least 1) behind the current price, so they never cross the book.
+        - Cancellations remove volume at a price chosen the same way.
+        - Market orders sweep the opposite side. Their side is conditioned on
+          the price path: the probability of a buy is a logistic function of
+          the step's standardized log return, scaled by direction_sensitivity
+          (0 gives balanced flow).
+
+        Parameters:
+        - tick_size: Price grid of the book
+        - limit_rate, cancel_rate, market_rate: Expected events per model time step
+        - mean_limit_size, mean_cancel_size, mean_market_size: Mean (exponential) event sizes
+        - mean_offset_ticks: Mean distance of limit orders and cancels from the price
+        - direction_sensitivity: How strongly market order direction follows price moves
+        """
+        rates = np.array([limit_rate, cancel_rate, market_rate], dtype=float)
+        if np.any(rates < 0) or rates.sum() <= 0:
+            raise ValueError("Event rates must be non-negative and not all zero")
+        if mean_offset_ticks < 1:
+            raise ValueError("mean_offset_ticks must be at least 1")
+
+        self.tick_size = tick_size
+        self.rates = rates
+        self.mean_sizes = np.array([mean_limit_size, mean_cancel_size, mean_market_size], dtype=float)
+        self.mean_offset_ticks = mean_offset_ticks
+        self.direction_sensitivity = direction_sensitivity
+        self.trades = []
+
+    def sample(self, times, prices, intensity=None):
+        """
+        Pre-sample the events of a price path.
+
+        Events in the interval (times[s-1], times[s]] belong to step s and are
+        applied by apply_step(..., s, ...); step 0 has no events.
+
+        intensity optionally scales the event rates of each step (e.g. an
+        intraday volume profile, one value per point of the path). Events are
+        then sampled on the cumulative intensity axis and mapped back to steps.
+        """
+        times = np.asarray(times, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        num_steps = len(times)
+        horizon = max(num_steps - 1, 0)
+        total_rate = self.rates.sum()
+        if intensity is not None:
+            cumulative = np.concatenate([[0.0], np.cumsum(np.asarray(intensity, dtype=float)[1:num_steps])])
+            horizon = cumulative[-1]
+
+        # Event times in units of steps from cumulated exponential inter-arrivals
+        expected = total_rate * horizon
+        arrivals = np.cumsum(np.random.exponential(1.0 / total_rate, int(expected + 5 * np.sqrt(expected) + 10)))
+        while len(arrivals) and arrivals[-1] < horizon:
+            more = np.random.exponential(1.0 / total_rate, len(arrivals) // 2 + 10)
+            arrivals = np.concatenate([arrivals, arrivals[-1] + np.cumsum(more)])
+        arrivals = arrivals[arrivals < horizon]
+        if intensity is not None:
+            arrivals = np.minimum(np.interp(arrivals, cumulative, np.arange(num_steps)), np.nextafter(num_steps - 1, 0))
+        n = len(arrivals)
+
+        interval = arrivals.astype(np.int64)
+        steps = interval + 1
+        if n:
+            self.event_times = times[interval] + (arrivals - interval) * (times[steps] - times[interval])
+        else:
+            self.event_times = np.zeros(0)
+
+        self.event_types = np.random.choice(3, size=n, p=self.rates / total_rate)
+        self.event_sizes = np.random.exponential(self.mean_sizes[self.event_types])
+        self.event_offsets = np.random.geometric(1.0 / self.mean_offset_ticks, n)
+
+        # Buy probability: 1/2 for passive events, tilted by the step return for market orders
+        returns = np.zeros(num_steps)
+        if num_steps > 1:
+            returns[1:] = np.diff(np.log(prices))
+            std = returns[1:].std()
+            if std > 0:
+                returns /= std
+        buy_prob = np.where(self.event_types == MARKET,
+                            1.0 / (1.0 + np.exp(-self.direction_sensitivity * returns[steps])), 0.5)
+        self.event_buys = np.random.random_sample(n) < buy_prob
+
+        self._bounds = np.searchsorted(steps, np.arange(num_steps + 1))
+        self.trades = []
+
+    def apply_step(self, order_book, step, price, engine=None):
+        """
+        Apply the events of one step to the order book around the given price.
+
+        Executions are appended to the trade stream. When a MatchingEngine is
+        given, resting agent orders hit by market orders get their passive fills.
+
+        Returns:
+        - (traded volume, traded notional) of the step
+        """
+        start, end = self._bounds[step], self._bounds[step + 1]
+        if start == end:
+            return 0.0, 0.0
+
+        tick_size = self.tick_size
+        ref_tick = round(price / tick_size)
+        volume, notional = 0.0, 0.0
+        for event_time, kind, size, offset, buy in zip(
+                self.event_times[start:end].tolist(), self.event_types[start:end].tolist(),
+                self.event_sizes[start:end].tolist(), self.event_offsets[start:end].tolist(),
+                self.event_buys[start:end].tolist()):
+            if kind == LIMIT:
+                if buy:
+                    order_book.add_bid((ref_tick - offset) * tick_size, size)
+                else:
+                    order_book.add_ask((ref_tick + offset) * tick_size, size)
+            elif kind == CANCEL:
+                if buy:
+                    level_price = (ref_tick - offset) * tick_size
+                    if level_price in order_book.bid_volume:
+                        order_book.remove_bid(level_price, min(size, order_book.bid_volume[level_price]))
+                else:
+                    level_price = (ref_tick + offset) * tick_size
+                    if level_price in order_book.ask_volume:
+                        order_book.remove_ask(level_price, min(size, order_book.ask_volume[level_price]))
+            else:
+                side = 'buy' if buy else 'sell'
+                for fill_price, traded in order_book.match_market_order(side, size):
+                    if engine is not None:
+                        resting = order_book.ask_volume if buy else order_book.bid_volume
+                        engine.on_trade('sell' if buy else 'buy', fill_price, traded,
+                                        traded + resting.get(fill_price, 0.0))
+                    self.trades.append((event_time, fill_price, traded, side))
+                    volume += traded
+                    notional += traded * fill_price
+        return volume, notional
+
+    def get_trades(self):
+        """Trade stream of all applied steps: Time, Price, Size and aggressor Side."""
+        return pd.DataFrame(self.trades, columns=['Time', 'Price', 'Size', 'Side'])
@@ -0,0 +1,280 @@
+import hashlib
+import inspect
+import json
+import os
+import random
+import shutil
+import sys
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from .L2DeltaStream import L2DeltaStream
+
+FORMAT_VERSION = 1
+DEFAULT_MAX_BYTES = 1 << 30
+
+# Constructor parameters of an OrderFlowGenerator (the rest of its state is sampled per run)
+ORDER_FLOW_PARAMS = ('tick_size', 'rates', 'mean_sizes', 'mean_offset_ticks', 'direction_sensitivity')
+
+
+class ResultCache:
+    def __init__(self, directory='simulation_output/cache', max_bytes=DEFAULT_MAX_BYTES):
+        """
+        On-disk cache of generated price paths and simulation results.
+
+        Entries are content-addressed: the key is a SHA-256 hash of the model
+        type and parameters, the seed, the run options and the source code of
+        every module involved, so editing a model or the order book invalidates
+        its entries automatically. Each entry is a directory holding one .npy
+        file per DataFrame column; numeric columns are memory-mapped on a hit,
+        so even long paths load in milliseconds. Once the cache grows beyond
+        max_bytes, the least recently used entries are deleted.
+
+        Only seeded runs are cached (seed=None always recomputes), because an
+        unseeded run is not meant to be repeatable. Memory-mapped columns are
+        read-only; copy() a loaded DataFrame before modifying it in place.
+
+        Parameters:
+        - directory: Cache folder (created on first store)
+        - max_bytes: Size limit of all entries together
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Cached calls
+    # ------------------------------------------------------------------
+
+    def generate(self, model, seed=None):
+        """
+        Return model.generate() for the given seed, from the cache when possible.
+        The global NumPy random state is seeded before generating.
+        """
+        if seed is None:
+            return model.generate()
+        key = self.make_key('generate', _fingerprint(model), seed, _source_version(type(model)))
+        entry = self.load(key)
+        if entry is not None:
+            return entry[0]['data']
+
+        np.random.seed(seed)
+        data = model.generate()
+        self.store(key, {'data': data})
+        return data
+
+    def run_simulation(self, generator, seed=None, **kwargs):
+        """
+        Return generator.run_simulation(**kwargs) for the given seed, from the cache
+        when possible, and restore generator.trades. Both NumPy's and Python's global
+        random states are seeded before running.
+
+        Runs with participants (which keep state across runs) and generators whose book
+        already holds orders from an earlier run are not cached. On a hit the order book
+        is not rebuilt, so generator.order_book does not reflect the run.
+        """
+        book = generator.order_book
+        used = any(len(order_book.bid_volume) or len(order_book.ask_volume) for order_book in generator.order_books)
+        if seed is None or kwargs.get('participants') or used:
+            return generator.run_simulation(**kwargs)
+
+        order_flow = kwargs.get('order_flow')
+        if order_flow is not None and order_flow is not True:
+            order_flow = {name: _fingerprint(getattr(order_flow, name)) for name in ORDER_FLOW_PARAMS}
+        options = {name: _fingerprint(value) for name, value in sorted(kwargs.items()) if name != 'order_flow'}
+        settings = {name: value for name, value in vars(generator).items()
+                    if isinstance(value, (int, float, str)) and not name.startswith('_')}
+        key = self.make_key('run_simulation', _fingerprint(generator.model), type(book).__name__, settings,
+                            order_flow, options, seed,
+                            _source_version(type(generator), type(generator.model), type(book)))
+
+        entry = self.load(key)
+        if entry is not None:
+            tables, attrs = entry
+            generator.trades = tables.get('trades')
+            if attrs['output'] == 'deltas':
+                return L2DeltaStream(tables['steps'], tables['deltas'], attrs['depth_levels'])
+            if attrs['output'] == 'assets':
+                return {name: tables[f'asset.{i}'] for i, name in enumerate(attrs['names'])}
+            return tables['result']
+
+        random.seed(seed)
+        np.random.seed(seed)
+        result = generator.run_simulation(**kwargs)
+        if isinstance(result, L2DeltaStream):
+            tables = {'steps': result.steps, 'deltas': result.deltas}
+            attrs = {'output': 'deltas', 'depth_levels': result.depth_levels}
+        elif isinstance(result, dict):
+            tables = {f'asset.{i}': df for i, df in enumerate(result.values())}
+            attrs = {'output': 'assets', 'names': list(result)}
+        else:
+            tables, attrs = {'result': result}, {'output': 'snapshots'}
+        if generator.trades is not None:
+            tables['trades'] = generator.trades
+        self.store(key, tables, attrs)
+        return result
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(*parts):
+        """Hash JSON-serializable parts into an entry key."""
+        payload = json.dumps([FORMAT_VERSION, *parts], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def load(self, key):
+        """Return ({name: DataFrame}, attrs) for a stored entry, or None on a miss."""
+        path = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        tables = {}
+        for name, table in meta['tables'].items():
+            columns = {}
+            for i, (column, kind, extra) in enumerate(table['columns']):
+                file = os.path.join(path, f'{name}.{i}.npy')
+                if kind == 'object':
+                    columns[column] = pd.Series(np.load(file, allow_pickle=True), dtype=extra)
+                elif kind == 'category':
+                    columns[column] = pd.Categorical.from_codes(np.load(file), extra)
+                else:
+                    columns[column] = np.load(file, mmap_mode='r')
+            tables[name] = pd.DataFrame(columns, copy=False) if columns else pd.DataFrame(index=range(table['rows']))
+        _touch(os.path.join(path, 'meta.json'))
+        self.hits += 1
+        return tables, meta['attrs']
+
+    def store(self, key, tables, attrs=None):
+        """Write DataFrames under a key, then evict least recently used entries over max_bytes."""
+        os.makedirs(self.directory, exist_ok=True)
+        # Write into a private folder and rename it, so readers never see a partial entry
+        staging = os.path.join(self.directory, f'.{key}.{uuid.uuid4().hex}')
+        os.makedirs(staging)
+        meta = {'tables': {}, 'attrs': attrs or {}, 'bytes': 0}
+        for name, df in tables.items():
+            columns = []
+            for i, column in enumerate(df.columns):
+                values = df[column]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    array, kind, extra = values.cat.codes.to_numpy(), 'category', values.cat.categories.tolist()
+                elif values.dtype.kind in 'biuf':
+                    array, kind, extra = values.to_numpy(), 'numeric', None
+                else:
+                    # Strings and mixed columns are pickled and loaded into memory
+                    array, kind, extra = values.to_numpy(dtype=object), 'object', str(values.dtype)
+                np.save(os.path.join(staging, f'{name}.{i}.npy'), array, allow_pickle=kind == 'object')
+                columns.append((column, kind, extra))
+            meta['tables'][name] = {'columns': columns, 'rows': len(df)}
+        meta['bytes'] = sum(entry.stat().st_size for entry in os.scandir(staging))
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        _touch(os.path.join(staging, 'meta.json'))
+
+        try:
+            os.rename(staging, os.path.join(self.directory, key))
+        except OSError:
+            # Stored concurrently by another process
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def entries(self):
+        """List (last use time, bytes, key) of all entries, oldest first."""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith('.'):
+                continue
+            try:
+                meta_path = os.path.join(entry.path, 'meta.json')
+                with open(meta_path) as f:
+                    size = json.load(f)['bytes']
+                entries.append((os.stat(meta_path).st_mtime_ns, size, entry.name))
+            except (OSError, ValueError, KeyError):
+                continue
+        return sorted(entries)
+
+    def size(self):
+        """Total bytes of all entries."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Delete all entries."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _touch(path):
+    """Mark an entry as used now (the file system's own timestamps can be too coarse to order entries)."""
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+def _fingerprint(value):
+    """JSON-compatible description of a parameter value or model object."""
+    if isinstance(value, np.ndarray):
+        return {'dtype': str(value.dtype), 'shape': value.shape,
+                'sha256': hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {str(k): _fingerprint(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint(v) for v in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    # Model objects: class name and public attributes
+    return {'class': type(value).__qualname__,
+            'params': {k: _fingerprint(v) for k, v in sorted(vars(value).items()) if not k.startswith('_')}}
+
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_source_hashes = {}
+
+
+def _source_version(*classes):
+    """Hash of the source files defining the given classes, their bases and the modules they import."""
+    files = set()
+    for cls in classes:
+        for base in inspect.getmro(cls):
+            module = sys.modules.get(base.__module__)
+            if module is None or base.__module__ == 'builtins':
+                continue
+            files.add(getattr(module, '__file__', None))
+            # Project modules the class module depends on (e.g. accelerate, MatchingEngine)
+            for dependency in vars(module).values():
+                dependency_module = sys.modules.get(getattr(dependency, '__module__', None) or '')
+                if inspect.ismodule(dependency):
+                    dependency_module = dependency
+                path = getattr(dependency_module, '__file__', None)
+                if path and _is_project_file(path):
+                    files.add(path)
+    digest = hashlib.sha256()
+    for path in sorted(p for p in files if p and _is_project_file(p)):
+        if path not in _source_hashes:
+            with open(path, 'rb') as f:
+                _source_hashes[path] = hashlib.sha256(f.read()).hexdigest()
+        digest.update(_source_hashes[path].encode())
+    return digest.hexdigest()
+
+
+
+def _is_project_file(path):
+    return os.path.abspath(path).startswith(_PROJECT_ROOT + os.sep) and 'site-packages' not in path
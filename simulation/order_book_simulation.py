@@ -1,10 +1,18 @@
 # order_book_simulation.py
 
+import hashlib
+import os
+import sys
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import numpy as np
+
+# `streamlit run` puts this folder on the path, not the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation.BookDataset import BookDataset
 
 # Title of the app
 st.title("📈 Order Book Simulation")
@@ -15,24 +23,119 @@ This interactive application visualizes the simulated order book data generated
 Choose a time step to see the state of the order book, including multiple levels of bids and asks.
 """)
 
-# File uploader to allow users to upload their simulation CSV
-uploaded_file = st.file_uploader("Upload Simulation CSV", type=["csv"])
+# Converted CSV files are kept here as memory-mapped column stores
+STORE_DIR = os.path.join('simulation_output', 'viewer_cache')
+# Upper bounds on what is sent to the browser, whatever the simulation length
+HEATMAP_TIME_BINS = 400
+HEATMAP_PRICE_BINS = 200
+MAX_REPLAY_FRAMES = 200
+
+
+@st.cache_data(show_spinner="Indexing the simulation file...")
+def prepare_dataset(key, _source):
+    """
+    Convert a CSV into a column store once (in chunks, so multi-GB files fit in memory)
+    and return its folder. key identifies the source contents; _source is not hashed.
+    """
+    directory = os.path.join(STORE_DIR, hashlib.sha256(repr(key).encode()).hexdigest()[:16])
+    if not os.path.exists(os.path.join(directory, 'meta.json')):
+        BookDataset.from_csv(_source, directory)
+    return directory
+
+
+@st.cache_resource(show_spinner="Opening the dataset...")
+def open_dataset(source_type, location, _source=None):
+    """
+    Open a dataset once and share it between reruns; memory-mapped columns would be
+    read into memory and copied on every rerun by st.cache_data. location is a path
+    or, for an upload, a key identifying it (the file itself is passed as _source).
+    """
+    if source_type == 'parquet':
+        return BookDataset.from_parquet(location if _source is None else _source)
+    return BookDataset.load(location)
+
+
+def dataset_from_upload(uploaded_file):
+    """(key, dataset) of an uploaded CSV or Parquet file; the key identifies the dataset in caches."""
+    key = repr(('upload', uploaded_file.name, uploaded_file.size, uploaded_file.file_id))
+    if uploaded_file.name.endswith('.parquet'):
+        return key, open_dataset('parquet', key, uploaded_file)
+    return key, open_dataset('store', prepare_dataset(key, uploaded_file))
+
+
+def dataset_from_path(path):
+    """(key, dataset) of a CSV or Parquet file, or a column store folder, on the server."""
+    if os.path.isdir(path):
+        return path, open_dataset('store', path)
+    stat = os.stat(path)
+    key = repr(('path', os.path.abspath(path), stat.st_size, stat.st_mtime_ns))
+    if path.endswith('.parquet'):
+        return key, open_dataset('parquet', path)
+    return key, open_dataset('store', prepare_dataset(key, path))
+
+
+@st.cache_data(show_spinner="Binning the order book...", max_entries=20)
+def depth_heatmap(key, _dataset, start, end):
+    """Depth grid of the steps [start, end), computed on the server (see BookDataset.depth_grid)."""
+    return _dataset.depth_grid(start, end, HEATMAP_TIME_BINS, HEATMAP_PRICE_BINS)
+
+
+def replay_figure(dataset, start, end, num_frames):
+    """Animated depth chart of num_frames steps spread evenly over [start, end)."""
+    positions = np.unique(np.linspace(start, end - 1, num_frames).round().astype(np.int64))
+    books = [dataset.depth(position) for position in positions]
+    times = [dataset.row(position)['Time'] for position in positions]
+    prices = [price for bids, asks in books for price, _ in bids + asks]
+    sizes = [size for bids, asks in books for _, size in bids + asks]
+
+    def traces(bids, asks):
+        return [go.Bar(x=[size for _, size in bids], y=[price for price, _ in bids], orientation='h',
+                       name='Bids', marker=dict(color='green')),
+                go.Bar(x=[size for _, size in asks], y=[price for price, _ in asks], orientation='h',
+                       name='Asks', marker=dict(color='red'))]
+
+    frames = [go.Frame(data=traces(*book), name=str(i)) for i, book in enumerate(books)]
+    fig = go.Figure(data=traces(*books[0]), frames=frames)
+    play = dict(frame=dict(duration=150, redraw=True), fromcurrent=True, transition=dict(duration=0))
+    pause = dict(frame=dict(duration=0, redraw=False), mode='immediate')
+    fig.update_layout(
+        height=600,
+        xaxis=dict(title='Volume', range=[0, max(sizes, default=1) * 1.05]),
+        yaxis=dict(title='Price', range=[min(prices, default=0), max(prices, default=1)]),
+        updatemenus=[dict(type='buttons', showactive=False, x=0, y=1.12, xanchor='left',
+                          buttons=[dict(label='Play', method='animate', args=[None, play]),
+                                   dict(label='Pause', method='animate', args=[[None], pause])])],
+        sliders=[dict(active=0, currentvalue=dict(prefix='Time: '),
+                      steps=[dict(label=f'{time:.4f}', method='animate', args=[[str(i)], pause])
+                             for i, time in enumerate(times)])]
+    )
+    return fig
+
+
+# Upload small files; give the path of large files (uploads are limited and held in memory)
+uploaded_file = st.file_uploader("Upload Simulation CSV or Parquet", type=["csv", "parquet"])
+path = st.text_input("...or the path of a simulation CSV, Parquet file or column store folder on the server")
 
-if uploaded_file is not None:
-    # Read the CSV file into a DataFrame
-    df = pd.read_csv(uploaded_file)
-    
+dataset = None
+try:
+    if uploaded_file is not None:
+        dataset_key, dataset = dataset_from_upload(uploaded_file)
+    elif path:
+        dataset_key, dataset = dataset_from_path(path)
+except (OSError, ValueError, ImportError) as e:
+    st.error(f"Could not load the dataset: {e}")
+
+if dataset is not None and len(dataset) == 0:
+    st.error("The dataset has no rows.")
+elif dataset is not None:
     # Display the first few rows
     st.subheader("Simulation Data Preview")
-    st.dataframe(df.head())
+    st.dataframe(dataset.head())
 
-    # Ensure 'Time' column is sorted
-    df = df.sort_values(by='Time').reset_index(drop=True)
-    
     # Slider to select the time step
-    min_time = float(df['Time'].min())
-    max_time = float(df['Time'].max())
-    step = (max_time - min_time) / len(df)  # Adjust step based on data density
+    min_time = float(dataset.times[0])
+    max_time = float(dataset.times[-1])
+    step = (max_time - min_time) / len(dataset) or 1.0  # Adjust step based on data density
 
     selected_time = st.slider(
         "Select Time Step",
@@ -42,29 +145,16 @@ if uploaded_file is not None:
         step=step
     )
 
-    # Find the nearest time step
-    nearest_idx = (df['Time'] - selected_time).abs().idxmin()
-    current_data = df.loc[nearest_idx]
-
-    # Extract bids and asks
-    bid_prices = []
-    bid_sizes = []
-    ask_prices = []
-    ask_sizes = []
-    depth_levels = 5  # Adjust based on your simulation
-
-    for i in range(1, depth_levels + 1):
-        bid_price = current_data.get(f'BidPrice_{i}')
-        bid_size = current_data.get(f'BidSize_{i}')
-        ask_price = current_data.get(f'AskPrice_{i}')
-        ask_size = current_data.get(f'AskSize_{i}')
-
-        if pd.notna(bid_price) and pd.notna(bid_size):
-            bid_prices.append(bid_price)
-            bid_sizes.append(bid_size)
-        if pd.notna(ask_price) and pd.notna(ask_size):
-            ask_prices.append(ask_price)
-            ask_sizes.append(ask_size)
+    # Find the nearest time step (binary search on the sorted times)
+    position = dataset.nearest(selected_time)
+    current_data = dataset.row(position)
+
+    # Extract bids and asks; the number of levels comes from the columns
+    bids, asks = dataset.depth(position)
+    bid_prices = [price for price, _ in bids]
+    bid_sizes = [size for _, size in bids]
+    ask_prices = [price for price, _ in asks]
+    ask_sizes = [size for _, size in asks]
 
     # Create a Plotly figure with two subplots for bids and asks
     fig = make_subplots(rows=1, cols=2, subplot_titles=("Bids", "Asks"))
@@ -114,7 +204,7 @@ if uploaded_file is not None:
     st.plotly_chart(fig, use_container_width=True)
 
     # Display Bid-Ask Spread
-    bid_ask_spread = current_data['BidAskSpread']
+    bid_ask_spread = current_data.get('BidAskSpread', float('nan'))
     st.subheader("Bid-Ask Spread")
     st.metric(label="Spread", value=f"${bid_ask_spread:.2f}")
 
@@ -122,7 +212,29 @@ if uploaded_file is not None:
     st.subheader("Additional Information")
     st.write(f"**Time:** {current_data['Time']}")
     st.write(f"**Price:** ${current_data['Price']:.2f}")
-    if pd.notna(current_data['Variance']):
+    if pd.notna(current_data.get('Variance')):
         st.write(f"**Variance:** {current_data['Variance']:.4f}")
+
+    # Depth over time: the server bins the L2 columns into a bounded grid before plotting
+    st.subheader("Depth Heatmap and Replay")
+    window = st.slider("Time window", min_value=min_time, max_value=max_time, value=(min_time, max_time), step=step)
+    start, end = dataset.nearest(window[0]), dataset.nearest(window[1]) + 1
+
+    if st.checkbox("Show depth heatmap", value=True) and dataset.depth_levels:
+        times, prices, bids, asks = depth_heatmap(dataset_key, dataset, start, end)
+        heatmap = go.Figure(go.Heatmap(x=times, y=prices, z=(bids + asks).T, colorscale='Viridis',
+                                       colorbar=dict(title='Avg size'),
+                                       hovertemplate='Time: %{x:.4f}<br>Price: $%{y:.2f}<br>Size: %{z:.1f}<extra></extra>'))
+        if 'Price' in dataset.columns:
+            # Mid price of the first step of every time bucket
+            mid = [dataset.row(dataset.nearest(time))['Price'] for time in times]
+            heatmap.add_trace(go.Scatter(x=times, y=mid, mode='lines', name='Price', line=dict(color='white', width=1)))
+        heatmap.update_layout(height=500, showlegend=False, xaxis_title='Time', yaxis_title='Price',
+                              title_text=f"Average resting size ({len(times)} x {len(prices)} cells, {end - start:,} steps)")
+        st.plotly_chart(heatmap, use_container_width=True)
+
+    if st.checkbox("Show animated replay"):
+        num_frames = st.slider("Frames", min_value=2, max_value=MAX_REPLAY_FRAMES, value=60)
+        st.plotly_chart(replay_figure(dataset, start, end, min(num_frames, end - start)), use_container_width=True)
 else:
-    st.warning("Please upload a simulation CSV file to visualize the order book.")
+    st.warning("Please upload a simulation file or enter its path to visualize the order book.")
@@ -1,10 +1,18 @@
 import argparse
-from .IntegratedDataGenerator import IntegratedDataGenerator
-import matplotlib.pyplot as plt
-import pandas as pd
+from instrumentation import PROFILER, profile_session
+from typing import TYPE_CHECKING
+import random
 import os
 import json
 
+# NumPy, pandas and the models are imported in run(), and matplotlib only when plotting,
+# so --help and argument errors return without loading the scientific stack
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Series drawn by plot_simulation_results (the final depth plot uses the last row)
+PLOTTED_COLUMNS = ['Price', 'Variance', 'BidAskSpread']
+
 
 # Helper function to parse JSON strings
 def parse_json(value):
@@ -18,14 +26,16 @@ def simulator():
 
     # Define command-line arguments
     parser = argparse.ArgumentParser(description='Run Synthetic Market Data Simulation')
-    parser.add_argument('--model', type=str, choices=['heston', 'jumpdiffusion', 'regimeswitching', 'variancegamma'], required=True,
-                        help='Choose the model to use: heston, jumpdiffusion, regimeswitching, or variancegamma')
+    parser.add_argument('--model', type=str, choices=['heston', 'jumpdiffusion', 'regimeswitching', 'variancegamma', 'multiasset'], required=True,
+                        help='Choose the model to use: heston, jumpdiffusion, regimeswitching, variancegamma, or multiasset')
     parser.add_argument('--S0', type=float, default=100.0, help='Initial stock price')
     parser.add_argument('--V0', type=float, default=0.04, help='Initial variance (Heston only)')
     parser.add_argument('--mu', type=float, default=0.05, help='Drift (market trend)')
     parser.add_argument('--kappa', type=float, default=1.5, help='Speed of mean reversion (Heston only)')
     parser.add_argument('--theta', type=float, default=0.04, help='Long-term variance mean (Heston only)')
     parser.add_argument('--sigma_v', type=float, default=0.3, help='Volatility of volatility (Heston only)')
+    parser.add_argument('--scheme', type=str, choices=['euler', 'qe'], default='euler',
+                        help='Variance discretization (Heston only); qe stays accurate with much larger dt')
     parser.add_argument('--rho', type=float, default=-0.5, help='Correlation between price and variance (Heston only)')
     parser.add_argument('--sigma', type=float, default=0.2, help='Volatility of stock price')
     parser.add_argument('--lambda_jump', type=float, default=0.1, help='Jump intensity (Jump Diffusion only)')
@@ -38,14 +48,89 @@ def simulator():
                         help=""" Dictionary of regimes and their parameters in JSON format (Regime-Switching only). Example usage: \--regimes '{"bull": {"mu": 0.10, "sigma": 0.25}, "bear": {"mu": -0.05, "sigma": 0.35}}' """)
     parser.add_argument('--transition_matrix', type=parse_json, default='[[0.9, 0.1], [0.2, 0.8]]',
                         help=""" Transition matrix for regime-switching model in JSON format (Regime-Switching only). Example usage: \--transition_matrix '[[0.85, 0.15], [0.25, 0.75]]' """)
+    parser.add_argument('--num_assets', type=int, default=2, help='Number of assets (MultiAsset only)')
+    parser.add_argument('--asset_correlation', type=float, default=0.5,
+                        help='Correlation between every pair of assets (MultiAsset only, unless --correlation is given)')
+    parser.add_argument('--correlation', type=parse_json, default=None,
+                        help=""" Full asset correlation matrix in JSON format (MultiAsset only). Example usage: \--correlation '[[1, 0.8], [0.8, 1]]' """)
+    parser.add_argument('--dynamics', type=str, choices=['gbm', 'heston', 'jumpdiffusion'], default='gbm',
+                        help='Dynamics of every asset (MultiAsset only)')
     parser.add_argument('--initial_depth', type=int, default=5, help='Number of levels on each side of the order book')
     parser.add_argument('--max_volume', type=float, default=100.0, help='Max volume for generated orders')
     parser.add_argument('--price_step', type=float, default=0.01, help='Price increment for bids and asks')
     parser.add_argument('--spread_limit', type=float, default=0.05, help='Max distance to remove stale orders')
     parser.add_argument('--depth_levels', type=int, default=5, help='Number of order book levels to record')
     parser.add_argument('--tick_size', type=float, default=0.01, help='Tick size for price updates')
+    parser.add_argument('--output', type=str, choices=['snapshots', 'deltas'], default='snapshots',
+                        help='Write the full book at every step, or only changed levels plus periodic keyframes')
+    parser.add_argument('--keyframe_interval', type=int, default=100, help='Steps between full keyframes (deltas output only)')
+    parser.add_argument('--order_flow', action='store_true', help='Drive the order book with Poisson order flow and save the trade stream')
+    parser.add_argument('--limit_rate', type=float, default=20.0, help='Limit order arrivals per time step (order flow only)')
+    parser.add_argument('--cancel_rate', type=float, default=10.0, help='Cancellations per time step (order flow only)')
+    parser.add_argument('--market_rate', type=float, default=5.0, help='Market orders per time step (order flow only)')
+    parser.add_argument('--calendar', action='store_true',
+                        help='Place steps on trading sessions with overnight gaps and U-shaped intraday volatility and volume, and add a Timestamp column (dt must be at most 1/252)')
+    parser.add_argument('--start_date', type=str, default='2024-01-02', help='First trading day (calendar only)')
+    parser.add_argument('--open_time', type=str, default='09:30', help='Session open (calendar only)')
+    parser.add_argument('--close_time', type=str, default='16:00', help='Session close (calendar only)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed, makes the run repeatable')
+    parser.add_argument('--cache_dir', type=str, default=None,
+                        help='Reuse results of identical seeded runs stored in this folder (requires --seed)')
+    parser.add_argument('--cache_size_mb', type=float, default=1024, help='Size limit of the cache folder in MB')
+    parser.add_argument('--plot', type=str, choices=['show', 'save', 'none'], default='show',
+                        help='Display and save the plots, only save them (headless, rendered in a background process), or skip plotting')
+    parser.add_argument('--max_plot_points', type=int, default=None,
+                        help='Points kept per plotted series (LTTB downsampling, default 2000)')
+    parser.add_argument('--live', action='store_true',
+                        help='Publish every step to the --sink targets while the simulation runs instead of writing a CSV at the end')
+    parser.add_argument('--speed', type=float, default=None,
+                        help='Live pace in simulated trading seconds per second (1 = real time, 60 = one trading hour per minute); as fast as possible if omitted')
+    parser.add_argument('--sink', type=str, action='append', default=[],
+                        help='Live sink, repeatable: tcp:HOST:PORT (newline-delimited JSON server) or file:PATH (.jsonl or .csv)')
+    parser.add_argument('--backpressure', type=str, choices=['block', 'drop_oldest', 'drop_newest'], default='block',
+                        help='What a live sink does when its queue is full: slow the simulation down, or drop the oldest or newest step')
+    parser.add_argument('--sink_queue', type=int, default=1024, help='Steps queued per live sink before backpressure applies')
+    parser.add_argument('--wait_clients', type=int, default=0,
+                        help='Clients every tcp sink waits for before the live simulation starts')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print wall time, calls and throughput of every simulation stage')
+    parser.add_argument('--profile_output', type=str, default=None,
+                        help='With --profile, also write a Chrome trace (.json) or a cProfile dump (any other extension)')
 
     args = parser.parse_args()
+    if args.cache_dir is not None and args.seed is None:
+        parser.error("--cache_dir requires --seed")
+    if args.live:
+        from .LiveStream import parse_sink
+        if args.model == 'multiasset' or args.output != 'snapshots' or args.cache_dir is not None:
+            parser.error("--live supports single-asset snapshot output without --cache_dir")
+        if not args.sink:
+            parser.error("--live requires at least one --sink")
+        if args.speed is not None and args.speed <= 0:
+            parser.error("--speed must be positive")
+        try:
+            args.sinks = [parse_sink(spec, args.sink_queue, args.backpressure, args.wait_clients) for spec in args.sink]
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.sink:
+        parser.error("--sink requires --live")
+
+    if args.profile or args.profile_output is not None:
+        with profile_session(args.profile_output):
+            run(args)
+    else:
+        run(args)
+
+
+def run(args):
+    """
+    Run the simulation described by the parsed command-line arguments, then save and plot the results.
+    """
+    with PROFILER.timer('imports'):
+        import numpy as np
+        from .IntegratedDataGenerator import IntegratedDataGenerator
+        from .OrderFlowGenerator import OrderFlowGenerator
+        from data_generator.SessionCalendar import SessionCalendar
 
     # Ensure the simulation output directory exists
     output_dir = "simulation_output"
@@ -63,6 +148,7 @@ def simulator():
             'theta': args.theta,
             'sigma_v': args.sigma_v,
             'rho': args.rho,
+            'scheme': args.scheme,
             'dt': args.dt,
             'T': args.T,
             'tick_size': args.tick_size,
@@ -122,6 +208,41 @@ def simulator():
             'depth_levels': args.depth_levels
         }
 
+    elif args.model == 'multiasset':
+        print("Running Multi-Asset Model")
+        correlation = args.correlation
+        if correlation is None:
+            correlation = np.full((args.num_assets, args.num_assets), args.asset_correlation)
+            np.fill_diagonal(correlation, 1.0)
+        params = {
+            'S0': args.S0,
+            'mu': args.mu,
+            'sigma': args.sigma,
+            'correlation': correlation,
+            'dynamics': args.dynamics,
+            'V0': args.V0,
+            'kappa': args.kappa,
+            'theta': args.theta,
+            'sigma_v': args.sigma_v,
+            'rho': args.rho,
+            'scheme': args.scheme,
+            'lambda_jump': args.lambda_jump,
+            'jump_mean': args.jump_mean,
+            'jump_std': args.jump_std,
+            'dt': args.dt,
+            'T': args.T,
+            'tick_size': args.tick_size,
+            'initial_depth': args.initial_depth,
+            'max_volume': args.max_volume,
+            'price_step': args.price_step,
+            'spread_limit': args.spread_limit,
+            'depth_levels': args.depth_levels
+        }
+
+    if args.calendar:
+        params['calendar'] = SessionCalendar(start_date=args.start_date, open_time=args.open_time,
+                                             close_time=args.close_time)
+
     # Create an instance of the integrated data generator with the chosen model
     generator = IntegratedDataGenerator(
         model_type=args.model,
@@ -129,18 +250,105 @@ def simulator():
     )
 
     # Run the simulation and get the output DataFrame
-    result = generator.run_simulation()
+    order_flow = None
+    if args.order_flow:
+        order_flow = OrderFlowGenerator(args.tick_size, limit_rate=args.limit_rate,
+                                        cancel_rate=args.cancel_rate, market_rate=args.market_rate)
+    if args.live:
+        if args.seed is not None:
+            random.seed(args.seed)
+            np.random.seed(args.seed)
+        run_live(args, generator, order_flow)
+        return
+
+    with PROFILER.timer('simulation.run', generator.model.N):
+        if args.cache_dir is not None:
+            from .ResultCache import ResultCache
+            cache = ResultCache(args.cache_dir, max_bytes=int(args.cache_size_mb * 2**20))
+            result = cache.run_simulation(generator, seed=args.seed, order_flow=order_flow, output=args.output,
+                                          keyframe_interval=args.keyframe_interval)
+            print("Loaded cached result" if cache.hits else f"Result cached in {args.cache_dir}")
+        else:
+            if args.seed is not None:
+                random.seed(args.seed)
+                np.random.seed(args.seed)
+            result = generator.run_simulation(order_flow=order_flow, output=args.output,
+                                              keyframe_interval=args.keyframe_interval)
+
+    # Downsample the series to plot; with --plot save they render in another process
+    # while the output files are written
+    plot_data = None
+    renderer = None
+    if args.plot != 'none':
+        from rendering import DEFAULT_MAX_POINTS, BackgroundRenderer, downsample_frame
+        max_points = args.max_plot_points or DEFAULT_MAX_POINTS
+        with PROFILER.timer('plot.prepare'):
+            if isinstance(result, dict):
+                # Plot the first asset
+                plot_data = next(iter(result.values()))
+            elif args.output == 'deltas':
+                plot_data = result.to_snapshots()
+            else:
+                plot_data = result
+            plot_data = downsample_frame(plot_data, 'Time', PLOTTED_COLUMNS, max_points)
+        if args.plot == 'save':
+            renderer = BackgroundRenderer()
+            renderer.submit(plot_simulation_results, plot_data, args.model, output_dir, show=False, max_points=None)
 
     # Save the result to a CSV file
-    output_filename = os.path.join(output_dir, f'simulation_output_{args.model}.csv')
-    result.to_csv(output_filename, index=False)
-    print(f"Simulation completed. Results saved to {output_filename}")
+    with PROFILER.timer('output.write'):
+        if isinstance(result, dict):
+            asset_dir = os.path.join(output_dir, args.model)
+            os.makedirs(asset_dir, exist_ok=True)
+            for name, df in result.items():
+                df.to_csv(os.path.join(asset_dir, f'{name}.csv'), index=False)
+            print(f"Simulation completed. {len(result)} per-asset snapshot files saved to {asset_dir}")
+        elif args.output == 'deltas':
+            prefix = os.path.join(output_dir, f'simulation_output_{args.model}')
+            result.save(prefix)
+            print(f"Simulation completed. Delta stream saved to {prefix}_steps.csv, {prefix}_deltas.csv and {prefix}_meta.json")
+        else:
+            output_filename = os.path.join(output_dir, f'simulation_output_{args.model}.csv')
+            result.to_csv(output_filename, index=False)
+            print(f"Simulation completed. Results saved to {output_filename}")
+
+        if order_flow is not None:
+            trades_filename = os.path.join(output_dir, f'trades_{args.model}.csv')
+            generator.trades.to_csv(trades_filename, index=False)
+            print(f"Trade stream saved to {trades_filename}")
 
     # Plotting the Results
-    plot_simulation_results(result, args.model, output_dir)
+    with PROFILER.timer('plot'):
+        if renderer is not None:
+            renderer.wait()
+        elif plot_data is not None:
+            plot_simulation_results(plot_data, args.model, output_dir, max_points=None)
+
+
+def run_live(args, generator, order_flow):
+    """
+    Publish the simulation to the sinks parsed from --sink as it runs, then print
+    the latency and throughput measured at every sink.
+    """
+    import asyncio
+    from .LiveStream import LiveSimulation
+
+    live = LiveSimulation(generator, args.sinks, speed=args.speed)
+    pace = 'as fast as possible' if args.speed is None else f'{args.speed:g}x real time'
+    print(f"Streaming {generator.model.N} steps {pace} to {', '.join(sink.name for sink in args.sinks)}")
+    for sink in args.sinks:
+        if getattr(sink, 'min_clients', 0):
+            print(f"Waiting for {sink.min_clients} client(s) on {sink.host}:{sink.port}")
+    with PROFILER.timer('simulation.live', generator.model.N):
+        try:
+            asyncio.run(live.run(order_flow=order_flow))
+        except KeyboardInterrupt:
+            print("Live simulation interrupted")
+    print(live.format_stats())
 
 
-def plot_simulation_results(df: pd.DataFrame, model: str, output_dir: str):
+def plot_simulation_results(df: 'pd.DataFrame', model: str, output_dir: str, show: bool = True,
+                            max_points: int = 2000):
     """
     Generate plots based on the simulation results.
 
@@ -148,22 +356,34 @@ def plot_simulation_results(df: pd.DataFrame, model: str, output_dir: str):
     - df: pandas DataFrame containing simulation data.
     - model: The model type ('heston', 'jumpdiffusion', 'regimeswitching', or 'variancegamma').
     - output_dir: Directory to save the plots.
+    - show: Also display every figure (False to only save them, e.g. with the Agg backend).
+    - max_points: Points kept per series (LTTB downsampling), None to plot every step.
     """
+    import matplotlib.pyplot as plt
+    from rendering import downsample_frame
+
+    df = downsample_frame(df, 'Time', PLOTTED_COLUMNS, max_points)
+
     # Set up the plotting style
     plt.style.use('seaborn-v0_8-darkgrid')
 
+    def finish(filename, label):
+        plt.legend()
+        plt.tight_layout()
+        output_file = os.path.join(output_dir, filename)
+        plt.savefig(output_file)
+        if show:
+            plt.show()
+        plt.close()
+        print(f"{label} plot saved to {output_file}")
+
     # Plot Time vs Price
     plt.figure(figsize=(12, 6))
     plt.plot(df['Time'], df['Price'], label='Price', color='blue')
     plt.title('Simulated Stock Price Over Time')
     plt.xlabel('Time (Years)')
     plt.ylabel('Price')
-    plt.legend()
-    plt.tight_layout()
-    output_file = os.path.join(output_dir, 'price_over_time.png')
-    plt.savefig(output_file)
-    plt.show()
-    print(f"Price plot saved to {output_file}")
+    finish('price_over_time.png', 'Price')
 
     # If Heston Model, plot Time vs Variance
     if model.lower() == 'heston' and 'Variance' in df.columns:
@@ -172,12 +392,7 @@ def plot_simulation_results(df: pd.DataFrame, model: str, output_dir: str):
         plt.title('Simulated Variance Over Time (Heston Model)')
         plt.xlabel('Time (Years)')
         plt.ylabel('Variance')
-        plt.legend()
-        plt.tight_layout()
-        output_file = os.path.join(output_dir, 'variance_over_time.png')
-        plt.savefig(output_file)
-        plt.show()
-        print(f"Variance plot saved to {output_file}")
+        finish('variance_over_time.png', 'Variance')
 
     # Plot Bid-Ask Spread Over Time
     if 'BidAskSpread' in df.columns:
@@ -186,12 +401,7 @@ def plot_simulation_results(df: pd.DataFrame, model: str, output_dir: str):
         plt.title('Bid-Ask Spread Over Time')
         plt.xlabel('Time (Years)')
         plt.ylabel('Spread')
-        plt.legend()
-        plt.tight_layout()
-        output_file = os.path.join(output_dir, 'bid_ask_spread_over_time.png')
-        plt.savefig(output_file)
-        plt.show()
-        print(f"Bid-Ask spread plot saved to {output_file}")
+        finish('bid_ask_spread_over_time.png', 'Bid-Ask spread')
 
     # Plot Market Depth at Final Time Step
     final_snapshot = df.iloc[-1]
@@ -206,12 +416,7 @@ def plot_simulation_results(df: pd.DataFrame, model: str, output_dir: str):
     plt.title('Market Depth at Final Time Step')
     plt.xlabel('Volume')
     plt.ylabel('Price')
-    plt.legend()
-    plt.tight_layout()
-    output_file = os.path.join(output_dir, 'market_depth_final.png')
-    plt.savefig(output_file)
-    plt.show()
-    print(f"Market depth plot saved to {output_file}")
+    finish('market_depth_final.png', 'Market depth')
 
 
 if __name__ == "__main__":